@@ -0,0 +1,194 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Per-process pipeline, created once by the pool initializer
+_worker_pipeline = None
+
+
+def collect_images(inputs):
+    """Expands folders and glob patterns into a sorted, de-duplicated list of image paths."""
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            matches = glob.glob(pattern)
+        paths.extend(sorted(path for path in matches if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS))
+    return list(dict.fromkeys(paths))
+
+
+def load_credentials():
+    """Stored OAuth token from the desktop app, else Application Default Credentials. Never opens a browser."""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_oauth_service import SCOPES, TOKEN_FILE
+
+    if os.path.exists(TOKEN_FILE):
+        credentials = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        if credentials.expired and credentials.refresh_token:
+            credentials.refresh(Request())
+        return credentials
+
+    import google.auth
+    credentials, _ = google.auth.default(scopes=SCOPES)
+    return credentials
+
+
+def build_pipeline(options):
+    from chat_pipeline import ChatPipeline
+    from ocr_service import OcrService
+
+    ocr_service = OcrService(ocr_langs=options["ocr_langs"])
+    ocr_service.roi_preprocess = options["roi"]
+    ocr_service.segmentation = options.get("segmentation", "words")
+
+    return ChatPipeline(ocr_service, translation_service=build_translation_service(options))
+
+
+def build_translation_service(options):
+    """Translation service with an initialized client, or None when translation is off."""
+    if not options["translate"]:
+        return None
+    from translation_service import TranslationService
+    translation_service = TranslationService(options["project_id"], target_lang=options["target_lang"])
+    translation_service.initialize_client(load_credentials())
+    return translation_service
+
+
+def translate_messages(translation_service, messages):
+    """
+    Fills translated_message of parsed messages with one batched request.
+    The CLIs translate in the parent process: one TranslationService (and one
+    usage tracker writing usage.json) no matter how many OCR workers run.
+    """
+    for parsed in messages:
+        parsed["translated_message"] = ""
+    to_translate = [parsed for parsed in messages if parsed.get("message")]
+    if not to_translate:
+        return
+    results = translation_service.translate_batch([parsed["message"] for parsed in to_translate], "und")
+    for parsed, (_, translated_msg, _) in zip(to_translate, results):
+        parsed["translated_message"] = translated_msg
+
+
+def _init_worker(options):
+    global _worker_pipeline
+    # One thread per worker process; parallelism comes from the pool itself
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    import cv2
+    cv2.setNumThreads(1)
+    _worker_pipeline = build_pipeline(options)
+
+
+def process_file(path):
+    """Runs one screenshot through the worker's pipeline. Returns (path, messages, timings, error)."""
+    try:
+        with Image.open(path) as image:
+            screenshot = image.convert("RGB")
+        # Each file is an independent snapshot: report every line it holds
+        _worker_pipeline.reset()
+        messages = _worker_pipeline.process(screenshot, translate=False)
+        return path, messages, _worker_pipeline.last_timings, None
+    except Exception as e:
+        return path, [], {}, str(e)
+
+
+def to_records(path, messages, timings, error):
+    if error:
+        return [{"file": path, "error": error}]
+    return [{
+        "file": path,
+        "line": line_idx,
+        "tag": parsed.get("tag"),
+        "sender": parsed.get("sender"),
+        "message": parsed.get("message"),
+        "translation": parsed.get("translated_message"),
+        "timings_ms": {stage: round(ms, 2) for stage, ms in timings.items()},
+    } for line_idx, parsed in enumerate(messages)]
+
+
+def main():
+    from config import AppConfig
+    config = AppConfig()
+
+    parser = argparse.ArgumentParser(description="Run the chat OCR pipeline over screenshot folders or globs and write JSONL.")
+    parser.add_argument("inputs", nargs="+", help="Folders and/or glob patterns of screenshots")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes (files are split between them)")
+    parser.add_argument("--langs", default=config.get_ocr_langs(), help="Tesseract languages, e.g. eng+rus (default: from config.ini)")
+    parser.add_argument("--roi", action="store_true", default=config.get_roi_preprocess(), help="Use ROI-first preprocessing")
+    parser.add_argument("--segmentation", choices=("words", "bands"), default=config.get_segmentation(),
+                        help="Pass 1 line segmentation: one psm 6 pass, or projection bands with psm 7 per line")
+    parser.add_argument("--no-translate", action="store_true", help="Only OCR and parse, skip Google translation")
+    parser.add_argument("--target-lang", default=config.get_target_lang())
+    parser.add_argument("--project-id", default=config.get_project_id(), help="Google Cloud project id (default: from config.ini)")
+    args = parser.parse_args()
+
+    paths = collect_images(args.inputs)
+    if not paths:
+        print("No images found.", file=sys.stderr)
+        sys.exit(1)
+    if not args.no_translate and not args.project_id:
+        print("No Google Cloud project id; pass --project-id or --no-translate.", file=sys.stderr)
+        sys.exit(1)
+
+    options = {
+        "ocr_langs": args.langs.replace(",", "+"),
+        "roi": args.roi,
+        "segmentation": args.segmentation,
+        "translate": not args.no_translate,
+        "target_lang": args.target_lang,
+        "project_id": args.project_id,
+    }
+    workers = max(1, min(args.workers, len(paths)))
+    # Workers only OCR and parse; translation runs here with a single service
+    worker_options = dict(options, translate=False)
+    translation_service = build_translation_service(options)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    line_count = 0
+    failed = 0
+
+    def write_results(results):
+        nonlocal line_count, failed
+        for path, messages, timings, error in results:
+            if error:
+                failed += 1
+                print(f"{path}: {error}", file=sys.stderr)
+            elif translation_service is not None:
+                translate_start = time.perf_counter()
+                translate_messages(translation_service, messages)
+                timings["translate"] = (time.perf_counter() - translate_start) * 1000
+            for record in to_records(path, messages, timings, error):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            line_count += len(messages)
+
+    try:
+        if workers == 1:
+            _init_worker(worker_options)
+            write_results(map(process_file, paths))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(worker_options,)) as executor:
+                # Results come back in input order, so the JSONL follows the capture order
+                write_results(executor.map(process_file, paths, chunksize=4))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} files ({failed} failed), {line_count} lines in {elapsed:.1f} s with {workers} worker(s): "
+          f"{len(paths) / elapsed:.2f} files/s, {line_count / elapsed:.2f} lines/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import statistics
+import sys
+import time
+
+import pytesseract
+from PIL import Image
+
+# Allow running as "python benchmarks/bench_engine.py" from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_service import OcrService
+from tesseract_engine import TesseractEngine
+
+
+class ReloadingEngine(TesseractEngine):
+    """
+    tesserocr with the models reloaded for every call: what each pytesseract
+    call pays besides starting tesseract.exe. Lets the persistent handle be
+    compared with per-call loading where no tesseract executable is installed.
+    """
+
+    def image_to_data(self, image, lang, psm=6):
+        try:
+            return super().image_to_data(image, lang, psm)
+        finally:
+            self.close()
+
+    def image_to_string(self, image, lang, psm=6):
+        try:
+            return super().image_to_string(image, lang, psm)
+        finally:
+            self.close()
+
+
+def run_snapshot(ocr_service, image, refined_lang):
+    """Runs the OCR passes of one snapshot (main pass + sender + refined for every line)."""
+    # Every run measures recognition, not the recognition cache
+    ocr_service.recognition_cache.clear()
+    frame = ocr_service.extract_text_from_image(image)
+    if frame.lines:
+        x_offset = int(image.width * 0.3) * frame.scale
+        ocr_service.extract_senders_batch(frame.hsv, [line.y_bounds for line in frame], frame.labels)
+        ocr_service.extract_refined_messages_batch(frame.hsv, [(line.y_bounds, x_offset) for line in frame], frame.mask, lang=refined_lang)
+    return len(frame)
+
+
+def bench_backend(backend, image, runs, ocr_langs, refined_lang):
+    if backend == "tesserocr-reload":
+        engine = ReloadingEngine(backend="tesserocr")
+        if engine.backend != "tesserocr":
+            return None
+    else:
+        engine = TesseractEngine(backend=backend)
+        if engine.backend != backend:
+            return None
+        if backend == "pytesseract":
+            try:
+                pytesseract.get_tesseract_version()
+            except Exception:
+                return None # No tesseract executable to start
+    ocr_service = OcrService(ocr_langs=ocr_langs, engine=engine)
+
+    # Warm-up run: loads the models for the persistent engine
+    line_count = run_snapshot(ocr_service, image, refined_lang)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run_snapshot(ocr_service, image, refined_lang)
+        timings.append((time.perf_counter() - start) * 1000)
+    ocr_service.engine.close()
+    return line_count, timings
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/bench_engine.py <chat_screenshot.png> [runs] [langs]")
+        sys.exit(1)
+
+    image = Image.open(sys.argv[1]).convert("RGB")
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    ocr_langs = sys.argv[3] if len(sys.argv) > 3 else "eng+rus+spa+por+chi_sim+tur"
+    # Refined pass language: Russian when installed, like the app's Cyrillic lines
+    refined_lang = "rus" if "rus" in ocr_langs.split("+") else ocr_langs.split("+")[0]
+
+    for backend in ("pytesseract", "tesserocr-reload", "tesserocr"):
+        result = bench_backend(backend, image, runs, ocr_langs, refined_lang)
+        if result is None:
+            print(f"{backend:16s} not available")
+            continue
+        line_count, timings = result
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{backend:16s} lines={line_count:2d} mean={statistics.mean(timings):7.1f} ms "
+              f"median={statistics.median(timings):7.1f} ms p95={p95:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
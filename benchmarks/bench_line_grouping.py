@@ -0,0 +1,156 @@
+import glob
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+# Allow running as "python benchmarks/bench_line_grouping.py" from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_service import OcrService
+from tesseract_engine import parse_tsv
+
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def group_reference(data):
+    """The original O(words x lines) grouping, kept to check identical output."""
+    temp_lines = defaultdict(list)
+    for i in range(len(data['text'])):
+        conf = int(data['conf'][i])
+        text = data['text'][i].strip()
+        if conf > 20 and text:
+            y_center = data['top'][i] + (data['height'][i] // 2)
+            matched_y = None
+            for ly_center in temp_lines.keys():
+                if abs(ly_center - y_center) < 25:
+                    matched_y = ly_center
+                    break
+            if matched_y is None:
+                temp_lines[y_center].append(i)
+            else:
+                temp_lines[matched_y].append(i)
+
+    results = []
+    for y_center in sorted(temp_lines.keys()):
+        indices = temp_lines[y_center]
+        indices.sort(key=lambda idx: data['left'][idx])
+        line_text = " ".join([data['text'][idx] for idx in indices])
+        y_min = min(data['top'][idx] for idx in indices)
+        y_max = max(data['top'][idx] + data['height'][idx] for idx in indices)
+        alnum_count = sum(1 for c in line_text if c.isalnum())
+        if alnum_count < 2: continue
+        if len(line_text) < 4 and alnum_count < 3: continue
+        if results:
+            prev_min, prev_max = results[-1]["y_bounds"]
+            overlap = min(y_max, prev_max) - max(y_min, prev_min)
+            if overlap > (y_max - y_min) * 0.5:
+                if len(line_text) > len(results[-1]["text"]):
+                    results.pop()
+                else:
+                    continue
+        if line_text:
+            cleaned = re.sub(r'[\s]+', ' ', line_text.strip()).strip()
+            if len(cleaned) >= 2:
+                results.append({
+                    "text": cleaned,
+                    "y_bounds": (y_min, y_max),
+                    "words": [(data['text'][idx], data['left'][idx], data['width'][idx]) for idx in indices]
+                })
+    return results
+
+
+def parse_tsv_reference(tsv):
+    """Row-by-row, cell-by-cell parsing like pytesseract's Output.DICT."""
+    rows = [row.split("\t") for row in tsv.split("\n") if row]
+    header = rows[0]
+    data = {key: [] for key in header}
+    for row in rows[1:]:
+        row += [""] * (len(header) - len(row))
+        for key, value in zip(header, row):
+            data[key].append(int(value) if value.lstrip("-").isdigit() else value)
+    return data
+
+
+def as_tuples(lines):
+    return [(line.text, tuple(map(int, line.y_bounds)), [(w.text, int(w.left), int(w.width)) for w in line.words]) for line in lines]
+
+
+def reference_as_tuples(lines):
+    return [(line["text"], tuple(map(int, line["y_bounds"])), [(t, int(l), int(w)) for t, l, w in line["words"]]) for line in lines]
+
+
+def synthetic_tsv(line_count, seed=0, shuffle=False, jitter=4):
+    """
+    Tesseract-like TSV for a chat screen at 3x: reading order, jittered boxes,
+    some noise words. With shuffle and a large jitter the word rows come out of
+    order and word centers are not monotonic (e.g. 110, 90, 130), as Tesseract
+    produces for skewed or crowded lines.
+    """
+    rng = random.Random(seed)
+    rows = [TSV_HEADER]
+    for line_idx in range(line_count):
+        y = 20 + line_idx * 66
+        rows.append(f"4\t1\t1\t1\t{line_idx + 1}\t0\t0\t{y}\t900\t40\t-1\t")
+        x = 15
+        for word_idx in range(rng.randint(3, 9)):
+            word = rng.choice(["[All]", "[Allies]", "Player", "gg", "mid", "да", "нет", "push", "wp", "ok?", "|", "."])
+            width = 18 * len(word) + rng.randint(-3, 3)
+            top = y + rng.randint(-jitter, jitter)
+            conf = rng.choice([96, 91, 88, 75, 42, 15, 30])
+            rows.append(f"5\t1\t1\t1\t{line_idx + 1}\t{word_idx + 1}\t{x}\t{top}\t{width}\t{36 + rng.randint(-3, 3)}\t{conf}\t{word}")
+            x += width + 15
+    if shuffle:
+        rows[1:] = rng.sample(rows[1:], len(rows) - 1)
+    return "\n".join(rows) + "\n"
+
+
+def time_ms(func, arg, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    corpus_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    ocr_service = OcrService()
+
+    samples = [(f"synthetic-{count}", synthetic_tsv(count, seed=count)) for count in (10, 40, 80, 160)]
+    samples += [(f"shuffled-{count}", synthetic_tsv(count, seed=count, shuffle=True, jitter=20)) for count in (10, 40)]
+    if corpus_dir:
+        # Recorded Tesseract output: tesseract <img> <out> --psm 6 tsv
+        for path in sorted(glob.glob(os.path.join(corpus_dir, "*.tsv"))):
+            with open(path, "r", encoding="utf-8") as f:
+                samples.append((os.path.basename(path), f.read()))
+
+    mismatches = 0
+    for name, tsv in samples:
+        table = parse_tsv(tsv)
+        reference = reference_as_tuples(group_reference(parse_tsv_reference(tsv)))
+        result = as_tuples(ocr_service._group_words_into_lines(table))
+        if result != reference:
+            mismatches += 1
+            print(f"{name}: MISMATCH ({len(result)} vs {len(reference)} lines)")
+
+        reference_table = parse_tsv_reference(tsv)
+        ref_parse = time_ms(parse_tsv_reference, tsv, runs)
+        new_parse = time_ms(parse_tsv, tsv, runs)
+        ref_group = time_ms(group_reference, reference_table, runs)
+        new_group = time_ms(ocr_service._group_words_into_lines, table, runs)
+        print(f"{name:24s} words={len(table['text']):5d} lines={len(result):4d} | "
+              f"parse {ref_parse:6.2f} -> {new_parse:6.2f} ms | group {ref_group:6.2f} -> {new_group:6.2f} ms | "
+              f"total speedup {(ref_parse + ref_group) / (new_parse + new_group):4.1f}x")
+
+    print("All outputs identical." if not mismatches else f"{mismatches} sample(s) differ.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow running as "python benchmarks/bench_pipeline.py" from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_pipeline import ChatPipeline
+from corpus import load_corpus
+from metrics import cer
+from ocr_service import OcrService
+from tesseract_engine import TesseractEngine
+
+# Stage order for the report; stages missing from a run (e.g. no refined lines) are skipped
+STAGES = ("preprocess", "masks", "denoise", "tag_match", "ocr_main", "tag_learn", "line_tracking", "parse", "ocr_sender", "ocr_refined", "total")
+FIELDS = ("tag", "sender", "message")
+
+
+def percentiles(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(values.max()),
+    }
+
+
+def field_errors(expected, messages):
+    """Per-field CER of the recognized lines against the ground truth, matched in screen order."""
+    errors = {field: [] for field in FIELDS}
+    for idx, truth in enumerate(expected):
+        result = messages[idx] if idx < len(messages) else {}
+        for field in FIELDS:
+            errors[field].append(cer(truth.get(field) or "", result.get(field) or ""))
+    return errors
+
+
+def run(corpus_dir, runs, ocr_langs, backend, roi, warm_cache):
+    ocr_service = OcrService(ocr_langs=ocr_langs, engine=TesseractEngine(backend=backend))
+    ocr_service.roi_preprocess = roi
+    pipeline = ChatPipeline(ocr_service)
+
+    stage_times = {stage: [] for stage in STAGES}
+    errors = {field: [] for field in FIELDS}
+    images = []
+    for name, image, expected in load_corpus(corpus_dir):
+        messages = []
+        for run_idx in range(runs + 1):
+            # Every run starts cold: no previous snapshot, no cached recognition or player names
+            pipeline.reset()
+            if not warm_cache:
+                ocr_service.recognition_cache.clear()
+                pipeline.sender_slots.reset()
+            messages = pipeline.process(image)
+            if run_idx == 0:
+                continue # Warm-up: loads the Tesseract models
+            for stage, ms in pipeline.last_timings.items():
+                stage_times.setdefault(stage, []).append(ms)
+
+        image_errors = field_errors(expected, messages)
+        for field in FIELDS:
+            errors[field].extend(image_errors[field])
+        images.append({
+            "image": name,
+            "expected_lines": len(expected),
+            "recognized_lines": len(messages),
+            "cer": {field: float(np.mean(image_errors[field])) if image_errors[field] else 0.0 for field in FIELDS},
+        })
+    ocr_service.engine.close()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"ocr_langs": ocr_langs, "backend": ocr_service.engine.backend, "roi_preprocess": roi,
+                   "runs": runs, "warm_cache": warm_cache},
+        "latency_ms": {stage: percentiles(times) for stage, times in stage_times.items() if times},
+        "cer": {field: float(np.mean(values)) if values else 0.0 for field, values in errors.items()},
+        "images": images,
+    }
+
+
+def print_report(results):
+    config = results["config"]
+    print(f"{len(results['images'])} images, backend={config['backend']}, langs={config['ocr_langs']}, "
+          f"roi={config['roi_preprocess']}, runs={config['runs']}")
+    print(f"{'stage':14s} {'p50':>9s} {'p90':>9s} {'p95':>9s} {'max':>9s}")
+    for stage in list(STAGES) + [s for s in results["latency_ms"] if s not in STAGES]:
+        stats = results["latency_ms"].get(stage)
+        if stats:
+            print(f"{stage:14s} {stats['p50']:8.1f}ms {stats['p90']:8.1f}ms {stats['p95']:8.1f}ms {stats['max']:8.1f}ms")
+    print("CER " + "  ".join(f"{field}={value * 100:.1f}%" for field, value in results["cer"].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and accuracy of the OCR pipeline over recorded chat captures.")
+    parser.add_argument("corpus", help="Folder of captures with <name>.json ground truth next to each image")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per image (after one warm-up run)")
+    parser.add_argument("--langs", default="eng+rus+spa+por+chi_sim+tur", help="Tesseract language string")
+    parser.add_argument("--backend", choices=("tesserocr", "pytesseract"), default=None)
+    parser.add_argument("--roi", action="store_true", help="Use ROI-first preprocessing")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the recognition cache between runs")
+    parser.add_argument("--json", help="Write the results to this file as JSON")
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.runs, args.langs, args.backend, args.roi, args.warm_cache)
+    if not results["images"]:
+        print("No captures with ground truth found.")
+        sys.exit(1)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
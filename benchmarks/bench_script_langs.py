@@ -0,0 +1,79 @@
+import os
+import statistics
+import sys
+import time
+
+# Allow running as "python benchmarks/bench_script_langs.py" from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import load_corpus, line_text
+from metrics import cer
+from ocr_service import OcrService
+from script_detector import detect_script, langs_for_script
+
+# Ground truth: <image>.json next to each screenshot (see corpus.py); each
+# line is compared as the full on-screen text, e.g. "[All] Player: да go mid"
+
+
+def recognize_lines(ocr_service, frame, per_script):
+    """Re-recognizes every line from its left edge, with all languages or only its script's."""
+    lines = frame.lines
+    if per_script:
+        line_langs = [langs_for_script(detect_script(line.text)[0], ocr_service.ocr_langs) for line in lines]
+    else:
+        line_langs = [ocr_service.ocr_langs] * len(lines)
+
+    texts = [""] * len(lines)
+    for lang in dict.fromkeys(line_langs):
+        indices = [idx for idx, line_lang in enumerate(line_langs) if line_lang == lang]
+        results = ocr_service.extract_refined_messages_batch(frame.hsv, [(lines[idx].y_bounds, 0) for idx in indices], frame.mask, lang=lang)
+        for idx, text in zip(indices, results):
+            texts[idx] = text or ""
+    return texts
+
+
+def bench_mode(ocr_service, samples, per_script, runs):
+    timings = []
+    errors = []
+    for _, frame, expected in samples:
+        for run in range(runs):
+            ocr_service.recognition_cache.clear() # Measure recognition, not cache hits
+            start = time.perf_counter()
+            texts = recognize_lines(ocr_service, frame, per_script)
+            timings.append((time.perf_counter() - start) * 1000)
+        errors.extend(cer(line_text(ref), hyp) for ref, hyp in zip(expected, texts))
+    return timings, errors
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/bench_script_langs.py <screenshot_dir> [runs] [ocr_langs]")
+        sys.exit(1)
+
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    ocr_langs = sys.argv[3] if len(sys.argv) > 3 else "eng+rus+spa+por+chi_sim+tur"
+    ocr_service = OcrService(ocr_langs=ocr_langs)
+
+    samples = []
+    for name, image, expected in load_corpus(sys.argv[1]):
+        frame = ocr_service.extract_text_from_image(image)
+        if frame.lines:
+            samples.append((name, frame, expected))
+
+    if not samples:
+        print("No screenshots with ground truth found.")
+        sys.exit(1)
+
+    line_count = sum(len(frame) for _, frame, _ in samples)
+    print(f"{len(samples)} screenshots, {line_count} lines, langs={ocr_langs}")
+    for label, per_script in (("all-langs", False), ("per-script", True)):
+        timings, errors = bench_mode(ocr_service, samples, per_script, runs)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{label:10s} mean={statistics.mean(timings):7.1f} ms median={statistics.median(timings):7.1f} ms "
+              f"p95={p95:7.1f} ms CER={statistics.mean(errors) * 100:5.1f}%")
+    ocr_service.engine.close()
+
+
+if __name__ == "__main__":
+    main()
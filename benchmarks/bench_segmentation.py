@@ -0,0 +1,73 @@
+import os
+import statistics
+import sys
+import time
+
+# Allow running as "python benchmarks/bench_segmentation.py" from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import load_corpus, line_text
+from metrics import cer
+from ocr_service import OcrService
+
+# Compares the two pass 1 segmentations on captures with ground truth:
+#   words - one psm 6 pass over the whole mask, words grouped by y-center
+#   bands - row-projection bands of the mask, one psm 7 pass per band
+
+
+def bench_mode(ocr_service, samples, segmentation, runs):
+    ocr_service.segmentation = segmentation
+    timings = []
+    errors = []
+    missing = extra = 0
+    for _, image, expected in samples:
+        lines = []
+        for run in range(runs):
+            # Cold every run: no previous snapshot and no cached recognition
+            ocr_service.line_tracker.reset()
+            ocr_service.recognition_cache.clear()
+            start = time.perf_counter()
+            frame = ocr_service.extract_text_from_image(image)
+            timings.append((time.perf_counter() - start) * 1000)
+            lines = [line.text for line in frame.lines]
+
+        # Lines are compared in screen order; a merged or split line shows up
+        # both as a count error and as CER on the lines after it
+        missing += max(0, len(expected) - len(lines))
+        extra += max(0, len(lines) - len(expected))
+        errors.extend(cer(line_text(ref), lines[idx] if idx < len(lines) else "") for idx, ref in enumerate(expected))
+    return timings, errors, missing, extra
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/bench_segmentation.py <screenshot_dir> [runs] [ocr_langs]")
+        sys.exit(1)
+
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    ocr_langs = sys.argv[3] if len(sys.argv) > 3 else "eng+rus+spa+por+chi_sim+tur"
+    ocr_service = OcrService(ocr_langs=ocr_langs)
+
+    samples = list(load_corpus(sys.argv[1]))
+    if not samples:
+        print("No screenshots with ground truth found.")
+        sys.exit(1)
+
+    # Warm-up: loads the Tesseract models for both page segmentation modes
+    for segmentation in ("words", "bands"):
+        ocr_service.segmentation = segmentation
+        ocr_service.extract_text_from_image(samples[0][1])
+
+    line_count = sum(len(expected) for _, _, expected in samples)
+    print(f"{len(samples)} screenshots, {line_count} expected lines, langs={ocr_langs}")
+    for segmentation in ("words", "bands"):
+        timings, errors, missing, extra = bench_mode(ocr_service, samples, segmentation, runs)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{segmentation:6s} median={statistics.median(timings):7.1f} ms p95={p95:7.1f} ms "
+              f"missing={missing} extra={extra} CER={statistics.mean(errors) * 100 if errors else 0.0:5.1f}%")
+    ocr_service.engine.close()
+
+
+if __name__ == "__main__":
+    main()
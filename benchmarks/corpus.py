@@ -0,0 +1,35 @@
+import glob
+import json
+import os
+
+from PIL import Image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def load_corpus(directory):
+    """
+    Yields (name, PIL image, expected lines) for every capture in directory that
+    has a ground-truth <name>.json next to it. The JSON holds the chat lines
+    top to bottom, each as {"tag": ..., "sender": ..., "message": ...}.
+    """
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        base, ext = os.path.splitext(path)
+        if ext.lower() not in IMAGE_EXTENSIONS or not os.path.exists(base + ".json"):
+            continue
+        with open(base + ".json", "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        yield os.path.basename(path), Image.open(path).convert("RGB"), expected
+
+
+def line_text(expected_line):
+    """The full chat line as it appears on screen, e.g. '[Allies] Name: message'."""
+    if isinstance(expected_line, str):
+        return expected_line
+    parts = []
+    if expected_line.get("tag"):
+        parts.append(f"[{expected_line['tag']}]")
+    if expected_line.get("sender"):
+        parts.append(f"{expected_line['sender']}:")
+    parts.append(expected_line.get("message", ""))
+    return " ".join(parts)
@@ -0,0 +1,20 @@
+def levenshtein(a, b):
+    """Edit distance between two strings (insertions, deletions, substitutions)."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def cer(reference, hypothesis):
+    """Character error rate of hypothesis against reference (0.0 is a perfect match)."""
+    reference = " ".join(reference.split())
+    hypothesis = " ".join((hypothesis or "").split())
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    return levenshtein(reference, hypothesis) / len(reference)
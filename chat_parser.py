@@ -0,0 +1,167 @@
+import re
+
+
+class ChatLineParser:
+    """
+    Parses Dota 2 chat lines ('[Allies] Name: message') from first-pass OCR
+    text. Remembers recently seen senders to help with colon-less lines.
+    """
+
+    def __init__(self):
+        # Memory of seen senders to help parse colon-less lines
+        self.sender_registry = set()
+
+    def register_sender(self, sender):
+        """
+        Adds a sender to the registry, with a cap on the total number of senders
+        to prevent memory issues over long sessions.
+        """
+        if not sender:
+            return
+            
+        sender_lower = sender.lower()
+        if len(self.sender_registry) > 100:
+            # Clear if it gets too large, it will rebuild from new chat lines
+            self.sender_registry.clear()
+            
+        self.sender_registry.add(sender_lower)
+
+    def parse(self, chat_line, tag=None):
+        """
+        Splits one OCR'd chat line into tag, sender and message. When the tag
+        is already known (template match), chat_line starts at the sender and
+        the tag regexes are skipped.
+        """
+        parsed = {
+            "tag": None,
+            "sender": None,
+            "message": chat_line.strip()
+        }
+
+        temp_line = chat_line.strip()
+
+        # 1. Tag Detection (regex fallback when no template matched)
+        # Matches [Allies], (Allies), [All], [Team], [Squelched], etc.
+        # Allowing for slight OCR errors like (Allies] or [Alies]
+        tag_pattern = r"^[\[\(]?(Allies|Team|All|Squelch\w*|Party)[\]\)]?\s*(.*)"
+        tag_match = None if tag else re.search(tag_pattern, temp_line, re.IGNORECASE)
+
+        if tag:
+            parsed["tag"] = tag
+        elif tag_match:
+            parsed["tag"] = tag_match.group(1).capitalize()
+            # If tag was missing brackets, we still count it but clean the text
+            temp_line = tag_match.group(2).strip()
+        else:
+            # Fallback for even noisier tags: look for the words anywhere near start
+            loose_tag_match = re.search(r"(Allies|All|Team|Party)", temp_line[:15], re.IGNORECASE)
+            if loose_tag_match:
+                parsed["tag"] = loose_tag_match.group(1).capitalize()
+                # Remove the tag word and any surrounding non-alnum noise
+                temp_line = re.sub(r"^[^\w\d]*" + re.escape(loose_tag_match.group(0)) + r"[^\w\d]*", "", temp_line, flags=re.IGNORECASE).strip()
+
+        # 2. Sender Detection
+        # Case A: Colon, Semicolon, or common OCR misreads (like . or i at the end of a word)
+        # We look for a delimiter within the first 30 characters
+        # Delimiters: : ; ! | and sometimes dots if they follow a bracket/name
+        sender_match = re.search(r"^([^:;!\|]{1,30})[:;!\|](.*)", temp_line)
+        if not sender_match:
+            # Fallback for dots or common colon misreads as 'i' or 'l'
+            # Only if it follows a likely name structure (like ending in a bracket)
+            sender_match = re.search(r"^([^:;]{1,30}[\]\)])[\.\sil](.*)", temp_line)
+            
+        if not sender_match:
+            # Look for a space and a dot (common misread of ' :')
+            sender_match = re.search(r"^([^:;]{1,30})\s\.(.*)", temp_line)
+
+        if sender_match:
+            potential_sender = sender_match.group(1).strip()
+            message_part = sender_match.group(2).strip()
+
+            # Validate sender: at least 1 alphanumeric character
+            if any(c.isalnum() for c in potential_sender):
+                parsed["sender"] = potential_sender
+                parsed["message"] = message_part
+                if len(potential_sender) > 2:
+                    self.register_sender(potential_sender)
+            else:
+                parsed["message"] = temp_line
+        
+        # Case B: No colon, check against registry or look for first word
+        else:
+            words = temp_line.split(" ")
+            if words:
+                first_word = words[0].rstrip(":;,. ").strip()
+                if first_word.lower() in self.sender_registry:
+                    parsed["sender"] = first_word
+                    parsed["message"] = " ".join(words[1:]).strip()
+                
+                # Case C: No colon, but we have a tag - first word is VERY likely the sender
+                elif parsed["tag"] and len(words) > 1:
+                    potential_sender = words[0].strip()
+                    # If it's a plausible name length and not just punctuation
+                    if 1 <= len(potential_sender) <= 20 and any(c.isalnum() for c in potential_sender):
+                        parsed["sender"] = potential_sender
+                        parsed["message"] = " ".join(words[1:]).strip()
+                        self.register_sender(potential_sender)
+                    else:
+                        parsed["message"] = temp_line
+                else:
+                    parsed["message"] = temp_line
+
+        # Final surgical cleanup
+        # We only want to remove leading colons/semicolons and surrounding whitespace
+        # that Tesseract sometimes orphans at the start of the message part.
+        parsed["message"] = re.sub(r"^[ :;.,\.]+", "", parsed["message"]).strip()
+        
+        # If the resulting message is just one char or nonsense, discard it
+        if len(parsed["message"]) < 2 and not any(c.isalnum() for c in parsed["message"]):
+             parsed["message"] = ""
+
+        return parsed
+
+
+def strip_sender_prefix(message, sender_name):
+    """
+    Deduplication: if the message still starts with the sender's name (read by
+    the colored-name pass), strip it. Checks the first few words of the message.
+    """
+    sender_clean = re.sub(r'\W+', ' ', sender_name.lower()).strip()
+    sender_parts = set(sender_clean.split())
+    
+    msg_words = message.split()
+    strip_idx = 0
+    for i in range(min(len(msg_words), 5)): # Check first 5 words
+        # Clean the word, but keep it possibly combined with next word
+        word_clean = re.sub(r'\W+', '', msg_words[i].lower())
+        if not word_clean:
+            strip_idx = i + 1
+            continue
+            
+        # Stricter matching: 
+        # 1. Exact match for any word length
+        # 2. Substring match ONLY for words longer than 3 chars
+        is_part_of_name = False
+        if word_clean in sender_parts:
+            is_part_of_name = True
+        elif len(word_clean) > 3:
+            is_part_of_name = (
+                any(p in word_clean for p in sender_parts if len(p) > 2) or
+                any(word_clean in p for p in sender_parts if len(word_clean) > 2)
+            )
+        
+        if is_part_of_name:
+            strip_idx = i + 1
+        else:
+            # Also check if the word is just punctuation/brackets left over
+            if re.sub(r'^[\[\]\(\)\+!#:;,\. ]+', '', msg_words[i]) == "":
+                strip_idx = i + 1
+                continue
+            break
+    
+    if strip_idx == 0:
+        return message
+    message = " ".join(msg_words[strip_idx:]).strip()
+    # Final cleanup for any leftover colon/dots/brackets from the name
+    # But be careful NOT to strip actual Cyrillic or Alpha characters
+    return re.sub(r"^[ :;.,\.\+\]\)!#|]+", "", message).strip()
@@ -0,0 +1,217 @@
+import re
+import time
+
+from chat_parser import ChatLineParser, strip_sender_prefix
+from script_detector import detect_script, langs_for_script, LATIN
+from sender_slot_cache import SenderSlotCache
+
+
+class ChatPipeline:
+    """
+    OCR, parsing and translation of one chat capture, with no UI: the main
+    pass, the sender pass, the per-script refined pass, tag/sender/message parsing
+    and an optional translation step. Results are remembered per line
+    fingerprint, so lines seen in the previous snapshot are not processed again.
+    """
+
+    def __init__(self, ocr_service, ocr_pool=None, parser=None, translation_service=None):
+        self.ocr_service = ocr_service
+        self.ocr_pool = ocr_pool # Optional OcrWorkerPool for the per-line passes
+        self.parser = parser or ChatLineParser()
+        self.translation_service = translation_service # None skips translation
+        # Results of the previous snapshot's lines, keyed by line fingerprint
+        self.line_results = {}
+        # Confirmed player names by name color and shape; kept across snapshots for the whole match
+        self.sender_slots = SenderSlotCache()
+        # Milliseconds per stage and line counts of the last snapshot
+        self.last_timings = {}
+        self.last_stats = {}
+
+    def reset(self):
+        """Forgets previous snapshots, so the next one is processed in full."""
+        self.line_results = {}
+        self.ocr_service.line_tracker.reset()
+
+    @staticmethod
+    def _group_by_lang(line_langs):
+        """Maps each language string to the indices that use it, in order."""
+        groups = {}
+        for idx, lang in enumerate(line_langs):
+            groups.setdefault(lang, []).append(idx)
+        return groups
+
+    def process(self, screenshot, only_new=False, translate=True):
+        """
+        Runs every pass on a PIL capture. New messages are translated when
+        translate is set and a translation service is configured. Returns the
+        parsed messages in screen order, or only the new ones with only_new.
+        """
+        snapshot_start = time.perf_counter()
+        timings = {}
+        try:
+            # --- PASS 1: Get Message Lines (White text only) ---
+            # All lines of a snapshot share the arrays owned by the frame
+            frame = self.ocr_service.extract_text_from_image(screenshot)
+            timings.update(self.ocr_service.stage_ms)
+
+            processed_messages = []
+
+            # Incremental OCR: only new lines go through the sender, refined and
+            # translation passes. Lines already seen reuse their cached results.
+            pending_lines = [line for line in frame.lines if line.changed or line.fingerprint not in self.line_results]
+
+            tracer = self.ocr_service.tracer
+
+            # Detect Sender and Message from the white text
+            start = time.perf_counter()
+            for line_idx, line in enumerate(pending_lines):
+                with tracer.span("parse", line=line_idx):
+                    # Channel tags come from template matching before pass 1; the
+                    # regexes only look for a tag on lines no template matched
+                    if line.tag:
+                        parsed = self.parser.parse(line.text, tag=line.tag)
+                    else:
+                        parsed = self.parser.parse(line.text)
+                # If no tag found, default to 'All'
+                if not parsed["tag"]:
+                    parsed["tag"] = "All"
+                processed_messages.append(parsed)
+            timings["parse"] = (time.perf_counter() - start) * 1000
+
+            # --- PASS 2: Get Sender Names (Colored text only) ---
+            # Names of confirmed player slots come from the slot cache; the rest
+            # get one batched OCR call, and their readings vote. Names are read with
+            # every active language: a player's name script says nothing about the
+            # language of their message
+            # Per-line passes run on the worker pool when one is configured
+            start = time.perf_counter()
+            line_ocr = self.ocr_pool or self.ocr_service
+            sender_names = [None] * len(pending_lines)
+            with tracer.span("sender_slots"):
+                sender_slots = [self.ocr_service.locate_sender_slot(frame.hsv, line.y_bounds, frame.labels) for line in pending_lines]
+            ocr_indices = [] # Lines whose name still needs OCR
+            for idx, slot_shape in enumerate(sender_slots):
+                if slot_shape is None:
+                    continue # No colored name on this line
+                sender_names[idx] = self.sender_slots.lookup(*slot_shape)
+                if sender_names[idx] is None:
+                    ocr_indices.append(idx)
+            cached_senders = sum(1 for slot_shape in sender_slots if slot_shape is not None) - len(ocr_indices)
+
+            if ocr_indices:
+                with tracer.span("ocr_sender"):
+                    names = line_ocr.extract_senders_batch(frame.hsv, [pending_lines[idx].y_bounds for idx in ocr_indices], frame.labels, frame.mask,
+                                                           lang=self.ocr_service.ocr_langs)
+                for idx, name in zip(ocr_indices, names):
+                    sender_names[idx] = name
+                    self.sender_slots.add(*sender_slots[idx], name)
+            timings["ocr_sender"] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            refine_requests = [] # (line index, script, (y_bounds, x_offset))
+
+            for line_idx, line in enumerate(pending_lines):
+                parsed = processed_messages[line_idx]
+
+                sender_name = sender_names[line_idx]
+                if sender_name:
+                    parsed["sender"] = sender_name
+                    parsed["message"] = strip_sender_prefix(parsed["message"], sender_name)
+
+                # --- PASS 3: Refined OCR for Message Part ---
+                # Non-Latin messages are re-scanned with only their script's languages.
+                # Latin lines keep the pass 1 text.
+                message_script, _ = detect_script(parsed["message"])
+                if message_script != LATIN and len(parsed["message"]) > 1:
+                    sender_x = line.sender_x or 0
+                    x_offset = self._message_x_offset(parsed["message"], line.words, screenshot.width, frame.scale, sender_x)
+                    refine_requests.append((line_idx, message_script, (line.y_bounds, x_offset)))
+            timings["parse"] += (time.perf_counter() - start) * 1000
+
+            # Refined pass: one batched OCR call per language set
+            start = time.perf_counter()
+            refine_langs = [langs_for_script(script, self.ocr_service.ocr_langs) for _, script, _ in refine_requests]
+            for lang, indices in self._group_by_lang(refine_langs).items():
+                with tracer.span(f"ocr_refined:{lang}"):
+                    refined_texts = line_ocr.extract_refined_messages_batch(frame.hsv, [refine_requests[idx][2] for idx in indices], frame.mask, lang=lang)
+                for idx, refined in zip(indices, refined_texts):
+                    line_idx, script, _ = refine_requests[idx]
+                    # Use the refined version only if it is in the expected script
+                    if refined and len(refined) > 2 and detect_script(refined)[0] == script:
+                        # Apply surgical cleanup to the refined text too
+                        refined_clean = re.sub(r"^[ :;.,\.\+\]\)!#|]+", "", refined).strip()
+                        processed_messages[line_idx]["message"] = refined_clean
+            timings["ocr_refined"] = (time.perf_counter() - start) * 1000
+
+            # OCR is done: drop the frame arrays before the (slow) translation pass
+            frame.release()
+            if self.ocr_pool:
+                self.ocr_pool.release_frame()
+
+            if translate and self.translation_service is not None:
+                start = time.perf_counter()
+                self.translate_messages(processed_messages)
+                timings["translate"] = (time.perf_counter() - start) * 1000
+
+            # Reassemble in screen order and keep only the current lines cached
+            # New results are matched by line (two lines can share a fingerprint)
+            new_results = {id(line): parsed for line, parsed in zip(pending_lines, processed_messages)}
+            line_results = {}
+            processed_messages = []
+            for line in frame.lines:
+                is_new = id(line) in new_results
+                parsed = new_results[id(line)] if is_new else self.line_results[line.fingerprint]
+                line_results[line.fingerprint] = parsed
+                if is_new or not only_new:
+                    processed_messages.append(dict(parsed))
+            self.line_results = line_results
+
+            timings["total"] = (time.perf_counter() - snapshot_start) * 1000
+            self.last_timings = timings
+            self.last_stats = {"lines": len(frame), "new_lines": len(pending_lines), "refined_lines": len(refine_requests),
+                               "cached_senders": cached_senders, "sender_cache_resets": self.sender_slots.resets}
+            return processed_messages
+        finally:
+            # Never keep a frame alive past its snapshot, even after an error
+            if self.ocr_pool:
+                self.ocr_pool.release_frame()
+
+    def translate_messages(self, processed_messages):
+        """
+        Translation pass over the new parsed messages of a snapshot: one batched
+        request for all of them, with the source language detected by the API.
+        """
+        to_translate = [parsed for parsed in processed_messages if parsed["message"]]
+        for parsed in processed_messages:
+            parsed["translated_message"] = ""
+        if not to_translate:
+            return
+        with self.ocr_service.tracer.span("translate"):
+            results = self.translation_service.translate_batch([parsed["message"] for parsed in to_translate], "und")
+        for parsed, (_, translated_msg, _) in zip(to_translate, results):
+            parsed["translated_message"] = translated_msg
+
+    def _message_x_offset(self, message, line_words, capture_width, scale, sender_x=0):
+        """
+        Dynamically find where the message starts horizontally: the pass 1 word
+        that matches the first word of the cleaned message. Words inside a
+        matched channel tag (left of sender_x) are never taken.
+        """
+        first_msg_word = message.split()[0]
+        clean_first = re.sub(r'\W+', '', first_msg_word.lower())
+
+        # Default: 30% of width
+        x_offset = int(capture_width * 0.3) * scale
+
+        for w_obj in line_words:
+            if w_obj.left < sender_x:
+                continue
+            w_clean = re.sub(r'\W+', '', w_obj.text.lower())
+            if clean_first and w_clean == clean_first:
+                # Found it! Start slightly earlier to be safe
+                x_offset = max(0, w_obj.left - 20)
+                break
+            elif w_obj.left > capture_width * 0.5 * scale:
+                # If we've passed 50% of screen without finding it, just use current x_offset
+                break
+        return x_offset
@@ -35,6 +35,14 @@ class AppConfig:
         self.config['General']['ocr_dashboard'] = "eng,rus,spa,por,chi_sim,tur,swe" 
         self.config['GoogleCloud']['project_id'] = ""
         self.config['General']['first_run'] = "True" # New: Flag for first run
+        self.config['General']['watch_mode'] = "False"
+        self.config['General']['watch_interval_ms'] = "500"
+        self.config['General']['debug_capture'] = "False"
+        self.config['General']['roi_preprocess'] = "False"
+        self.config['General']['segmentation'] = "words" # words | bands
+        self.config['General']['auto_region'] = "False" # Follow the chat when it moves
+        self.config['General']['ocr_workers'] = "1"
+        self.config['General']['tracing'] = "False"
 
     def _save_config(self):
         with open(self.config_path, 'w') as configfile:
@@ -122,5 +130,57 @@ class AppConfig:
     def set_first_run(self, is_first_run):
         self.set('General', 'first_run', str(is_first_run))
 
+    def get_watch_mode(self):
+        return self.config.getboolean('General', 'watch_mode', fallback=False)
 
+    def set_watch_mode(self, enabled):
+        self.set('General', 'watch_mode', str(enabled))
 
+    def get_watch_interval_ms(self):
+        try:
+            return int(self.get('General', 'watch_interval_ms', "500"))
+        except ValueError:
+            return 500
+
+    def set_watch_interval_ms(self, interval_ms):
+        self.set('General', 'watch_interval_ms', str(interval_ms))
+
+    def get_auto_region(self):
+        return self.config.getboolean('General', 'auto_region', fallback=False)
+
+    def set_auto_region(self, enabled):
+        self.set('General', 'auto_region', str(enabled))
+
+    def get_debug_capture(self):
+        return self.config.getboolean('General', 'debug_capture', fallback=False)
+
+    def set_debug_capture(self, enabled):
+        self.set('General', 'debug_capture', str(enabled))
+
+    def get_roi_preprocess(self):
+        return self.config.getboolean('General', 'roi_preprocess', fallback=False)
+
+    def set_roi_preprocess(self, enabled):
+        self.set('General', 'roi_preprocess', str(enabled))
+
+    def get_segmentation(self):
+        segmentation = self.get('General', 'segmentation', "words")
+        return segmentation if segmentation in ("words", "bands") else "words"
+
+    def set_segmentation(self, segmentation):
+        self.set('General', 'segmentation', segmentation)
+
+    def get_ocr_workers(self):
+        try:
+            return max(1, int(self.get('General', 'ocr_workers', "1")))
+        except ValueError:
+            return 1
+
+    def set_ocr_workers(self, workers):
+        self.set('General', 'ocr_workers', str(workers))
+
+    def get_tracing(self):
+        return self.config.getboolean('General', 'tracing', fallback=False)
+
+    def set_tracing(self, enabled):
+        self.set('General', 'tracing', str(enabled))
@@ -0,0 +1,94 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class DebugRecorder:
+    """
+    Opt-in recorder for intermediate OCR images. While enabled, each stage's
+    image is kept in memory in a ring buffer of the last N snapshots. Nothing
+    touches the disk until flush() is called (on demand or after an error);
+    a background thread then writes one folder per snapshot.
+    """
+
+    def __init__(self, enabled=False, capacity=10, output_dir="ocr_debug"):
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.snapshots = deque(maxlen=capacity)
+        self._current = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            with self._lock:
+                self.snapshots.clear()
+                self._current = None
+
+    def begin_snapshot(self):
+        """Starts a new ring-buffer slot; later record() calls attach to it."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._current = {"id": self._next_id, "time": time.strftime("%Y%m%d-%H%M%S"), "images": []}
+            self._next_id += 1
+            self.snapshots.append(self._current)
+
+    def record(self, stage, image):
+        if not self.enabled:
+            return
+        # Copy arrays: the pipeline may reuse or modify its buffers afterwards
+        if isinstance(image, np.ndarray):
+            image = image.copy()
+        with self._lock:
+            if self._current is None:
+                return
+            self._current["images"].append((stage, image))
+
+    def flush(self, latest_only=False):
+        """Queues buffered snapshots for writing to disk. Returns how many were queued."""
+        with self._lock:
+            snapshots = list(self.snapshots)[-1:] if latest_only else list(self.snapshots)
+            self.snapshots.clear()
+            self._current = None
+        if not snapshots:
+            return 0
+        self._ensure_writer()
+        for snapshot in snapshots:
+            self._queue.put(snapshot)
+        return len(snapshots)
+
+    def flush_on_error(self):
+        if self.enabled:
+            self.flush(latest_only=True)
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            snapshot = self._queue.get()
+            try:
+                folder = os.path.join(self.output_dir, f"snapshot_{snapshot['time']}_{snapshot['id']:04d}")
+                os.makedirs(folder, exist_ok=True)
+                for idx, (stage, image) in enumerate(snapshot["images"]):
+                    path = os.path.join(folder, f"{idx:02d}_{stage}.png")
+                    if isinstance(image, np.ndarray):
+                        cv2.imwrite(path, image)
+                    else:
+                        image.save(path)
+                print(f"Saved OCR debug images to {folder}")
+            except Exception as e:
+                print(f"Error writing OCR debug images: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,129 @@
+import re
+
+import numpy as np
+
+from script_detector import count_scripts, detect_script, CYRILLIC, HAN, LATIN
+
+# Seed text per language, written in the register of game chat. The trigram
+# profiles are built from it once per process; add a language by adding a sample.
+LANGUAGE_SAMPLES = {
+    "en": "hello how are you what are you doing why not yes come on go mid push top bot we need wards "
+          "help me please report this guy thank you so much thanks are you kidding me where is my support "
+          "lets go team fight now he is coming back off dont feed stop buying items have fun with your friends "
+          "i think we can win if we play together just farm and wait for the late game my team is so bad today "
+          "who is playing carry i dont know that was good the and you that this with they have been would",
+    "ru": "привет как дела что ты делаешь почему нет да давай го мид пуш топ бот нужны варды помоги мне "
+          "пожалуйста репорт этого парня спасибо большое ты серьезно где мой саппорт пошли команда драка сейчас "
+          "он идет назад не корми хватит покупать предметы мы можем выиграть если будем играть вместе просто "
+          "фарми и жди лейт моя команда сегодня очень плохая кто играет керри я не знаю это было хорошо "
+          "что это как так вы они его ещё уже тоже здесь всё",
+    "uk": "привіт як справи що ти робиш чому ні так давай го мід пуш топ бот потрібні варди допоможи мені "
+          "будь ласка репорт цього хлопця дякую дуже ти серйозно де мій саппорт ходімо команда бійка зараз "
+          "він іде назад не годуй досить купувати предмети ми можемо виграти якщо будемо грати разом просто "
+          "фарми і чекай лейт моя команда сьогодні дуже погана хто грає керрі я не знаю це було добре "
+          "її їх є ще вже теж тут все їде",
+    "es": "hola como estas que haces por que no si vamos mid empujar top bot necesitamos guardianes ayuda "
+          "por favor reporten a este tipo muchas gracias estas bromeando donde esta mi soporte vamos equipo "
+          "pelea ahora viene atras no den de comer dejen de comprar objetos podemos ganar si jugamos juntos "
+          "solo farmea y espera el juego tardio mi equipo hoy es muy malo quien juega carry no se eso fue bueno "
+          "el la los las del que pero año niño señor también está qué",
+    "pt": "ola como voce esta o que esta fazendo por que nao sim vamos mid empurrar top bot precisamos de "
+          "sentinelas ajuda por favor denunciem esse cara muito obrigado voce esta brincando onde esta meu "
+          "suporte vamos time luta agora ele esta vindo volta nao alimentem parem de comprar itens podemos "
+          "ganhar se jogarmos juntos so farma e espera o late meu time hoje e muito ruim quem joga de carry "
+          "eu nao sei isso foi bom não então você são ação coração mais uma com",
+    "tr": "merhaba nasilsin ne yapiyorsun neden hayir evet hadi mid it top bot ward lazim yardim et lutfen "
+          "bu adami rapor edin cok tesekkurler ciddi misin destegim nerede hadi takim savas simdi geliyor "
+          "geri cekil besleme esya almayi birak beraber oynarsak kazanabiliriz sadece farm yap ve lateyi "
+          "bekle takimim bugun cok kotu kim carry oynuyor bilmiyorum bu iyiydi güzel değil çok iyi şimdi "
+          "böyle için gerçekten bir şey yok ama",
+    "sv": "hej hur mar du vad gor du varfor nej ja kom igen mid pusha top bot vi behover wards hjalp mig "
+          "snalla rapportera den har killen tack sa mycket skojar du var ar min support kom igen laget strid "
+          "nu han kommer tillbaka sluta mata sluta kopa saker vi kan vinna om vi spelar tillsammans bara "
+          "farma och vanta pa sent spel mitt lag ar sa daligt idag vem spelar carry jag vet inte det var bra "
+          "är på och att det för så även inte med",
+    "de": "hallo wie geht es dir was machst du warum nein ja los geht mid pushen top bot wir brauchen wards "
+          "hilf mir bitte meldet diesen typen vielen dank machst du witze wo ist mein support los team kampf "
+          "jetzt er kommt zurück nicht füttern hör auf items zu kaufen wir können gewinnen wenn wir zusammen "
+          "spielen einfach farmen und auf das späte spiel warten mein team ist heute so schlecht wer spielt "
+          "carry ich weiß nicht das war gut und der die das ist nicht ich",
+    "fr": "salut comment ca va qu est ce que tu fais pourquoi non oui allez mid pousser top bot on a besoin "
+          "de wards aide moi s il te plait signalez ce mec merci beaucoup tu rigoles ou est mon support allez "
+          "equipe combat maintenant il arrive recule arrete de nourrir arrete d acheter des objets on peut "
+          "gagner si on joue ensemble juste farm et attends la fin de partie mon equipe est tellement nulle "
+          "aujourd hui qui joue carry je ne sais pas c etait bien le la les des est très été à ça",
+}
+
+# Han-script lines have no n-gram model; kana and hangul tell Japanese and Korean apart
+_KANA_RE = re.compile(r'[぀-ヿ]')
+_HANGUL_RE = re.compile(r'[가-힯]')
+
+MIN_TRIGRAMS = 12 # Shorter texts get proportionally lower confidence
+SCORE_TEMPERATURE = 3.0 # Softens the posterior of the small seed profiles
+
+
+def _trigrams(text):
+    """Letter trigrams of each lower-cased word padded with spaces ('gg' -> ' gg', 'gg ')."""
+    grams = []
+    for word in re.findall(r"[^\W\d_]+", text.lower()):
+        padded = f" {word} "
+        grams.extend(padded[i:i+3] for i in range(len(padded) - 2))
+    return grams
+
+
+class LanguageIdentifier:
+    """
+    Offline language identification for chat lines: a script check (Han,
+    Cyrillic, Latin) followed by a character trigram model over the
+    languages of that script. Returns (language code, confidence 0-1) in well
+    under a millisecond, so lines that are clearly in the target language
+    never need a remote detect call.
+    """
+
+    def __init__(self, samples=None):
+        samples = samples or LANGUAGE_SAMPLES
+        self.languages = list(samples)
+        counts = [{} for _ in self.languages]
+        for lang_idx, lang in enumerate(self.languages):
+            for gram in _trigrams(samples[lang]):
+                counts[lang_idx][gram] = counts[lang_idx].get(gram, 0) + 1
+
+        # Add-half smoothed log probabilities: one row per known trigram, the
+        # last row for unseen trigrams, one column per language
+        vocabulary = sorted(set().union(*counts))
+        totals = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+        denominators = totals + 0.5 * len(vocabulary)
+        gram_counts = np.array([[c.get(gram, 0) for c in counts] for gram in vocabulary] + [[0] * len(counts)], dtype=np.float64)
+        self.logp = np.log((gram_counts + 0.5) / denominators)
+        self.gram_rows = {gram: row for row, gram in enumerate(vocabulary)}
+        self.unseen_row = len(vocabulary)
+
+        # Candidate languages per script, decided by whether the sample is Cyrillic
+        cyrillic = np.array([count_scripts(samples[lang])[1] > 0 for lang in self.languages])
+        self.script_candidates = {CYRILLIC: cyrillic, LATIN: ~cyrillic}
+
+    def identify(self, text):
+        """(language code, confidence) for one line; ('und', 0.0) when there is nothing to go on."""
+        script, script_conf = detect_script(text)
+        if script_conf == 0.0:
+            return "und", 0.0
+        if script == HAN:
+            if _HANGUL_RE.search(text):
+                return "ko", script_conf
+            if _KANA_RE.search(text):
+                return "ja", script_conf
+            return "zh-CN", script_conf
+
+        candidates = self.script_candidates[script]
+        grams = _trigrams(text)
+        if not grams or not candidates.any():
+            return "und", 0.0
+        scores = self.logp[[self.gram_rows.get(gram, self.unseen_row) for gram in grams]].sum(axis=0)
+
+        # Posterior over the script's languages, tempered for the small profiles
+        scores = np.where(candidates, scores / SCORE_TEMPERATURE, -np.inf)
+        posterior = np.exp(scores - scores.max())
+        posterior /= posterior.sum()
+        best = int(np.argmax(posterior))
+        confidence = float(posterior[best]) * min(1.0, len(grams) / MIN_TRIGRAMS) * script_conf
+        return self.languages[best], confidence
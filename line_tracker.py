@@ -0,0 +1,91 @@
+import hashlib
+
+import cv2
+import numpy as np
+
+# How close (in frame pixels) a shifted line must land to count as the same line
+LINE_MATCH_TOLERANCE = 15
+
+
+class LineTracker:
+    """
+    Remembers per-line fingerprints of the validated mask from the previous
+    snapshot and classifies the lines of a new snapshot as 'unchanged',
+    'moved' (same content, scrolled) or 'new'.
+    """
+
+    def __init__(self, max_shift=240):
+        self.max_shift = max_shift # Largest vertical scroll to look for (3x pixels)
+        self.prev_profile = None
+        self.prev_lines = [] # [(fingerprint, y_center)]
+
+    def reset(self):
+        self.prev_profile = None
+        self.prev_lines = []
+
+    def fingerprint(self, mask, y_bounds):
+        """
+        Hash of the line's ink, cropped tight to its bounding box so that a few
+        pixels of jitter in the OCR word boxes does not change the hash.
+        """
+        y1, y2 = y_bounds
+        band = mask[max(0, y1):min(mask.shape[0], y2)]
+        x, y, w, h = cv2.boundingRect(band)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.array([w, h], dtype=np.int32).tobytes())
+        digest.update(np.ascontiguousarray(band[y:y+h, x:x+w]).tobytes())
+        return digest.hexdigest()
+
+    def estimate_shift(self, mask):
+        """
+        Vertical offset (new_y - old_y) that best aligns the row-ink profile of
+        this frame with the previous one. Chat scrolls up, so this is usually
+        zero or minus a multiple of the line height.
+        """
+        profile = np.count_nonzero(mask, axis=1).astype(np.float32)
+        prev = self.prev_profile
+        self.prev_profile = profile
+        if prev is None or prev.shape != profile.shape or not prev.any():
+            return 0
+
+        best_shift, best_cost = 0, None
+        rows = profile.shape[0]
+        for shift in range(-min(self.max_shift, rows // 2), min(self.max_shift, rows // 2) + 1):
+            if shift >= 0:
+                a, b = profile[shift:], prev[:rows - shift]
+            else:
+                a, b = profile[:rows + shift], prev[-shift:]
+            cost = float(np.abs(a - b).mean())
+            if best_cost is None or cost < best_cost:
+                best_shift, best_cost = shift, cost
+        return best_shift
+
+    def update(self, mask, lines):
+        """
+        Fingerprints every line, compares against the previous snapshot and
+        stores the new state. Returns (fingerprints, statuses) aligned with lines.
+        """
+        shift = self.estimate_shift(mask)
+        fingerprints = [self.fingerprint(mask, line.y_bounds) for line in lines]
+
+        prev_by_fp = {}
+        for fp, y_center in self.prev_lines:
+            prev_by_fp.setdefault(fp, []).append(y_center)
+
+        statuses = []
+        current = []
+        for fp, line in zip(fingerprints, lines):
+            y1, y2 = line.y_bounds
+            y_center = (y1 + y2) // 2
+            current.append((fp, y_center))
+            prev_centers = prev_by_fp.get(fp)
+            if not prev_centers:
+                statuses.append("new")
+            elif any(abs(prev_y + shift - y_center) <= LINE_MATCH_TOLERANCE for prev_y in prev_centers):
+                statuses.append("unchanged" if shift == 0 else "moved")
+            else:
+                # Same ink somewhere else in the frame (e.g. a repeated "gg")
+                statuses.append("moved")
+
+        self.prev_lines = current
+        return fingerprints, statuses
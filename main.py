@@ -1,18 +1,30 @@
 import tkinter as tk
-from tkinter import ttk, font
+from tkinter import ttk, font, filedialog
 import threading
+import time
 import os
-import re # Added for chat parsing
+import multiprocessing
 import subprocess
 
 from PIL import ImageTk, Image # Added for image display
 
+# Tesseract's OpenMP reads its thread limit once, when the library loads (and
+# pytesseract's tesseract processes inherit it), so it is set before ocr_service
+# imports the engine. Watch mode must stay on one core; hotkey snapshots get
+# their parallelism from the OCR worker pool instead.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 from screenshot_utils import RegionSelector, ScreenCapture
 from config import AppConfig
 from ocr_service import OcrService
 from translation_service import TranslationService
 from google_oauth_service import GoogleOAuthService
 from keybinding_service import KeybindingService
+from watch_service import WatchService
+from ocr_pool import OcrWorkerPool, MAX_OCR_WORKERS
+from chat_pipeline import ChatPipeline
+from tracing import Tracer
+from region_locator import RegionLocator
 
 from pynput import keyboard
 
@@ -79,21 +91,42 @@ class DotaChatTranslatorApp:
         self.target_lang = self.config.get_target_lang()
         self.ocr_langs_str = self.config.get_ocr_langs()
         self.ocr_dashboard_str = self.config.get_ocr_dashboard()
+        self.watch_mode = self.config.get_watch_mode()
+        self.watch_interval_ms = self.config.get_watch_interval_ms()
+        self.debug_capture = self.config.get_debug_capture()
+        self.tracing = self.config.get_tracing()
+        self.ocr_workers = self.config.get_ocr_workers()
+        self.auto_region = self.config.get_auto_region()
 
         # Google services
         self.google_oauth_service = GoogleOAuthService(self.update_notification)
         self.credentials = None
 
         self.ocr_service = OcrService(ocr_langs=self.ocr_langs_str.replace(",", "+"))
+        self.ocr_service.debug.set_enabled(self.debug_capture)
+        # Per-stage timings of the last snapshots, shared by every pipeline stage
+        self.tracer = Tracer(enabled=self.tracing)
+        self.ocr_service.tracer = self.tracer
+        self.ocr_service.roi_preprocess = self.config.get_roi_preprocess()
+        self.ocr_service.segmentation = self.config.get_segmentation()
+        # Optional process pool for the per-line OCR passes (1 = run in-thread, batched)
+        self.ocr_pool = OcrWorkerPool(self.ocr_service.ocr_langs, self.ocr_workers) if self.ocr_workers > 1 else None
         self.translation_service = TranslationService(self.google_cloud_project_id, target_lang=self.target_lang)
         
-        # Memory of seen senders to help parse colon-less lines
-        self.sender_registry = set() 
+        # OCR + parsing of a capture, remembering results of already seen lines
+        self.chat_pipeline = ChatPipeline(self.ocr_service, self.ocr_pool, translation_service=self.translation_service)
+        # Hotkey snapshots and watch mode share the line tracker and result cache
+        self.pipeline_lock = threading.Lock()
+        # Finds the chat on screen and keeps the region tight when it moves
+        self.region_locator = RegionLocator(self.ocr_service, screen_size=(self.root.winfo_screenwidth(), self.root.winfo_screenheight()))
 
         # Hotkey listener
         self.keybinding_service = KeybindingService(self.take_snapshot, self.hotkey_str)
         self.keybinding_service.start_listener()
 
+        # Continuous capture with change detection
+        self.watch_service = WatchService(self.capture_chat_region, self.on_watch_change, interval_ms=self.watch_interval_ms)
+
         self.last_screenshot_pil = None # Stores the PIL Image object
         self.last_screenshot_tk = None # Stores the PhotoImage object for Tkinter to display
 
@@ -105,26 +138,14 @@ class DotaChatTranslatorApp:
 
         self.show_startup_status()
 
+        if self.watch_mode:
+            self._start_watch()
+
         # Check for first run to open README
         if self.config.get_first_run():
             self._open_readme_file()
             self.config.set_first_run(False)
 
-    def register_sender(self, sender):
-        """
-        Adds a sender to the registry, with a cap on the total number of senders
-        to prevent memory issues over long sessions.
-        """
-        if not sender:
-            return
-            
-        sender_lower = sender.lower()
-        if len(self.sender_registry) > 100:
-            # Clear if it gets too large, it will rebuild from new chat lines
-            self.sender_registry.clear()
-            
-        self.sender_registry.add(sender_lower)
-
 
 # =====================================================
 # UI SETUP
@@ -367,10 +388,34 @@ class DotaChatTranslatorApp:
         thread.start()
 
 
-    def run_ocr_pipeline(self):
+    def capture_chat_region(self):
+        if not self.chat_region:
+            return None
+        return ScreenCapture().capture_region(self.chat_region)
+
+
+    def on_watch_change(self, screenshot):
+        """Called from the watch thread when the chat area changed."""
+        if not self.google_cloud_project_id or not self.translation_service.client:
+            return
+        self.run_ocr_pipeline(screenshot, only_new=True)
+
+
+    def run_ocr_pipeline(self, screenshot=None, only_new=False):
+        with self.pipeline_lock:
+            self._process_snapshot(screenshot, only_new)
+
+
+    def _process_snapshot(self, screenshot=None, only_new=False):
+        """
+        Capture (unless a screenshot is given), OCR, parse and translate.
+        With only_new, just the lines not seen in the previous snapshot are displayed.
+        """
+        snapshot_id = self.tracer.begin_snapshot("watch" if only_new else "hotkey")
         try:
-            capturer = ScreenCapture()
-            screenshot = capturer.capture_region(self.chat_region)
+            if screenshot is None:
+                with self.tracer.span("capture"):
+                    screenshot = self.capture_chat_region()
 
             if not screenshot:
                 self.safe_notify("Screenshot failed.")
@@ -381,121 +426,41 @@ class DotaChatTranslatorApp:
             # Update the UI with the screenshot preview
             self.root.after(0, self.display_last_screenshot)
 
-            # --- PASS 1: Get Message Lines (White text only) ---
-            extracted_data = self.ocr_service.extract_text_from_image(screenshot)
+            processed_messages = self.chat_pipeline.process(screenshot, only_new)
+            if self.auto_region:
+                with self.tracer.span("region_tracking"):
+                    self._track_chat_region(screenshot)
 
-            processed_messages = []
+            # Line and cache counters go to the timings panel with the stage spans
+            if self.tracer.enabled:
+                cache_stats = self.ocr_service.recognition_cache.get_stats()
+                self.tracer.add_stats(dict(self.chat_pipeline.last_stats, ocr_backend=self.ocr_service.engine.backend,
+                                           ocr_cache_hits=cache_stats["hits"], ocr_cache_misses=cache_stats["misses"]),
+                                      snapshot_id)
 
-            for data in extracted_data:
-                text = data["text"]
-                y_bounds = data["y_bounds"]
-                hsv = data["full_hsv"]
-                validated_mask = data["validated_mask"]
-                line_words = data["words"]
+            if only_new and not processed_messages:
+                return
 
-                # Detect Tag and Message from the white text
-                parsed = self.parse_chat_line(text)
-                
-                # If no tag found, default to 'All'
-                if not parsed["tag"]:
-                    parsed["tag"] = "All"
-
-                # --- PASS 2: Get Sender Name (Colored text only) ---
-                # Targeted search within the same vertical bounds
-                sender_name = self.ocr_service.extract_sender_from_line(hsv, y_bounds)
-                if sender_name:
-                    parsed["sender"] = sender_name
-                    
-                    # Deduplication Logic: If the message still starts with the sender's name, strip it.
-                    # We check the first few words of the message against the detected sender.
-                    msg_text = parsed["message"]
-                    sender_clean = re.sub(r'\W+', ' ', sender_name.lower()).strip()
-                    sender_parts = set(sender_clean.split())
-                    
-                    msg_words = msg_text.split()
-                    strip_idx = 0
-                    for i in range(min(len(msg_words), 5)): # Check first 5 words
-                        # Clean the word, but keep it possibly combined with next word
-                        word_clean = re.sub(r'\W+', '', msg_words[i].lower())
-                        if not word_clean:
-                            strip_idx = i + 1
-                            continue
-                            
-                        # Stricter matching: 
-                        # 1. Exact match for any word length
-                        # 2. Substring match ONLY for words longer than 3 chars
-                        is_part_of_name = False
-                        if word_clean in sender_parts:
-                            is_part_of_name = True
-                        elif len(word_clean) > 3:
-                            is_part_of_name = (
-                                any(p in word_clean for p in sender_parts if len(p) > 2) or
-                                any(word_clean in p for p in sender_parts if len(word_clean) > 2)
-                            )
-                        
-                        if is_part_of_name:
-                            strip_idx = i + 1
-                        else:
-                            # Also check if the word is just punctuation/brackets left over
-                            if re.sub(r'^[\[\]\(\)\+!#:;,\. ]+', '', msg_words[i]) == "":
-                                strip_idx = i + 1
-                                continue
-                            break
-                    
-                    if strip_idx > 0:
-                        parsed["message"] = " ".join(msg_words[strip_idx:]).strip()
-                        # Final cleanup for any leftover colon/dots/brackets from the name
-                        # But be careful NOT to strip actual Cyrillic or Alpha characters
-                        parsed["message"] = re.sub(r"^[ :;.,\.\+\]\)!#|]+", "", parsed["message"]).strip()
-                
-                # --- PASS 3: Refined Russian OCR for Message Part ---
-                # If we have a message, let's re-scan it with just Russian to be sure.
-                if parsed["message"] and len(parsed["message"]) > 1:
-                    # Dynamically find where the message starts horizontally
-                    # We look for the word in Pass 1 that matches the first word of our cleaned message
-                    first_msg_word = parsed["message"].split()[0]
-                    clean_first = re.sub(r'\W+', '', first_msg_word.lower())
-                    
-                    # Default: 30% of width
-                    x_offset = int(screenshot.width * 0.3) * 3 
-                    
-                    for w_obj in line_words:
-                        w_clean = re.sub(r'\W+', '', w_obj["text"].lower())
-                        if clean_first and w_clean == clean_first:
-                            # Found it! Start slightly earlier to be safe
-                            x_offset = max(0, w_obj["left"] - 20)
-                            break
-                        elif w_obj["left"] > screenshot.width * 1.5: # 0.5 * 3
-                            # If we've passed 50% of screen without finding it, just use current x_offset
-                            break
-
-                    # If the message looks like it has Russian or is being misidentified as "ga"
-                    if re.search(r'[а-яА-ЯёЁ]', parsed["message"]) or "ga " in parsed["message"].lower() or "He " in parsed["message"]:
-                         refined = self.ocr_service.extract_refined_message(hsv, y_bounds, x_offset, validated_mask, lang='rus')
-                         if refined and len(refined) > 2:
-                             # Use the refined version if it found Cyrillic
-                             if re.search(r'[а-яА-ЯёЁ]', refined):
-                                 # Apply surgical cleanup to the refined text too
-                                 refined_clean = re.sub(r"^[ :;.,\.\+\]\)!#|]+", "", refined).strip()
-                                 parsed["message"] = refined_clean
-
-                # Translation pass
-                original_msg = parsed["message"]
-                if original_msg:
-                    _, translated_msg = self.translation_service.translate_text(original_msg, "und")
-                    parsed["translated_message"] = translated_msg
-                else:
-                    parsed["translated_message"] = ""
-
-                processed_messages.append(parsed)
-
-            self.root.after(0, lambda: self.display_translation(processed_messages))
+            self.root.after(0, lambda: self._display_traced(processed_messages, snapshot_id))
 
         except Exception as e:
             self.safe_notify(f"Error: {e}")
+            self.ocr_service.debug.flush_on_error()
             import traceback
             traceback.print_exc()
 
+    def _track_chat_region(self, screenshot):
+        """Moves or shrinks the chat region after this capture if the chat drifted."""
+        region = self.region_locator.track(screenshot, self.chat_region, ScreenCapture().capture_region)
+        if region != self.chat_region:
+            self.chat_region = region
+            self.root.after(0, lambda: self.config.set_chat_region(region))
+            self.safe_notify(f"Chat region adjusted: {region}")
+
+    def _display_traced(self, processed_messages, snapshot_id):
+        # Runs later on the Tk thread, so the span names its snapshot explicitly
+        with self.tracer.span("render", snapshot_id=snapshot_id):
+            self.display_translation(processed_messages)
 
     def display_translation(self, processed_messages):
         self.translation_display.config(state=tk.NORMAL)
@@ -591,98 +556,6 @@ class DotaChatTranslatorApp:
             self.screenshot_label.config(image="", text="No capture")
 
 
-# =====================================================
-# CHAT PARSING
-# =====================================================
-
-    def parse_chat_line(self, chat_line):
-        parsed = {
-            "tag": None,
-            "sender": None,
-            "message": chat_line.strip()
-        }
-
-        temp_line = chat_line.strip()
-
-        # 1. Tag Detection
-        # Matches [Allies], (Allies), [All], [Team], [Squelched], etc.
-        # Allowing for slight OCR errors like (Allies] or [Alies]
-        tag_pattern = r"^[\[\(]?(Allies|Team|All|Squelch\w*|Party)[\]\)]?\s*(.*)"
-        tag_match = re.search(tag_pattern, temp_line, re.IGNORECASE)
-        
-        if tag_match:
-            parsed["tag"] = tag_match.group(1).capitalize()
-            # If tag was missing brackets, we still count it but clean the text
-            temp_line = tag_match.group(2).strip()
-        else:
-            # Fallback for even noisier tags: look for the words anywhere near start
-            loose_tag_match = re.search(r"(Allies|All|Team|Party)", temp_line[:15], re.IGNORECASE)
-            if loose_tag_match:
-                parsed["tag"] = loose_tag_match.group(1).capitalize()
-                # Remove the tag word and any surrounding non-alnum noise
-                temp_line = re.sub(r"^[^\w\d]*" + re.escape(loose_tag_match.group(0)) + r"[^\w\d]*", "", temp_line, flags=re.IGNORECASE).strip()
-
-        # 2. Sender Detection
-        # Case A: Colon, Semicolon, or common OCR misreads (like . or i at the end of a word)
-        # We look for a delimiter within the first 30 characters
-        # Delimiters: : ; ! | and sometimes dots if they follow a bracket/name
-        sender_match = re.search(r"^([^:;!\|]{1,30})[:;!\|](.*)", temp_line)
-        if not sender_match:
-            # Fallback for dots or common colon misreads as 'i' or 'l'
-            # Only if it follows a likely name structure (like ending in a bracket)
-            sender_match = re.search(r"^([^:;]{1,30}[\]\)])[\.\sil](.*)", temp_line)
-            
-        if not sender_match:
-            # Look for a space and a dot (common misread of ' :')
-            sender_match = re.search(r"^([^:;]{1,30})\s\.(.*)", temp_line)
-
-        if sender_match:
-            potential_sender = sender_match.group(1).strip()
-            message_part = sender_match.group(2).strip()
-
-            # Validate sender: at least 1 alphanumeric character
-            if any(c.isalnum() for c in potential_sender):
-                parsed["sender"] = potential_sender
-                parsed["message"] = message_part
-                if len(potential_sender) > 2:
-                    self.register_sender(potential_sender)
-            else:
-                parsed["message"] = temp_line
-        
-        # Case B: No colon, check against registry or look for first word
-        else:
-            words = temp_line.split(" ")
-            if words:
-                first_word = words[0].rstrip(":;,. ").strip()
-                if first_word.lower() in self.sender_registry:
-                    parsed["sender"] = first_word
-                    parsed["message"] = " ".join(words[1:]).strip()
-                
-                # Case C: No colon, but we have a tag - first word is VERY likely the sender
-                elif parsed["tag"] and len(words) > 1:
-                    potential_sender = words[0].strip()
-                    # If it's a plausible name length and not just punctuation
-                    if 1 <= len(potential_sender) <= 20 and any(c.isalnum() for c in potential_sender):
-                        parsed["sender"] = potential_sender
-                        parsed["message"] = " ".join(words[1:]).strip()
-                        self.register_sender(potential_sender)
-                    else:
-                        parsed["message"] = temp_line
-                else:
-                    parsed["message"] = temp_line
-
-        # Final surgical cleanup
-        # We only want to remove leading colons/semicolons and surrounding whitespace
-        # that Tesseract sometimes orphans at the start of the message part.
-        parsed["message"] = re.sub(r"^[ :;.,\.]+", "", parsed["message"]).strip()
-        
-        # If the resulting message is just one char or nonsense, discard it
-        if len(parsed["message"]) < 2 and not any(c.isalnum() for c in parsed["message"]):
-             parsed["message"] = ""
-
-        return parsed
-
-
 # =====================================================
 # SETTINGS WINDOW
 # =====================================================
@@ -706,7 +579,24 @@ class DotaChatTranslatorApp:
             self.ocr_langs_str,
             self.set_ocr_langs,
             self.ocr_dashboard_str,
-            self.set_ocr_dashboard
+            self.set_ocr_dashboard,
+            self.watch_mode,
+            self.set_watch_mode,
+            self.watch_interval_ms,
+            self.set_watch_interval,
+            self.debug_capture,
+            self.set_debug_capture,
+            self.save_debug_snapshots,
+            self.ocr_workers,
+            self.set_ocr_workers,
+            self.tracing,
+            self.set_tracing,
+            self.show_timings,
+            self.reset_sender_cache,
+            self.auto_locate_chat_region,
+            self.auto_region,
+            self.set_auto_region,
+            self.translation_service.get_usage_summary()
         )
 
 
@@ -723,10 +613,40 @@ class DotaChatTranslatorApp:
         if region:
             self.chat_region = region
             self.config.set_chat_region(region)
+            self.region_locator.reset()
             self.update_notification(f"Region set: {region}")
         else:
             self.update_notification("Selection cancelled.")
 
+    def auto_locate_chat_region(self, window_to_hide=None):
+        """Grabs the whole screen once and sets the chat region to the detected chat block."""
+        # Neither the app nor the settings window may cover the chat in the grab
+        windows = [self.root] + ([window_to_hide] if window_to_hide is not None else [])
+        for window in windows:
+            window.withdraw()
+        self.root.update()
+        time.sleep(0.3) # Let the windows disappear from the screen before grabbing it
+        try:
+            screen = ScreenCapture().capture_full_screen()
+        finally:
+            for window in reversed(windows):
+                window.deiconify()
+
+        region = self.region_locator.locate(screen)
+        if region:
+            self.chat_region = region
+            self.config.set_chat_region(region)
+            self.region_locator.reset()
+            self.update_notification(f"Chat found, region set: {region}")
+        else:
+            self.update_notification("No chat found on screen; open the chat or select the region by hand.")
+
+    def set_auto_region(self, enabled):
+        self.auto_region = enabled
+        self.config.set_auto_region(enabled)
+        self.region_locator.reset()
+        self.update_notification(f"Follow chat position {'on' if enabled else 'off'}.")
+
 
 # =====================================================
 # HOTKEY
@@ -750,13 +670,92 @@ class DotaChatTranslatorApp:
     def set_ocr_langs(self, langs_str):
         self.ocr_langs_str = langs_str
         self.config.set_ocr_langs(langs_str)
-        self.ocr_service.set_ocr_langs(langs_str)
+        # The worker pool restarts; wait for a running snapshot like set_ocr_workers does
+        with self.pipeline_lock:
+            self.ocr_service.set_ocr_langs(langs_str)
+            if self.ocr_pool:
+                self.ocr_pool.set_ocr_langs(langs_str)
         self.update_notification(f"OCR languages: {langs_str}")
 
     def set_ocr_dashboard(self, dashboard_str):
         self.ocr_dashboard_str = dashboard_str
         self.config.set_ocr_dashboard(dashboard_str)
 
+    def set_watch_mode(self, enabled):
+        self.watch_mode = enabled
+        self.config.set_watch_mode(enabled)
+        if enabled:
+            if self._start_watch():
+                self.update_notification("Watch mode on.")
+            else:
+                self.update_notification("Watch mode is still stopping; try again in a moment.")
+        else:
+            self._stop_watch()
+            self.update_notification("Watch mode off.")
+
+    def _start_watch(self):
+        started = self.watch_service.start()
+        with self.pipeline_lock:
+            self._apply_ocr_pool()
+        return started
+
+    def _stop_watch(self):
+        self.watch_service.stop()
+        with self.pipeline_lock:
+            self._apply_ocr_pool()
+
+    def _apply_ocr_pool(self):
+        """
+        Per-line passes use the worker pool, except while watch mode is on:
+        watching keeps to one core, so its snapshots run the passes in-thread.
+        Call with pipeline_lock held.
+        """
+        self.chat_pipeline.ocr_pool = None if self.watch_service.is_running() else self.ocr_pool
+
+    def set_debug_capture(self, enabled):
+        self.debug_capture = enabled
+        self.config.set_debug_capture(enabled)
+        self.ocr_service.debug.set_enabled(enabled)
+        self.update_notification(f"OCR debug recording {'on' if enabled else 'off'}.")
+
+    def save_debug_snapshots(self):
+        count = self.ocr_service.debug.flush()
+        if count:
+            self.update_notification(f"Saving {count} debug snapshot(s) to '{self.ocr_service.debug.output_dir}'...")
+        else:
+            self.update_notification("No debug snapshots recorded.")
+
+    def set_tracing(self, enabled):
+        self.tracing = enabled
+        self.config.set_tracing(enabled)
+        self.tracer.set_enabled(enabled)
+        self.update_notification(f"Stage timings {'on' if enabled else 'off'}.")
+
+    def show_timings(self):
+        TimingsWindow(self.root, self.tracer, self.update_notification)
+
+    def reset_sender_cache(self):
+        with self.pipeline_lock:
+            self.chat_pipeline.sender_slots.reset()
+        self.update_notification("Player names forgotten; they will be read again.")
+
+    def set_ocr_workers(self, workers):
+        workers = max(1, min(int(workers), MAX_OCR_WORKERS))
+        self.ocr_workers = workers
+        self.config.set_ocr_workers(workers)
+        with self.pipeline_lock:
+            if self.ocr_pool:
+                self.ocr_pool.shutdown()
+            self.ocr_pool = OcrWorkerPool(self.ocr_service.ocr_langs, workers) if workers > 1 else None
+            self._apply_ocr_pool()
+        self.update_notification(f"OCR worker processes: {workers}")
+
+    def set_watch_interval(self, interval_ms):
+        self.watch_interval_ms = interval_ms
+        self.config.set_watch_interval_ms(interval_ms)
+        self.watch_service.set_interval(interval_ms)
+        self.update_notification(f"Watch interval: {interval_ms} ms")
+
 
 # =====================================================
 # UTILITIES
@@ -792,7 +791,11 @@ class DotaChatTranslatorApp:
 
 
     def on_closing(self):
+        self._stop_watch()
+        if self.ocr_pool:
+            self.ocr_pool.shutdown()
         self.keybinding_service.stop_listener()
+        self.translation_service.cache.close()
         self.root.destroy()
 
 # =====================================================
@@ -835,7 +838,24 @@ class SettingsWindow(tk.Toplevel):
         current_ocr_langs,
         set_ocr_langs_cb,
         current_ocr_dashboard,
-        set_ocr_dashboard_cb
+        set_ocr_dashboard_cb,
+        current_watch_mode,
+        set_watch_mode_cb,
+        current_watch_interval,
+        set_watch_interval_cb,
+        current_debug_capture,
+        set_debug_capture_cb,
+        save_debug_cb,
+        current_ocr_workers,
+        set_ocr_workers_cb,
+        current_tracing,
+        set_tracing_cb,
+        show_timings_cb,
+        reset_senders_cb,
+        auto_locate_cb,
+        current_auto_region,
+        set_auto_region_cb,
+        translation_usage
     ):
         super().__init__(master)
         self.title("Settings")
@@ -852,6 +872,13 @@ class SettingsWindow(tk.Toplevel):
         self.set_target_lang = set_target_lang_cb
         self.set_ocr_langs = set_ocr_langs_cb
         self.set_ocr_dashboard = set_ocr_dashboard_cb
+        self.set_watch_mode = set_watch_mode_cb
+        self.set_watch_interval = set_watch_interval_cb
+        self.set_debug_capture = set_debug_capture_cb
+        self.set_tracing = set_tracing_cb
+        self.set_ocr_workers = set_ocr_workers_cb
+        self.auto_locate = auto_locate_cb
+        self.set_auto_region = set_auto_region_cb
 
         # Match theme background
         bg_color = "#313338" if current_theme == "Dark" else "#F2F3F5"
@@ -891,6 +918,20 @@ class SettingsWindow(tk.Toplevel):
             command=self._on_select_region_button_click
         ).pack(fill=tk.X, pady=5)
 
+        ttk.Button(
+            region_frame,
+            text="Auto-Locate Chat",
+            command=self._on_auto_locate_button_click
+        ).pack(fill=tk.X, pady=5)
+
+        self.auto_region_var = tk.BooleanVar(value=current_auto_region)
+        ttk.Checkbutton(
+            region_frame,
+            text="Follow chat position automatically",
+            variable=self.auto_region_var,
+            command=lambda: self.set_auto_region(self.auto_region_var.get())
+        ).pack(anchor="w", pady=(5, 0))
+
         # Languages
         lang_frame = ttk.LabelFrame(self.main, text="Languages", padding=10)
         lang_frame.pack(fill=tk.X, padx=20, pady=10)
@@ -962,6 +1003,66 @@ class SettingsWindow(tk.Toplevel):
             command=self.save_hotkey
         ).pack(fill=tk.X, pady=5)
 
+        # Watch Mode
+        watch_frame = ttk.LabelFrame(self.main, text="Watch Mode", padding=10)
+        watch_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        self.watch_var = tk.BooleanVar(value=current_watch_mode)
+        ttk.Checkbutton(
+            watch_frame,
+            text="Translate automatically when chat changes",
+            variable=self.watch_var,
+            command=lambda: self.set_watch_mode(self.watch_var.get())
+        ).pack(anchor="w", pady=(0, 5))
+
+        ttk.Label(watch_frame, text="Check Interval (ms)").pack(anchor="w")
+        interval_row = ttk.Frame(watch_frame)
+        interval_row.pack(fill=tk.X)
+
+        self.watch_interval_var = tk.IntVar(value=current_watch_interval)
+        ttk.Spinbox(
+            interval_row,
+            from_=100,
+            to=5000,
+            increment=100,
+            textvariable=self.watch_interval_var
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+
+        ttk.Button(
+            interval_row,
+            text="Save",
+            command=self.save_watch_interval
+        ).pack(side=tk.RIGHT)
+
+        # Performance
+        perf_frame = ttk.LabelFrame(self.main, text="Performance", padding=10)
+        perf_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        ttk.Label(perf_frame, text=f"OCR Worker Processes (1-{MAX_OCR_WORKERS})").pack(anchor="w")
+        workers_row = ttk.Frame(perf_frame)
+        workers_row.pack(fill=tk.X)
+
+        self.ocr_workers_var = tk.IntVar(value=current_ocr_workers)
+        ttk.Spinbox(
+            workers_row,
+            from_=1,
+            to=MAX_OCR_WORKERS,
+            textvariable=self.ocr_workers_var
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+
+        ttk.Button(
+            workers_row,
+            text="Save",
+            command=self.save_ocr_workers
+        ).pack(side=tk.RIGHT)
+
+        # Player names are remembered per name color for the whole match
+        ttk.Button(
+            perf_frame,
+            text="Forget Player Names (new match)",
+            command=reset_senders_cb
+        ).pack(fill=tk.X, pady=(10, 0))
+
         # Appearance (Font & Theme)
         appearance_frame = ttk.LabelFrame(self.main, text="Appearance", padding=10)
         appearance_frame.pack(fill=tk.X, padx=20, pady=10)
@@ -1033,6 +1134,46 @@ class SettingsWindow(tk.Toplevel):
             command=self.authorize
         ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
 
+        # Free tier usage this month, with what the translation cache saved
+        ttk.Label(
+            gcp_frame,
+            text=translation_usage,
+            wraplength=440,
+            justify=tk.LEFT
+        ).pack(anchor="w", pady=(8, 0))
+
+        # OCR Debugging
+        debug_frame = ttk.LabelFrame(self.main, text="OCR Debugging", padding=10)
+        debug_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        self.debug_var = tk.BooleanVar(value=current_debug_capture)
+        ttk.Checkbutton(
+            debug_frame,
+            text="Record intermediate OCR images (in memory)",
+            variable=self.debug_var,
+            command=lambda: self.set_debug_capture(self.debug_var.get())
+        ).pack(anchor="w", pady=(0, 5))
+
+        ttk.Button(
+            debug_frame,
+            text="Save Recorded Snapshots",
+            command=save_debug_cb
+        ).pack(fill=tk.X, pady=5)
+
+        self.tracing_var = tk.BooleanVar(value=current_tracing)
+        ttk.Checkbutton(
+            debug_frame,
+            text="Record stage timings",
+            variable=self.tracing_var,
+            command=lambda: self.set_tracing(self.tracing_var.get())
+        ).pack(anchor="w", pady=(10, 5))
+
+        ttk.Button(
+            debug_frame,
+            text="Show Timings",
+            command=show_timings_cb
+        ).pack(fill=tk.X, pady=5)
+
 
     def _on_select_region_button_click(self):
         # Release the grab on this SettingsWindow before starting region selection
@@ -1045,6 +1186,12 @@ class SettingsWindow(tk.Toplevel):
         # Re-establish the grab on this SettingsWindow after selection is complete
         self.grab_set()
 
+    def _on_auto_locate_button_click(self):
+        # Same as manual selection: this window is hidden while the screen is grabbed
+        self.grab_release()
+        self.auto_locate(window_to_hide=self)
+        self.grab_set()
+
 
 # =====================================================
 # SETTINGS HELPERS
@@ -1166,6 +1313,24 @@ class SettingsWindow(tk.Toplevel):
         self.notify(f"Theme set to {new_theme}")
 
 
+    def save_watch_interval(self):
+        try:
+            interval_ms = int(self.watch_interval_var.get())
+        except (tk.TclError, ValueError):
+            self.notify("Invalid interval.")
+            return
+        self.set_watch_interval(max(100, interval_ms))
+
+
+    def save_ocr_workers(self):
+        try:
+            workers = int(self.ocr_workers_var.get())
+        except (tk.TclError, ValueError):
+            self.notify("Invalid worker count.")
+            return
+        self.set_ocr_workers(workers)
+
+
     def save_project(self):
         pid = self.project_id.get()
         self.config.set_project_id(pid)
@@ -1224,11 +1389,105 @@ class SettingsWindow(tk.Toplevel):
         self.notify(f"Saved hotkey: {val}")
 
 
+# =====================================================
+# TIMINGS WINDOW CLASS
+# =====================================================
+
+class TimingsWindow(tk.Toplevel):
+    """Per-stage timings of the last traced snapshots, with Chrome trace / JSON export."""
+
+    def __init__(self, master, tracer, notify_cb):
+        super().__init__(master)
+        self.title("Stage Timings")
+        self.geometry("640x520")
+        self.tracer = tracer
+        self.notify = notify_cb
+
+        main = ttk.Frame(self, padding=10)
+        main.pack(fill=tk.BOTH, expand=True)
+
+        if not tracer.enabled:
+            ttk.Label(main, text="Stage timings are off. Enable them in Settings -> OCR Debugging.").pack(anchor="w", pady=(0, 5))
+
+        # Snapshots: one row each, newest first
+        self.snapshot_tree = ttk.Treeview(main, columns=("time", "source", "total"), show="headings", height=8)
+        for col, title, width in (("time", "Time", 100), ("source", "Source", 100), ("total", "Total (ms)", 120)):
+            self.snapshot_tree.heading(col, text=title)
+            self.snapshot_tree.column(col, width=width, anchor="w")
+        self.snapshot_tree.pack(fill=tk.X)
+        self.snapshot_tree.bind("<<TreeviewSelect>>", lambda e: self.show_spans())
+
+        # Spans of the selected snapshot
+        self.span_tree = ttk.Treeview(main, columns=("stage", "line", "duration"), show="headings", height=12)
+        for col, title, width in (("stage", "Stage", 260), ("line", "Line", 60), ("duration", "Duration (ms)", 120)):
+            self.span_tree.heading(col, text=title)
+            self.span_tree.column(col, width=width, anchor="w")
+        self.span_tree.pack(fill=tk.BOTH, expand=True, pady=(10, 5))
+
+        # Counters of the selected snapshot (lines, cache hits)
+        self.stats_label = ttk.Label(main, text="", wraplength=600, justify=tk.LEFT)
+        self.stats_label.pack(fill=tk.X, pady=(0, 10))
+
+        buttons = ttk.Frame(main)
+        buttons.pack(fill=tk.X)
+        ttk.Button(buttons, text="Refresh", command=self.refresh).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Export Chrome Trace", command=self.export_chrome_trace).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="Export JSON", command=self.export_json).pack(side=tk.RIGHT, padx=5)
+
+        self.snapshots = {}
+        self.refresh()
+
+    def refresh(self):
+        selected = self.snapshot_tree.selection()
+        self.snapshot_tree.delete(*self.snapshot_tree.get_children())
+        self.snapshots = {}
+        for snapshot in reversed(self.tracer.get_snapshots()):
+            # Spans can overlap (e.g. capture inside the snapshot), so show the wall time they cover
+            spans = snapshot["spans"]
+            total = (max(sp["start_ms"] + sp["duration_ms"] for sp in spans) - min(sp["start_ms"] for sp in spans)) if spans else 0.0
+            iid = str(snapshot["id"])
+            self.snapshots[iid] = snapshot
+            self.snapshot_tree.insert("", tk.END, iid=iid, values=(snapshot["time"], snapshot["label"], f"{total:.1f}"))
+        if selected and selected[0] in self.snapshots:
+            self.snapshot_tree.selection_set(selected[0])
+        elif self.snapshots:
+            self.snapshot_tree.selection_set(next(iter(self.snapshots)))
+        self.show_spans()
+
+    def show_spans(self):
+        self.span_tree.delete(*self.span_tree.get_children())
+        self.stats_label.config(text="")
+        selected = self.snapshot_tree.selection()
+        if not selected or selected[0] not in self.snapshots:
+            return
+        stats = self.snapshots[selected[0]].get("stats", {})
+        self.stats_label.config(text=", ".join(f"{name}: {value}" for name, value in stats.items()))
+        for span in sorted(self.snapshots[selected[0]]["spans"], key=lambda sp: sp["start_ms"]):
+            line = "" if span["line"] is None else span["line"]
+            self.span_tree.insert("", tk.END, values=(span["name"], line, f"{span['duration_ms']:.2f}"))
+
+    def export_chrome_trace(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json", initialfile="ocr_trace.json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if path:
+            self.tracer.export_chrome_trace(path)
+            self.notify(f"Trace saved to {path} (open in chrome://tracing or Perfetto).")
+
+    def export_json(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json", initialfile="ocr_timings.json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            self.tracer.export_json(path)
+            self.notify(f"Timings saved to {path}.")
+
+
 # =====================================================
 # RUN
 # =====================================================
 
 if __name__ == "__main__":
+    # Needed for the OCR worker processes in a PyInstaller build
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = DotaChatTranslatorApp(root)
     root.mainloop()
@@ -0,0 +1,71 @@
+class Word:
+    """One recognized word of a line; left/width are in frame pixels."""
+    __slots__ = ("text", "left", "width")
+
+    def __init__(self, text, left, width):
+        self.text = text
+        self.left = left
+        self.width = width
+
+    def __repr__(self):
+        return f"Word({self.text!r}, left={self.left}, width={self.width})"
+
+
+class Line:
+    """
+    One chat line of a snapshot. Holds no image data; the per-line passes read
+    the owning Frame's arrays within y_bounds.
+    """
+    __slots__ = ("text", "y_bounds", "words", "source_y_bounds", "fingerprint", "status", "changed", "tag", "sender_x")
+
+    def __init__(self, text, y_bounds, words):
+        self.text = text
+        self.y_bounds = y_bounds # (y_min, y_max) in frame pixels
+        self.words = words # Tuple of Word, left to right
+        self.source_y_bounds = None # y_bounds mapped back to capture pixels
+        self.fingerprint = None
+        self.status = None # 'new', 'moved' or 'unchanged'
+        self.changed = True
+        self.tag = None # Channel tag matched before OCR (its ink is not in words)
+        self.sender_x = None # Frame column right after the matched tag
+
+    def shifted(self, dx, dy):
+        """Copy of the text layout moved by (dx, dy), used for the frame-level cache."""
+        y1, y2 = self.y_bounds
+        return Line(self.text, (y1 + dy, y2 + dy), tuple(Word(w.text, w.left + dx, w.width) for w in self.words))
+
+    def __repr__(self):
+        return f"Line({self.text!r}, y_bounds={self.y_bounds}, status={self.status!r})"
+
+
+class Frame:
+    """
+    Per-snapshot OCR state: the preprocessed HSV image, its label image and the
+    validated text mask are stored once here and shared by all lines. Call
+    release() when the snapshot is done so long sessions never keep old
+    frames alive through a stray line reference.
+    """
+    __slots__ = ("hsv", "labels", "mask", "scale", "band_map", "lines")
+
+    def __init__(self, hsv=None, labels=None, mask=None, scale=3, band_map=None, lines=None):
+        self.hsv = hsv
+        self.labels = labels # Per-pixel class / player slot
+        self.mask = mask # Validated (denoised) text mask
+        self.scale = scale # Frame pixels per capture pixel
+        self.band_map = band_map or []
+        self.lines = lines or []
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __getitem__(self, index):
+        return self.lines[index]
+
+    def release(self):
+        """Drops the image arrays; the text lines stay usable."""
+        self.hsv = None
+        self.labels = None
+        self.mask = None
@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+# Never take more than half the machine (and at most 4 processes) for OCR,
+# the game needs the rest.
+MAX_OCR_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+# Per-process OcrService, created once by the pool initializer
+_worker_service = None
+
+
+@contextmanager
+def _single_threaded_children():
+    """
+    OMP_THREAD_LIMIT=1 in the environment of processes started inside the
+    block. Tesseract's OpenMP runtime reads it once, when the library loads;
+    a spawned worker loads it while re-importing the app's main module, before
+    the pool initializer runs, so the limit has to be there at process start.
+    """
+    previous = os.environ.get("OMP_THREAD_LIMIT")
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["OMP_THREAD_LIMIT"]
+        else:
+            os.environ["OMP_THREAD_LIMIT"] = previous
+
+
+def _warm_up():
+    """No-op task; submitting one per worker starts every process right away."""
+    return None
+
+
+def _init_worker(ocr_langs):
+    global _worker_service
+    # One thread per worker process; parallelism comes from the pool itself
+    cv2.setNumThreads(1)
+
+    from ocr_service import OcrService
+    _worker_service = OcrService(ocr_langs=ocr_langs)
+    _worker_service.batch_mode = False
+
+
+def _attach_frame(frame_spec):
+    """Maps the parent's shared-memory frame arrays without copying them."""
+    handles = []
+    arrays = {}
+    for key, (name, shape, dtype) in frame_spec.items():
+        shm = shared_memory.SharedMemory(name=name)
+        handles.append(shm)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return handles, arrays
+
+
+def _run_sender_task(frame_spec, y_bounds, lang):
+    handles, arrays = _attach_frame(frame_spec)
+    try:
+        return _worker_service.extract_sender_from_line(arrays["hsv"], y_bounds, arrays.get("labels"), arrays.get("mask"), lang)
+    finally:
+        arrays.clear() # Drop the views before closing the mappings
+        for shm in handles:
+            shm.close()
+
+
+def _run_refined_task(frame_spec, y_bounds, x_start_px, lang):
+    handles, arrays = _attach_frame(frame_spec)
+    try:
+        return _worker_service.extract_refined_message(arrays["hsv"], y_bounds, x_start_px, arrays["mask"], lang=lang)
+    finally:
+        arrays.clear()
+        for shm in handles:
+            shm.close()
+
+
+class OcrWorkerPool:
+    """
+    Runs the per-line sender and refined OCR passes on a pool of worker
+    processes, each holding its own OcrService (and Tesseract engine)
+    initialised once. Frame arrays are placed in shared memory once per
+    snapshot, and workers map them instead of receiving pickled copies.
+    Exposes the same batch methods as OcrService, with results in screen order.
+    """
+
+    def __init__(self, ocr_langs, workers):
+        self.ocr_langs = ocr_langs
+        self.workers = max(1, min(int(workers), MAX_OCR_WORKERS))
+        self.executor = None
+        self._shared = [] # SharedMemory blocks of the current frame
+        self._shared_spec = None
+        self._shared_source = None # (hsv, labels, mask) currently shared
+        self._start()
+
+    def _start(self):
+        # Spawned workers (as on Windows) start from a fresh interpreter that
+        # reads the environment, also where fork is the default
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker, initargs=(self.ocr_langs,))
+        with _single_threaded_children():
+            # Workers are started on demand; start them all while the limit is set
+            for _ in range(self.workers):
+                self.executor.submit(_warm_up)
+
+    def set_ocr_langs(self, langs_str):
+        """Restarts the workers with new languages. Callers must make sure no snapshot is in flight."""
+        self.ocr_langs = langs_str.replace(",", "+")
+        self.executor.shutdown(wait=True)
+        self._start()
+
+    def _share_frame(self, hsv, labels, validated_mask):
+        """Copies the frame arrays into shared memory, reusing them for the same frame."""
+        current = self._shared_source
+        if current is not None and current[0] is hsv and current[2] is validated_mask and (labels is None or current[1] is labels):
+            return self._shared_spec
+        self.release_frame()
+
+        spec = {}
+        for key, array in (("hsv", hsv), ("labels", labels), ("mask", validated_mask)):
+            if array is None:
+                continue
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            self._shared.append(shm)
+            spec[key] = (shm.name, array.shape, array.dtype.str)
+        self._shared_spec = spec
+        # Keep the source arrays referenced so identity checks stay valid
+        self._shared_source = (hsv, labels, validated_mask)
+        return spec
+
+    def release_frame(self):
+        """Frees the shared copy of the current frame; call once a snapshot is done."""
+        for shm in self._shared:
+            shm.close()
+            shm.unlink()
+        self._shared = []
+        self._shared_spec = None
+        self._shared_source = None
+
+    def extract_senders_batch(self, hsv, y_bounds_list, labels=None, validated_mask=None, lang=None):
+        if not y_bounds_list:
+            return []
+        spec = self._share_frame(hsv, labels, validated_mask)
+        futures = [self.executor.submit(_run_sender_task, spec, y_bounds, lang) for y_bounds in y_bounds_list]
+        return [future.result() for future in futures]
+
+    def extract_refined_messages_batch(self, hsv, requests, validated_mask, lang='rus'):
+        if not requests:
+            return []
+        spec = self._share_frame(hsv, None, validated_mask)
+        futures = [self.executor.submit(_run_refined_task, spec, y_bounds, x_start_px, lang) for y_bounds, x_start_px in requests]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.release_frame()
@@ -1,102 +1,239 @@
+import bisect
 import numpy as np
 import cv2
 import pytesseract
-from pytesseract import Output
 from PIL import Image
 import re
+import time
 from collections import defaultdict
 
+from tesseract_engine import TesseractEngine
+from line_tracker import LineTracker
+from recognition_cache import RecognitionCache
+from debug_recorder import DebugRecorder
+from tag_matcher import TagMatcher
+from ocr_frame import Frame, Line, Word
+from tracing import Tracer
+
 # NOTE: You must have Tesseract installed on your system for this to work.
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
+# White rows between strips when several crops are tiled onto one OCR canvas
+STRIP_GAP = 30
+
+# Packed HSV classifier labels: the low nibble is the pixel class,
+# bit 4 marks a drop-shadow pixel (V <= 60) independently of the class.
+LABEL_NONE = 0
+LABEL_WHITE = 1
+LABEL_SLOT_BASE = 2 # 2-11 = player slot 0-9 in dota_player_colors order
+LABEL_CLASS_MASK = 0x0F
+LABEL_SHADOW_BIT = 0x10
+
+# 256-entry tables turning a label image into 0/255 masks with one cv2.LUT call
+_label_values = np.arange(256)
+WHITE_MASK_TABLE = np.where((_label_values & LABEL_CLASS_MASK) == LABEL_WHITE, 255, 0).astype(np.uint8)
+COLOR_MASK_TABLE = np.where((_label_values & LABEL_CLASS_MASK) >= LABEL_SLOT_BASE, 255, 0).astype(np.uint8)
+SHADOW_MASK_TABLE = np.where(_label_values & LABEL_SHADOW_BIT, 255, 0).astype(np.uint8)
+
+# ROI-first preprocessing (native-resolution pixels unless noted)
+ROI_BAND_PAD = 4 # Rows kept above/below each detected text band
+ROI_BAND_MAX_GAP = 3 # Ink-free rows allowed inside one band
+ROI_MIN_BAND_HEIGHT = 5
+ROI_TARGET_BAND_HEIGHT = 66 # Upscaled band height the 3x pipeline is tuned for
+ROI_BAND_GAP = 12 # Empty rows between stacked bands, in upscaled pixels per scale unit
+
+# Projection-profile line segmentation of the validated mask (capture pixels, multiplied by the frame scale)
+SEGMENT_MAX_GAP = 1 # Ink-free rows allowed inside one line (accents, dots)
+SEGMENT_MIN_HEIGHT = 4
+SEGMENT_SPLIT_RATIO = 1.7 # Bands this much taller than the median are split at their emptiest row
+SEGMENT_STRIP_PAD = 20 # White border around each band strip, in frame pixels
+
+
+def find_row_bands(row_has_ink, max_gap=0, min_height=1):
+    """
+    Turns a boolean per-row ink profile into (start, end) row ranges.
+    Runs separated by at most max_gap empty rows are merged.
+    """
+    rows = np.flatnonzero(row_has_ink)
+    if rows.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) > max_gap + 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+    return [(int(a), int(b)) for a, b in zip(starts, ends) if b - a >= min_height]
+
 class OcrService:
-    def __init__(self, ocr_langs="eng+rus+spa+por+chi_sim+tur"):
+    def __init__(self, ocr_langs="eng+rus+spa+por+chi_sim+tur", engine=None):
         self.ocr_langs = ocr_langs
+        # Long-lived Tesseract handles, one per language set
+        self.engine = engine if engine is not None else TesseractEngine()
+        # Recognize all per-line strips of a snapshot with one OCR call per pass.
+        # The tiled canvas is read with psm 6, so a strip can come out different
+        # from the single-line psm 7 refined pass; only worth it when every call
+        # spawns tesseract.exe, the in-process engine reads strips one by one
+        self.batch_mode = self.engine.backend != "tesserocr"
+        # Two-stage preprocessing: find text bands at native resolution and
+        # upscale/sharpen only those
+        self.roi_preprocess = False
+        # Pass 1 line segmentation: 'words' runs one psm 6 pass over the whole
+        # mask and groups words by y-center; 'bands' cuts the mask into lines by
+        # its row projection and recognizes each band with psm 7
+        self.segmentation = "words"
+        # Per-line fingerprints of the previous snapshot, for incremental OCR
+        self.line_tracker = LineTracker()
+        # LRU of recognized text / senders / refined messages per line image
+        self.recognition_cache = RecognitionCache()
+        # Channel tag templates ([Allies], [All], ...), learned from clean lines
+        self.tag_matcher = TagMatcher()
+        # Intermediate images, kept in memory only when debugging is switched on
+        self.debug = DebugRecorder()
+        # Milliseconds per stage of the last extract_text_from_image call
+        self.stage_ms = {}
+        # Per-stage spans; the app replaces this with its shared tracer
+        self.tracer = Tracer()
         # Precise HSV ranges for the 10 Dota 2 player colors
+        # Disjoint hue ranges around each slot's color (OpenCV hue, 0-179), so
+        # every slot label can be produced. Boundaries sit halfway between
+        # neighbouring slot hues.
         self.dota_player_colors = [
-            ((100, 150, 50), (130, 255, 255)), # Blue
-            ((80, 150, 50), (100, 255, 255)),  # Teal
-            ((130, 150, 50), (160, 255, 255)), # Purple
-            ((22, 150, 50), (40, 255, 255)),   # Yellow
-            ((5, 150, 50), (22, 255, 255)),    # Orange
-            ((140, 150, 50), (175, 255, 255)), # Pink
-            ((35, 150, 50), (60, 255, 255)),   # Olive/Lime
-            ((85, 150, 50), (115, 255, 255)),  # Light Blue
-            ((55, 100, 40), (85, 255, 255)),   # Dark Green
-            ((0, 150, 40), (15, 255, 255)),    # Brown
+            ((103, 150, 50), (130, 255, 255)), # Blue (hue ~109)
+            ((73, 150, 50), (86, 255, 255)),   # Teal (~77)
+            ((131, 150, 50), (157, 255, 255)), # Purple (~150)
+            ((25, 150, 50), (32, 255, 255)),   # Yellow (~30)
+            ((0, 150, 50), (15, 255, 255)),    # Orange (~13)
+            ((158, 150, 50), (175, 255, 255)), # Pink (~165)
+            ((33, 150, 50), (50, 255, 255)),   # Olive/Lime (~35)
+            ((87, 150, 50), (102, 255, 255)),  # Light Blue (~96)
+            ((51, 100, 40), (72, 255, 255)),   # Dark Green (~67)
+            ((16, 150, 40), (24, 255, 255)),   # Brown (~19)
         ]
+        # Compiled (H,S,V) -> label table, rebuilt when the color ranges change
+        self._hsv_lut = None
+        self._hsv_lut_key = None
 
     def set_ocr_langs(self, langs_str):
         """Update the Tesseract language string (e.g., 'eng+rus')."""
         self.ocr_langs = langs_str.replace(",", "+")
 
-    def get_color_mask(self, hsv):
-        mask = np.zeros(hsv.shape[:2], dtype=np.uint8)
-        for (lower, upper) in self.dota_player_colors:
-            low = np.array([lower[0], 150, lower[2]]) # S > 150
-            mask = cv2.bitwise_or(mask, cv2.inRange(hsv, low, np.array(upper)))
-        return mask
+    def _get_hsv_lut(self):
+        """
+        Returns the packed classifier table, indexed by (H << 16) | (S << 8) | V.
+        Encodes the same rules as the old per-range cv2.inRange / threshold passes.
+        """
+        key = tuple(self.dota_player_colors)
+        if self._hsv_lut is None or self._hsv_lut_key != key:
+            lut = np.zeros((256, 256, 256), dtype=np.uint8)
+            # White: V > 185 and S <= 65
+            lut[:, :66, 186:] = LABEL_WHITE
+            # Player colors, S >= 150 for every range
+            for slot in range(len(self.dota_player_colors)):
+                lower, upper = self.dota_player_colors[slot]
+                lut[lower[0]:upper[0]+1, 150:upper[1]+1, lower[2]:upper[2]+1] = LABEL_SLOT_BASE + slot
+            # Shadow: V <= 60
+            lut[:, :, :61] |= LABEL_SHADOW_BIT
+            self._hsv_lut = lut.ravel()
+            self._hsv_lut_key = key
+        return self._hsv_lut
+
+    def classify_hsv(self, hsv):
+        """
+        One pass over the frame producing a label image: class in the low nibble
+        (0 = none, 1 = white, 2-11 = player slot) plus the shadow bit.
+        """
+        lut = self._get_hsv_lut()
+        # Pack V, S, H into the low three bytes of a uint32 per pixel
+        packed = np.zeros(hsv.shape[:2] + (4,), dtype=np.uint8)
+        cv2.mixChannels([np.ascontiguousarray(hsv)], [packed], [0, 2, 1, 1, 2, 0])
+        return lut.take(packed.view(np.uint32)[..., 0])
 
-    def get_white_mask(self, hsv):
-        h, s, v = cv2.split(hsv)
-        _, v_mask = cv2.threshold(v, 185, 255, cv2.THRESH_BINARY)
-        _, s_mask = cv2.threshold(s, 65, 255, cv2.THRESH_BINARY_INV)
-        return cv2.bitwise_and(v_mask, s_mask)
+    def get_color_mask(self, hsv, labels=None):
+        if labels is None:
+            labels = self.classify_hsv(hsv)
+        return cv2.LUT(labels, COLOR_MASK_TABLE)
+
+    def get_white_mask(self, hsv, labels=None):
+        if labels is None:
+            labels = self.classify_hsv(hsv)
+        return cv2.LUT(labels, WHITE_MASK_TABLE)
+
+    def get_shadow_mask(self, hsv, labels=None):
+        if labels is None:
+            labels = self.classify_hsv(hsv)
+        return cv2.LUT(labels, SHADOW_MASK_TABLE)
 
     def denoise_ui_elements(self, combined_mask, shadow_mask):
+        """
+        Keeps only text-like components: blobs touching a drop shadow that are
+        either anchors (tall glyphs with a bottom-aligned neighbour, or bracket
+        shapes) or sit close to an anchor. Works on the stats array and a label
+        lookup table, so the cost no longer grows with frame size per component.
+        """
         num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(combined_mask, connectivity=8)
         kernel_shadow = np.ones((5, 5), np.uint8)
         shadow_field = cv2.dilate(shadow_mask, kernel_shadow, iterations=1)
-        
-        candidates = []
-        for i in range(1, num_labels):
-            x, y, w, h, area = stats[i]
-            if not (4 < h < 85 and area > 2): continue # Inclusive geometry
-            
-            # Shadow Check
-            blob_roi = (labels[y:y+h, x:x+w] == i).astype(np.uint8) * 255
-            if cv2.countNonZero(cv2.bitwise_and(blob_roi, shadow_field[y:y+h, x:x+w])) > 0:
-                candidates.append(i)
-
-        anchors = set()
-        for i in candidates:
-            x1, y1, w1, h1, _ = stats[i]
-            y1_bottom = y1 + h1
-            
-            # Anchor: Requires a minimum height/area. No solidity filter.
-            if h1 > 10 and stats[i, cv2.CC_STAT_AREA] > 8: # Relaxed Anchor Rules
-                # Explicitly add brackets as anchors if they fit geometric profile
-                if 2 < w1 < 10 and h1 > 20: # Tall and thin (like [ or ])
-                    anchors.add(i)
-                    continue
 
-                for j in candidates:
-                    if i == j: continue
-                    y2_bottom = stats[j, cv2.CC_STAT_TOP] + stats[j, cv2.CC_STAT_HEIGHT]
-                    if abs(y1_bottom - y2_bottom) < 10: 
-                        if min(abs(x1 - (stats[j,0]+stats[j,2])), abs(stats[j,0] - (x1+w1))) < 150: 
-                            anchors.add(i)
-                            break
-
-        clean_mask = np.zeros_like(combined_mask)
-        for i in candidates:
-            if i in anchors:
-                clean_mask[labels == i] = 255
-                continue
-            x1, y1, w1, h1, _ = stats[i]
-            for a_idx in anchors:
-                ax, ay, aw, ah, _ = stats[a_idx]
-                if abs(y1 - ay) < 40: 
-                    if min(abs(x1 - (ax + aw)), abs(ax - (x1 + w1))) < 20:
-                        clean_mask[labels == i] = 255
-                        break
-                        
-        return clean_mask
+        xs = stats[:, cv2.CC_STAT_LEFT]
+        ys = stats[:, cv2.CC_STAT_TOP]
+        ws = stats[:, cv2.CC_STAT_WIDTH]
+        hs = stats[:, cv2.CC_STAT_HEIGHT]
+        areas = stats[:, cv2.CC_STAT_AREA]
+        bottoms = ys + hs
+        rights = xs + ws
+
+        # Shadow Check: number of shadow-field pixels under each label
+        shadow_hits = np.bincount(labels[shadow_field > 0], minlength=num_labels)
+
+        is_candidate = (hs > 4) & (hs < 85) & (areas > 2) & (shadow_hits > 0) # Inclusive geometry
+        is_candidate[0] = False
+        candidates = np.flatnonzero(is_candidate)
+
+        # Anchor: Requires a minimum height/area. No solidity filter.
+        anchor_ok = (hs > 10) & (areas > 8) # Relaxed Anchor Rules
+        # Explicitly add brackets as anchors if they fit geometric profile
+        is_anchor = is_candidate & anchor_ok & (ws > 2) & (ws < 10) & (hs > 20) # Tall and thin (like [ or ])
+
+        # Bottom-alignment rule: another candidate whose bottom is within 10px
+        # and whose horizontal gap is under 150px. Sorted sweep over bottoms.
+        by_bottom = candidates[np.argsort(bottoms[candidates], kind='stable')]
+        sorted_bottoms = bottoms[by_bottom]
+        for i in candidates[anchor_ok[candidates] & ~is_anchor[candidates]]:
+            lo = np.searchsorted(sorted_bottoms, bottoms[i] - 9, side='left')
+            hi = np.searchsorted(sorted_bottoms, bottoms[i] + 9, side='right')
+            js = by_bottom[lo:hi]
+            js = js[js != i]
+            if js.size == 0: continue
+            gap = np.minimum(np.abs(xs[i] - rights[js]), np.abs(xs[js] - rights[i]))
+            if np.any(gap < 150):
+                is_anchor[i] = True
+
+        keep = is_anchor.copy()
+
+        # Attach non-anchor candidates that sit within 40px vertically and 20px
+        # horizontally of an anchor. Sorted sweep over anchor tops.
+        anchors = np.flatnonzero(is_anchor)
+        if anchors.size:
+            by_top = anchors[np.argsort(ys[anchors], kind='stable')]
+            sorted_tops = ys[by_top]
+            for i in candidates[~is_anchor[candidates]]:
+                lo = np.searchsorted(sorted_tops, ys[i] - 39, side='left')
+                hi = np.searchsorted(sorted_tops, ys[i] + 39, side='right')
+                a_idx = by_top[lo:hi]
+                if a_idx.size == 0: continue
+                gap = np.minimum(np.abs(xs[i] - rights[a_idx]), np.abs(xs[a_idx] - rights[i]))
+                if np.any(gap < 20):
+                    keep[i] = True
+
+        # Single LUT remap from labels to the final mask
+        lut = np.where(keep, 255, 0).astype(combined_mask.dtype)
+        return lut[labels]
 
     def preprocess_image(self, pil_image):
-        width, height = pil_image.size
         # Resize to 3x
-        img_np = np.array(pil_image.resize((width * 3, height * 3), Image.Resampling.LANCZOS))
+        return self._upscale_and_sharpen(pil_image, 3)
+
+    def _upscale_and_sharpen(self, pil_image, scale):
+        width, height = pil_image.size
+        img_np = np.array(pil_image.resize((width * scale, height * scale), Image.Resampling.LANCZOS))
         
         # Convert to BGR for sharpening
         img_bgr = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
@@ -107,132 +244,418 @@ class OcrService:
         
         return cv2.cvtColor(sharpened, cv2.COLOR_BGR2HSV)
 
+    def native_text_mask(self, pil_image):
+        """
+        Shadowed white / player-colored text at capture resolution, without
+        upscaling. Returns (text mask, label image).
+        """
+        native_labels = self.classify_hsv(cv2.cvtColor(np.array(pil_image.convert("RGB")), cv2.COLOR_RGB2HSV))
+        text = cv2.bitwise_or(cv2.LUT(native_labels, WHITE_MASK_TABLE), cv2.LUT(native_labels, COLOR_MASK_TABLE))
+        shadow = cv2.dilate(cv2.LUT(native_labels, SHADOW_MASK_TABLE), np.ones((3, 3), np.uint8))
+        return cv2.bitwise_and(text, shadow), native_labels
+
+    def preprocess_image_roi(self, pil_image):
+        """
+        Two-stage preprocessing. A native-resolution pass finds rows holding
+        shadowed white/player-colored text. Only those bands are upscaled and
+        sharpened, at one scale chosen from the band height, and stacked into
+        a compact frame with empty gaps so lines never merge.
+        Returns (hsv, scale, band_map) where band_map holds
+        (frame_y0, frame_y1, source_y0) per band; (None, scale, []) if no text.
+        """
+        pil_image = pil_image.convert("RGB")
+        shadowed_text, _ = self.native_text_mask(pil_image)
+
+        bands = find_row_bands(np.count_nonzero(shadowed_text, axis=1) >= 2, ROI_BAND_MAX_GAP, ROI_MIN_BAND_HEIGHT)
+        if not bands:
+            return None, 3, []
+
+        height = shadowed_text.shape[0]
+        bands = [(max(0, y0 - ROI_BAND_PAD), min(height, y1 + ROI_BAND_PAD)) for y0, y1 in bands]
+        # Adaptive scale: bring the typical band to the height the masks are tuned for
+        median_height = float(np.median([y1 - y0 for y0, y1 in bands]))
+        scale = int(np.clip(round(ROI_TARGET_BAND_HEIGHT / median_height), 2, 4))
+
+        gap = np.zeros((ROI_BAND_GAP * scale, shadowed_text.shape[1] * scale, 3), dtype=np.uint8)
+        tiles = []
+        band_map = []
+        frame_y = 0
+        for y0, y1 in bands:
+            tile = self._upscale_and_sharpen(pil_image.crop((0, y0, pil_image.width, y1)), scale)
+            band_map.append((frame_y, frame_y + tile.shape[0], y0))
+            tiles.extend([tile, gap])
+            frame_y += tile.shape[0] + gap.shape[0]
+        return np.vstack(tiles), scale, band_map
+
+    def frame_to_source_y(self, y, scale, band_map):
+        """Maps a y coordinate in the (possibly compacted) frame back to capture pixels."""
+        if not band_map:
+            return y / scale
+        for frame_y0, frame_y1, source_y0 in band_map:
+            if y < frame_y1:
+                return source_y0 + max(0, y - frame_y0) / scale
+        frame_y0, _, source_y0 = band_map[-1]
+        return source_y0 + (y - frame_y0) / scale
+
+    def _mark_stage(self, stage, start):
+        """Stores the time since start under stage and returns the current time."""
+        now = time.perf_counter()
+        self.stage_ms[stage] = (now - start) * 1000
+        self.tracer.add_span(stage, start, now)
+        return now
+
     def extract_text_from_image(self, pil_image):
-        pil_image.save("ocr_debug_original.png")
+        """
+        Main OCR pass over a capture. Returns a Frame owning the preprocessed
+        arrays and the detected Line records (empty Frame if nothing was found).
+        Per-stage durations are left in self.stage_ms.
+        """
+        self.debug.begin_snapshot()
+        self.debug.record("original", pil_image)
+        self.stage_ms = {}
+        start = time.perf_counter()
         try:
-            hsv = self.preprocess_image(pil_image)
-            v_chan = hsv[:,:,2]
-            _, shadow_mask = cv2.threshold(v_chan, 60, 255, cv2.THRESH_BINARY_INV)
+            if self.roi_preprocess:
+                hsv, scale, band_map = self.preprocess_image_roi(pil_image)
+                if hsv is None:
+                    return Frame() # No text anywhere in the capture
+            else:
+                hsv, scale, band_map = self.preprocess_image(pil_image), 3, []
+            start = self._mark_stage("preprocess", start)
+
+            # Single classification pass; all masks are derived from the label image
+            hsv_labels = self.classify_hsv(hsv)
+            shadow_mask = self.get_shadow_mask(hsv, hsv_labels)
             
-            white_mask = self.get_white_mask(hsv)
-            color_mask_for_validation = self.get_color_mask(hsv) 
+            white_mask = self.get_white_mask(hsv, hsv_labels)
+            color_mask_for_validation = self.get_color_mask(hsv, hsv_labels) 
             
             # Combined mask for denoising includes white and player colors
             combined = cv2.bitwise_or(white_mask, color_mask_for_validation)
+            start = self._mark_stage("masks", start)
             
             validated_combined = self.denoise_ui_elements(combined, shadow_mask)
-            
-            # Use the full validated mask for the main pass
-            final_msg_mask = validated_combined 
-            
-            # Small dilation (2x1) to ensure line structure is maintained
-            proc_mask = cv2.dilate(validated_combined, np.ones((2, 1), np.uint8), iterations=1)
-            final_mask = cv2.bitwise_not(proc_mask)
-            cv2.imwrite("ocr_debug_final_mask.png", final_mask)
-
-            # Added preserve_interword_spaces=1 to keep "Да не" separated
-            tess_config = '--oem 1 --psm 6 -c preserve_interword_spaces=1'
-            data = pytesseract.image_to_data(final_mask, lang=self.ocr_langs, config=tess_config, output_type=Output.DICT)
-
-            temp_lines = defaultdict(list)
-            for i in range(len(data['text'])):
-                conf = int(data['conf'][i])
-                text = data['text'][i].strip()
-                # Use a slightly higher confidence for the main pass to reduce hallucinations
-                if conf > 20 and text:
-                    y_center = data['top'][i] + (data['height'][i] // 2)
-                    matched_y = None
-                    for ly_center in temp_lines.keys():
-                        if abs(ly_center - y_center) < 25: # Group by vertical center proximity
-                            matched_y = ly_center
-                            break
-                    if matched_y is None:
-                        temp_lines[y_center].append(i)
-                    else:
-                        temp_lines[matched_y].append(i)
-
-            results = []
-            for y_center in sorted(temp_lines.keys()):
-                indices = temp_lines[y_center]
-                indices.sort(key=lambda idx: data['left'][idx])
-                line_text = " ".join([data['text'][idx] for idx in indices])
-                
-                y_min = min(data['top'][idx] for idx in indices)
-                y_max = max(data['top'][idx] + data['height'][idx] for idx in indices)
-                
-                # Filter noise: Must have a decent density of alphanumeric characters
-                alnum_count = sum(1 for c in line_text if c.isalnum())
-                if alnum_count < 2: continue # Ignore lines with < 2 alnum chars
-                if len(line_text) < 4 and alnum_count < 3: continue # Ignore very short non-dense lines
-
-                # Deduplication: If this line heavily overlaps the previous one, skip it
-                if results:
-                    prev_min, prev_max = results[-1]["y_bounds"]
-                    overlap = min(y_max, prev_max) - max(y_min, prev_min)
-                    line_height = y_max - y_min
-                    if overlap > line_height * 0.5:
-                        # If overlap is high, keep the one with more text
-                        if len(line_text) > len(results[-1]["text"]):
-                            results.pop()
-                        else:
-                            continue
-
-                if line_text:
-                    cleaned = line_text.strip()
-                    cleaned = re.sub(r'[\s]+', ' ', cleaned).strip()
-                    
-                    if len(cleaned) >= 2:
-                        results.append({
-                            "text": cleaned,
-                            "y_bounds": (y_min, y_max),
-                            "full_hsv": hsv,
-                            "validated_mask": validated_combined, # Pass the mask for refined use
-                            "words": [{"text": data['text'][idx], "left": data['left'][idx], "width": data['width'][idx]} for idx in indices]
-                        })
-            return results
+            start = self._mark_stage("denoise", start)
+            self.debug.record("combined_mask", combined)
+            self.debug.record("validated_mask", validated_combined)
+
+            # Channel tags are matched on the mask before OCR and blanked out of
+            # the pass 1 input; lines no template matches keep their tag ink
+            bands, band_tags, ocr_mask = self._match_channel_tags(validated_combined, scale)
+            start = self._mark_stage("tag_match", start)
+
+            if self.segmentation == "bands":
+                lines = self._ocr_text_bands(ocr_mask, scale, bands)
+                start = self._mark_stage("ocr_main", start)
+            else:
+                lines = self._ocr_whole_mask(ocr_mask)
+                start = self._mark_stage("ocr_main", start)
+
+            for line in lines:
+                line.source_y_bounds = tuple(int(round(self.frame_to_source_y(y, scale, band_map))) for y in line.y_bounds)
+            self._assign_channel_tags(lines, bands, band_tags, validated_combined, scale)
+            start = self._mark_stage("tag_learn", start)
+
+            # Compare against the previous snapshot so callers can skip unchanged lines
+            fingerprints, statuses = self.line_tracker.update(validated_combined, lines)
+            for line, fp, status in zip(lines, fingerprints, statuses):
+                line.fingerprint = fp
+                line.status = status
+                line.changed = status == "new"
+            self._mark_stage("line_tracking", start)
+            return Frame(hsv, hsv_labels, validated_combined, scale, band_map, lines)
         except Exception as e:
             print(f"Error: {e}")
+            self.debug.flush_on_error()
+            return Frame()
+
+    def _ocr_whole_mask(self, validated_combined):
+        """Pass 1 in 'words' mode: one psm 6 recognition of the whole mask, then line grouping."""
+        # Same text layout as an earlier snapshot: skip the main Tesseract pass
+        frame_key = self.recognition_cache.mask_key(validated_combined)
+        ink_x, ink_y = cv2.boundingRect(validated_combined)[:2]
+        cache_field = f"lines:{self.ocr_langs}"
+        cached_lines = self.recognition_cache.get(frame_key, cache_field)
+        if cached_lines is not None:
+            return [line.shifted(ink_x, ink_y) for line in cached_lines]
+
+        # Small dilation (2x1) to ensure line structure is maintained
+        proc_mask = cv2.dilate(validated_combined, np.ones((2, 1), np.uint8), iterations=1)
+        final_mask = cv2.bitwise_not(proc_mask)
+        self.debug.record("final_mask", final_mask)
+
+        # The engine sets preserve_interword_spaces=1 to keep "Да не" separated
+        data = self.engine.image_to_data(final_mask, self.ocr_langs, psm=6)
+        lines = self._group_words_into_lines(data)
+
+        # Cache relative to the ink bounding box so small shifts still hit
+        self.recognition_cache.put(frame_key, cache_field, [line.shifted(-ink_x, -ink_y) for line in lines])
+        return lines
+
+    def find_text_bands(self, mask, scale):
+        """
+        Line segmentation from the horizontal projection of the validated mask.
+        Returns (y0, y1) row ranges, top to bottom. Bands much taller than the
+        typical line (two lines touching) are split at their emptiest row.
+        """
+        profile = np.count_nonzero(mask, axis=1)
+        bands = find_row_bands(profile >= 2, SEGMENT_MAX_GAP * scale, SEGMENT_MIN_HEIGHT * scale)
+        if len(bands) < 2:
+            return bands
+        median_height = float(np.median([y1 - y0 for y0, y1 in bands]))
+        result = []
+        for y0, y1 in bands:
+            self._split_band(profile, y0, y1, median_height, result)
+        return result
+
+    def _split_band(self, profile, y0, y1, median_height, result):
+        if y1 - y0 <= median_height * SEGMENT_SPLIT_RATIO:
+            result.append((y0, y1))
+            return
+        # Cut at the emptiest row, keeping at least 60% of a line on both sides
+        margin = int(median_height * 0.6)
+        cut = y0 + margin + int(np.argmin(profile[y0 + margin:y1 - margin]))
+        self._split_band(profile, y0, cut, median_height, result)
+        self._split_band(profile, cut, y1, median_height, result)
+
+    def _ocr_text_bands(self, validated_combined, scale, bands=None):
+        """
+        Pass 1 in 'bands' mode: every projection band is recognized on its own
+        with psm 7. Results are cached per band, so lines already on screen are
+        not recognized again when new ones arrive.
+        """
+        proc_mask = cv2.dilate(validated_combined, np.ones((2, 1), np.uint8), iterations=1)
+        cache_field = f"band:{self.ocr_langs}"
+        lines = []
+        if bands is None:
+            bands = self.find_text_bands(validated_combined, scale)
+        for y0, y1 in bands:
+            band_key = self.recognition_cache.mask_key(validated_combined, (y0, y1))
+            ink_x = cv2.boundingRect(validated_combined[y0:y1])[0]
+            cached = self.recognition_cache.get(band_key, cache_field)
+            if cached is None:
+                strip = cv2.copyMakeBorder(cv2.bitwise_not(proc_mask[y0:y1]), SEGMENT_STRIP_PAD, SEGMENT_STRIP_PAD,
+                                           SEGMENT_STRIP_PAD, SEGMENT_STRIP_PAD, cv2.BORDER_CONSTANT, value=255)
+                self.debug.record("band", strip)
+                line = self._band_to_line(self.engine.image_to_data(strip, self.ocr_langs, psm=7), y0, y1)
+                # () caches "no text in this band"
+                self.recognition_cache.put(band_key, cache_field, line.shifted(-ink_x, -y0) if line else ())
+            else:
+                line = cached.shifted(ink_x, y0) if cached else None
+            if line is not None:
+                lines.append(line)
+        return lines
+
+    def _band_to_line(self, data, y0, y1):
+        """Builds the Line of one band from its psm 7 words, with the same noise filters as the words mode."""
+        conf = np.trunc(np.asarray(data['conf'], dtype=np.float64))
+        left = np.asarray(data['left'], dtype=np.int64) - SEGMENT_STRIP_PAD
+        width = np.asarray(data['width'], dtype=np.int64)
+        indices = [idx for idx in np.argsort(left, kind='stable').tolist() if conf[idx] > 20 and data['text'][idx].strip()]
+        line_text = " ".join(data['text'][idx] for idx in indices)
+
+        alnum_count = sum(map(str.isalnum, line_text))
+        if alnum_count < 2 or (len(line_text) < 4 and alnum_count < 3):
+            return None
+        cleaned = re.sub(r'[\s]+', ' ', line_text.strip()).strip()
+        if len(cleaned) < 2:
+            return None
+        return Line(cleaned, (y0, y1), tuple(Word(data['text'][idx], max(0, int(left[idx])), int(width[idx])) for idx in indices))
+
+    def _group_words_into_lines(self, data):
+        """
+        Groups Tesseract word output into de-duplicated chat Line records.
+        Words are visited in Tesseract order and join the first line whose
+        anchor (the center of its first word) is within 25px, else start a
+        new line; lines come out sorted by anchor. Candidate anchors are found
+        by bisect, so grouping is O(n log n), and line bounds are reduced per
+        line with numpy.
+        """
+        texts = data['text']
+        if not len(texts):
+            return []
+        # Tesseract confidences are compared as integers (-1 for non-words)
+        conf = np.trunc(np.asarray(data['conf'], dtype=np.float64))
+        has_text = np.fromiter((bool(t.strip()) for t in texts), dtype=bool, count=len(texts))
+
+        # Use a slightly higher confidence for the main pass to reduce hallucinations
+        keep = np.flatnonzero((conf > 20) & has_text).tolist()
+        if not keep:
             return []
+        top = np.asarray(data['top'], dtype=np.int64)
+        bottom = top + np.asarray(data['height'], dtype=np.int64)
+        left = np.asarray(data['left'], dtype=np.int64)
+        left_list = left.tolist()
+        width_list = np.asarray(data['width'], dtype=np.int64).tolist()
+
+        # Group by vertical center proximity: a word joins the earliest created
+        # line whose anchor is within 25px. Anchors are at least 25px apart, so
+        # at most two of them (found by bisect in the sorted anchors) can qualify
+        anchor_values = [] # Sorted anchor centers
+        anchor_ids = [] # Creation order of each anchor, parallel to anchor_values
+        line_of = []
+        for y_center in (top[keep] + (bottom[keep] - top[keep]) // 2).tolist():
+            pos = bisect.bisect_right(anchor_values, y_center - 25)
+            best = None
+            for cand in range(pos, min(pos + 2, len(anchor_values))):
+                if anchor_values[cand] < y_center + 25 and (best is None or anchor_ids[cand] < anchor_ids[best]):
+                    best = cand
+            if best is None:
+                anchor_values.insert(pos, y_center)
+                anchor_ids.insert(pos, len(anchor_ids))
+                best = pos
+            line_of.append(anchor_ids[best])
+
+        # Lines sorted by anchor, words left to right (ties keep Tesseract order)
+        rank_of_line = np.empty(len(anchor_ids), dtype=np.int64)
+        rank_of_line[anchor_ids] = np.arange(len(anchor_ids))
+        line_rank = rank_of_line[line_of]
+        keep = np.asarray(keep, dtype=np.int64)
+        order = keep[np.lexsort((left[keep], line_rank))]
+        starts = np.concatenate(([0], np.cumsum(np.bincount(line_rank))[:-1]))
+        y_mins = np.minimum.reduceat(top[order], starts).tolist()
+        y_maxs = np.maximum.reduceat(bottom[order], starts).tolist()
+        order = order.tolist()
+        ends = starts.tolist()[1:] + [len(order)]
+        grouped = [(order[a:b], y_min, y_max) for a, b, y_min, y_max in zip(starts.tolist(), ends, y_mins, y_maxs)]
+
+        results = []
+        for indices, y_min, y_max in grouped:
+            line_text = " ".join([texts[idx] for idx in indices])
+
+            # Filter noise: Must have a decent density of alphanumeric characters
+            alnum_count = sum(map(str.isalnum, line_text))
+            if alnum_count < 2: continue # Ignore lines with < 2 alnum chars
+            if len(line_text) < 4 and alnum_count < 3: continue # Ignore very short non-dense lines
+
+            # Deduplication: If this line heavily overlaps the previous one, skip it
+            if results:
+                prev_min, prev_max = results[-1].y_bounds
+                overlap = min(y_max, prev_max) - max(y_min, prev_min)
+                line_height = y_max - y_min
+                if overlap > line_height * 0.5:
+                    # If overlap is high, keep the one with more text
+                    if len(line_text) > len(results[-1].text):
+                        results.pop()
+                    else:
+                        continue
+
+            cleaned = re.sub(r'[\s]+', ' ', line_text.strip()).strip()
+            if len(cleaned) >= 2:
+                results.append(Line(cleaned, (y_min, y_max), tuple(Word(texts[idx], left_list[idx], width_list[idx]) for idx in indices)))
+        return results
+
+    def _match_channel_tags(self, validated_mask, scale):
+        """
+        Channel tag of every text band by template matching, before any OCR.
+        Returns (bands, [(tag, sender_x)] per band, OCR mask); the OCR mask is
+        the validated mask with each matched tag blanked, so pass 1 does not
+        read the tags again.
+        """
+        bands = self.find_text_bands(validated_mask, scale)
+        band_tags = [self.tag_matcher.match(validated_mask, band, scale) for band in bands]
+        ocr_mask = validated_mask
+        for (y0, y1), (tag, sender_x) in zip(bands, band_tags):
+            if tag is not None:
+                if ocr_mask is validated_mask:
+                    ocr_mask = validated_mask.copy()
+                # The tag is the first ink of its line: everything left of the sender
+                ocr_mask[y0:y1, :sender_x] = 0
+        return bands, band_tags, ocr_mask
 
+    def _assign_channel_tags(self, lines, bands, band_tags, validated_mask, scale):
+        """
+        Gives each line the tag of the band it overlaps most. Lines without a
+        matched tag were read with their tag ink and may teach the matcher a
+        new template.
+        """
+        for line in lines:
+            y1, y2 = line.y_bounds
+            overlaps = [min(b1, y2) - max(b0, y1) for b0, b1 in bands]
+            if overlaps and max(overlaps) > 0:
+                line.tag, line.sender_x = band_tags[int(np.argmax(overlaps))]
+            if line.tag is None:
+                self.tag_matcher.learn(validated_mask, line, scale)
 
-    def extract_sender_from_line(self, hsv, y_bounds):
+    def _locate_sender(self, hsv, y_bounds, labels=None):
+        """
+        Finds the colored player name of one line. Returns (name mask, label
+        crop, x range) of its shadowed color blobs, or None if there are none.
+        """
         y1, y2 = y_bounds
         y1_v, y2_v = max(0, y1-10), min(hsv.shape[0], y2+10)
         x_limit = int(hsv.shape[1] * 0.45)
         line_hsv = hsv[y1_v:y2_v, 0:x_limit]
+        # Reuse the frame's label image when available instead of reclassifying
+        line_labels = labels[y1_v:y2_v, 0:x_limit] if labels is not None else self.classify_hsv(line_hsv)
         
-        c_mask = self.get_color_mask(line_hsv)
-        v_chan = line_hsv[:,:,2]
-        _, s_mask = cv2.threshold(v_chan, 60, 255, cv2.THRESH_BINARY_INV)
+        c_mask = self.get_color_mask(line_hsv, line_labels)
+        s_mask = self.get_shadow_mask(line_hsv, line_labels)
         s_field = cv2.dilate(s_mask, np.ones((7,7), np.uint8), iterations=1)
         
-        num, labels, stats, _ = cv2.connectedComponentsWithStats(c_mask, connectivity=8)
+        num, components, stats, _ = cv2.connectedComponentsWithStats(c_mask, connectivity=8)
         valid_c = np.zeros_like(c_mask)
         ex_x = []
         for i in range(1, num):
             x, y, w, h, area = stats[i]
             if 8 < h < 120 and area > 4: # Adjusted for 3x scale
-                blob_roi = (labels[y:y+h, x:x+w]==i).astype(np.uint8)*255
+                blob_roi = (components[y:y+h, x:x+w]==i).astype(np.uint8)*255
                 if cv2.countNonZero(cv2.bitwise_and(blob_roi, s_field[y:y+h, x:x+w])) > 0:
-                    valid_c[labels==i] = 255
+                    valid_c[components==i] = 255
                     ex_x.extend([x, x+w])
 
         if not ex_x: return None
-        name_strip = cv2.copyMakeBorder(cv2.bitwise_not(cv2.dilate(valid_c[:, max(0, min(ex_x)-20):min(valid_c.shape[1], max(ex_x)+20)], np.ones((2,2), np.uint8))), 20, 20, 40, 40, cv2.BORDER_CONSTANT, value=[255,255,255])
-        cv2.imwrite("ocr_debug_sender_pass.png", name_strip)
-        
-        tess_config = '--oem 1 --psm 6 -c preserve_interword_spaces=1'
-        name = pytesseract.image_to_string(name_strip, lang=self.ocr_langs, config=tess_config).strip()
+        return valid_c, line_labels, (min(ex_x), max(ex_x))
+
+    def locate_sender_slot(self, hsv, y_bounds, labels=None):
+        """
+        Player slot (0-9, the dominant color of the name blobs) and name shape
+        (width / line height) of one line, or None when it has no colored name.
+        """
+        located = self._locate_sender(hsv, y_bounds, labels)
+        if located is None:
+            return None
+        valid_c, line_labels, (x_min, x_max) = located
+        classes = line_labels[valid_c > 0] & LABEL_CLASS_MASK
+        counts = np.bincount(classes, minlength=LABEL_SLOT_BASE + len(self.dota_player_colors))
+        slot = int(np.argmax(counts[LABEL_SLOT_BASE:]))
+        return slot, (x_max - x_min) / max(1, y_bounds[1] - y_bounds[0])
+
+    def _build_sender_strip(self, hsv, y_bounds, labels=None):
+        """Isolates the colored player name of one line as a padded black-on-white strip."""
+        located = self._locate_sender(hsv, y_bounds, labels)
+        if located is None:
+            return None
+        valid_c, _, (x_min, x_max) = located
+        return cv2.copyMakeBorder(cv2.bitwise_not(cv2.dilate(valid_c[:, max(0, x_min-20):min(valid_c.shape[1], x_max+20)], np.ones((2,2), np.uint8))), 20, 20, 40, 40, cv2.BORDER_CONSTANT, value=[255,255,255])
+
+    def _clean_sender_name(self, name):
         # Allow more common Dota username characters (+, (, ), etc.)
         name = re.sub(r'[^\w\d\s\._\-\[\]#\+\(\)!@\$%\*\?]', '', name).strip()
         return name if len(name) >= 2 else None
 
-    def extract_refined_message(self, hsv, y_bounds, x_start_px, validated_mask, lang='rus'):
-        """
-        Performs a targeted, single-language OCR pass on just the message area.
-        This resolves Latin/Cyrillic competition for ambiguous characters.
-        Uses the high-quality HSV mask from the first pass to avoid noise.
-        """
+    def extract_sender_from_line(self, hsv, y_bounds, labels=None, validated_mask=None, lang=None):
+        lang = lang or self.ocr_langs
+        # The line's mask identifies it across snapshots; '' caches "no sender"
+        cache_key = self.recognition_cache.mask_key(validated_mask, y_bounds) if validated_mask is not None else None
+        if cache_key is not None:
+            cached = self.recognition_cache.get(cache_key, f"sender:{lang}")
+            if cached is not None:
+                return cached or None
+
+        name_strip = self._build_sender_strip(hsv, y_bounds, labels)
+        if name_strip is None:
+            name = None
+        else:
+            self.debug.record("sender_pass", name_strip)
+            name = self._clean_sender_name(self.engine.image_to_string(name_strip, lang, psm=6).strip())
+
+        if cache_key is not None:
+            self.recognition_cache.put(cache_key, f"sender:{lang}", name or "")
+        return name
+
+    def _build_refined_strip(self, hsv, y_bounds, x_start_px, validated_mask):
+        """Crops and cleans the message part of one line as a padded black-on-white strip."""
         y1, y2 = y_bounds
         # Add a vertical buffer
         y1_v, y2_v = max(0, y1-5), min(hsv.shape[0], y2+5)
@@ -256,10 +679,124 @@ class OcrService:
         msg_bin = cv2.bitwise_not(msg_mask)
         
         # Pad generously (50px instead of 40)
-        msg_final = cv2.copyMakeBorder(msg_bin, 30, 30, 50, 50, cv2.BORDER_CONSTANT, value=[255,255,255])
-        cv2.imwrite("ocr_debug_refined_msg.png", msg_final)
+        return cv2.copyMakeBorder(msg_bin, 30, 30, 50, 50, cv2.BORDER_CONSTANT, value=[255,255,255])
+
+    def extract_refined_message(self, hsv, y_bounds, x_start_px, validated_mask, lang='rus'):
+        """
+        Performs a targeted, single-language OCR pass on just the message area.
+        This resolves Latin/Cyrillic competition for ambiguous characters.
+        Uses the high-quality HSV mask from the first pass to avoid noise.
+        """
+        cache_key, cache_field = self._refined_cache_key(validated_mask, y_bounds, x_start_px, lang)
+        cached = self.recognition_cache.get(cache_key, cache_field)
+        if cached is not None:
+            return cached or None
+
+        msg_final = self._build_refined_strip(hsv, y_bounds, x_start_px, validated_mask)
+        self.debug.record("refined_msg", msg_final)
         
-        tess_config = '--oem 1 --psm 7 -c preserve_interword_spaces=1'
-        refined_text = pytesseract.image_to_string(msg_final, lang=lang, config=tess_config).strip()
+        refined_text = self.engine.image_to_string(msg_final, lang, psm=7).strip()
+        self.recognition_cache.put(cache_key, cache_field, refined_text)
         
         return refined_text if len(refined_text) > 0 else None
+
+    def _refined_cache_key(self, validated_mask, y_bounds, x_start_px, lang):
+        # The crop start is part of the key, quantized to absorb a few pixels of jitter
+        return self.recognition_cache.mask_key(validated_mask, y_bounds), f"refined:{lang}:{x_start_px // 8}"
+
+    def _ocr_tiled_strips(self, strips, lang, stage="batch"):
+        """
+        Stacks padded strips onto one white canvas, runs a single recognition and
+        maps every word back to the strip it came from by its vertical center.
+        Returns one text per strip ('' when nothing was recognized).
+        """
+        canvas_w = max(strip.shape[1] for strip in strips)
+        offsets = []
+        tiles = []
+        y = 0
+        for strip in strips:
+            offsets.append(y)
+            tiles.append(cv2.copyMakeBorder(strip, 0, STRIP_GAP, 0, canvas_w - strip.shape[1], cv2.BORDER_CONSTANT, value=255))
+            y += strip.shape[0] + STRIP_GAP
+        canvas = np.vstack(tiles)
+        self.debug.record(f"{stage}_canvas", canvas)
+
+        data = self.engine.image_to_data(canvas, lang, psm=6)
+
+        offsets = np.array(offsets)
+        heights = np.array([strip.shape[0] for strip in strips])
+        y_centers = np.asarray(data['top'], dtype=np.int64) + np.asarray(data['height'], dtype=np.int64) // 2
+        strip_ids = np.searchsorted(offsets, y_centers, side='right') - 1
+        inside = (strip_ids >= 0) & (y_centers < offsets[np.clip(strip_ids, 0, None)] + heights[np.clip(strip_ids, 0, None)])
+
+        strip_words = defaultdict(list)
+        for i, (strip_idx, left) in enumerate(zip(strip_ids.tolist(), np.asarray(data['left']).tolist())):
+            text = data['text'][i].strip()
+            if text and inside[i]:
+                strip_words[strip_idx].append((left, text))
+
+        return [" ".join(text for _, text in sorted(strip_words[idx])) for idx in range(len(strips))]
+
+    def extract_senders_batch(self, hsv, y_bounds_list, labels=None, validated_mask=None, lang=None):
+        """
+        Sender pass for every line of a snapshot. In batch mode all name strips
+        are recognized with one OCR call. Returns a name (or None) per line.
+        Lines whose mask is in the recognition cache are not OCR'd again.
+        """
+        lang = lang or self.ocr_langs
+        if not self.batch_mode:
+            return [self.extract_sender_from_line(hsv, y_bounds, labels, validated_mask, lang) for y_bounds in y_bounds_list]
+
+        names = [None] * len(y_bounds_list)
+        cache_keys = [None] * len(y_bounds_list)
+        strips = {}
+        for idx, y_bounds in enumerate(y_bounds_list):
+            if validated_mask is not None:
+                cache_keys[idx] = self.recognition_cache.mask_key(validated_mask, y_bounds)
+                cached = self.recognition_cache.get(cache_keys[idx], f"sender:{lang}")
+                if cached is not None:
+                    names[idx] = cached or None
+                    continue
+            strip = self._build_sender_strip(hsv, y_bounds, labels)
+            if strip is not None:
+                strips[idx] = strip
+            elif cache_keys[idx] is not None:
+                self.recognition_cache.put(cache_keys[idx], f"sender:{lang}", "")
+
+        if strips:
+            present = list(strips)
+            texts = self._ocr_tiled_strips([strips[idx] for idx in present], lang, stage="sender")
+            for idx, text in zip(present, texts):
+                names[idx] = self._clean_sender_name(text)
+                if cache_keys[idx] is not None:
+                    self.recognition_cache.put(cache_keys[idx], f"sender:{lang}", names[idx] or "")
+        return names
+
+    def extract_refined_messages_batch(self, hsv, requests, validated_mask, lang='rus'):
+        """
+        Refined pass for several lines of a snapshot.
+        :param requests: List of (y_bounds, x_start_px) tuples.
+        :return: Refined text (or None) per request.
+        """
+        if not requests:
+            return []
+        if not self.batch_mode:
+            return [self.extract_refined_message(hsv, y_bounds, x_start_px, validated_mask, lang=lang) for y_bounds, x_start_px in requests]
+
+        results = [None] * len(requests)
+        cache_keys = [self._refined_cache_key(validated_mask, y_bounds, x_start_px, lang) for y_bounds, x_start_px in requests]
+        strips = {}
+        for idx, (y_bounds, x_start_px) in enumerate(requests):
+            cached = self.recognition_cache.get(*cache_keys[idx])
+            if cached is not None:
+                results[idx] = cached or None
+            else:
+                strips[idx] = self._build_refined_strip(hsv, y_bounds, x_start_px, validated_mask)
+
+        if strips:
+            present = list(strips)
+            texts = self._ocr_tiled_strips([strips[idx] for idx in present], lang, stage="refined")
+            for idx, text in zip(present, texts):
+                self.recognition_cache.put(*cache_keys[idx], text)
+                results[idx] = text if len(text) > 0 else None
+        return results
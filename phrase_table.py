@@ -0,0 +1,247 @@
+import json
+import os
+import re
+import unicodedata
+
+from translation_cache import normalize_text
+
+PHRASE_TABLE_FILE = "phrase_table.json"
+
+# Stock chat phrases and slang per target language and source language. Keys
+# are written the way players type them; they go through the same
+# normalization as chat lines, so accents, case, punctuation and stretched
+# letters ("спасибооо") do not matter.
+BUILTIN_PHRASES = {
+    "en": {
+        "ru": {
+            "гг": "gg", "гг вп": "gg wp", "вп": "wp", "изи": "ez", "изи катка": "easy game",
+            "хорошая игра": "good game", "спасибо за игру": "thanks for the game",
+            "привет": "hi", "всем привет": "hi all", "здарова": "hey", "пока": "bye",
+            "спасибо": "thanks", "спс": "thx", "пж": "pls", "плз": "pls", "пожалуйста": "please",
+            "да": "yes", "нет": "no", "ок": "ok", "окей": "ok", "ладно": "okay", "понял": "got it",
+            "не знаю": "I don't know", "хз": "idk", "лол": "lol", "кек": "lol",
+            "сорян": "sorry", "извини": "sorry", "мой косяк": "my bad",
+            "удачи": "good luck", "удачи всем": "good luck everyone", "вы серьезно": "are you serious",
+            "нуб": "noob", "нубы": "noobs", "рак": "noob", "раки": "noobs", "тупой": "stupid",
+            "дебил": "idiot", "ты дебил": "you're an idiot", "фидер": "feeder", "не фиди": "stop feeding",
+            "репорт": "report", "репорт мид": "report mid", "мут": "muted",
+            "го": "go", "го мид": "go mid", "мид": "mid", "топ": "top", "бот": "bot", "лес": "jungle",
+            "пуш": "push", "пушим": "let's push", "го пуш": "go push", "дефаем": "defend",
+            "рош": "Roshan", "рошан": "Roshan", "го рош": "go Roshan", "гем": "gem", "купи гем": "buy a gem",
+            "варды": "wards", "купи варды": "buy wards", "нет вардов": "no wards", "смок": "smoke",
+            "фф": "ff", "сдаемся": "let's surrender", "сдаюсь": "I give up",
+            "назад": "back", "отходим": "fall back", "жди": "wait", "подожди": "wait", "стой": "wait",
+            "помогите": "help", "помоги": "help me", "ганк": "gank", "тп": "tp", "бб": "bb",
+            "ульта": "ult", "нет ульты": "no ult", "нет маны": "no mana", "мисс": "missing",
+            "фарми": "farm", "я фармлю": "I'm farming", "стакай": "stack", "тащи": "carry us",
+            "керри": "carry", "саппорт": "support", "где саппорт": "where is the support",
+            "кто мид": "who's mid", "я мид": "I'm mid", "я керри": "I'm carry", "я саппорт": "I'm support",
+        },
+        "es": {
+            "buena partida": "good game", "buen juego": "good game", "bien jugado": "well played",
+            "gracias por la partida": "thanks for the game", "hola": "hi", "hola a todos": "hi everyone",
+            "chau": "bye", "adios": "bye", "gracias": "thanks", "muchas gracias": "thanks a lot",
+            "de nada": "you're welcome", "por favor": "please", "porfa": "pls", "si": "yes",
+            "vale": "ok", "dale": "go ahead", "de una": "let's do it", "no se": "I don't know",
+            "perdon": "sorry", "lo siento": "sorry", "mi culpa": "my bad", "suerte": "good luck",
+            "buena suerte": "good luck", "en serio": "seriously", "que haces": "what are you doing",
+            "por que": "why", "manco": "noob", "mancos": "noobs", "que malo": "so bad", "malo": "bad",
+            "reporten": "report", "reporten mid": "report mid", "vamos": "let's go", "vamos mid": "let's go mid",
+            "vamos roshan": "let's go Roshan", "empujen": "push", "defiendan": "defend",
+            "compren wards": "buy wards", "compra wards": "buy wards", "no hay wards": "no wards",
+            "nos rendimos": "we surrender", "me rindo": "I give up", "atras": "back", "retirada": "retreat",
+            "espera": "wait", "esperen": "wait", "cuidado": "careful", "ayuda": "help", "ayudenme": "help me",
+            "necesito ayuda": "I need help", "no tengo mana": "no mana", "sin mana": "no mana",
+            "no tengo ulti": "no ult", "tengo ulti": "I have ult", "farmea": "farm", "estoy farmeando": "I'm farming",
+            "soporte": "support", "donde esta el soporte": "where is the support",
+            "quien va mid": "who's mid", "yo mid": "I'm mid", "yo carry": "I'm carry", "yo soporte": "I'm support",
+        },
+        "pt": {
+            "bom jogo": "good game", "boa partida": "good game", "bem jogado": "well played",
+            "oi": "hi", "ola": "hi", "oi galera": "hi guys", "tchau": "bye",
+            "obrigado": "thanks", "obrigada": "thanks", "valeu": "thanks", "vlw": "thx",
+            "por favor": "please", "pfv": "pls", "pf": "pls", "sim": "yes", "nao": "no",
+            "beleza": "okay", "blz": "ok", "ta bom": "okay", "tmj": "got your back", "nao sei": "I don't know",
+            "desculpa": "sorry", "foi mal": "my bad", "boa sorte": "good luck", "serio": "seriously",
+            "calma": "calm down", "pqp": "wtf", "vsf": "screw you",
+            "nub": "noob", "lixo": "trash", "time lixo": "trash team", "ruim": "bad",
+            "reporta": "report", "reporta o mid": "report mid", "bora": "let's go", "vamo": "let's go",
+            "bora mid": "let's go mid", "bora roshan": "let's go Roshan", "empurra": "push", "defende": "defend",
+            "compra ward": "buy wards", "compra wards": "buy wards", "sem ward": "no wards",
+            "vamos render": "let's surrender", "desisto": "I give up", "recua": "fall back", "recuem": "fall back",
+            "espera": "wait", "cuidado": "careful", "ajuda": "help", "me ajuda": "help me",
+            "sem mana": "no mana", "sem ult": "no ult", "to indo": "on my way", "farma": "farm",
+            "suporte": "support", "cade o suporte": "where is the support",
+            "quem e mid": "who's mid", "eu mid": "I'm mid", "eu carry": "I'm carry", "eu suporte": "I'm support",
+        },
+        "tr": {
+            "iyi oyunlar": "good game", "iyi oynadin": "well played", "kolay": "easy",
+            "merhaba": "hi", "selam": "hi", "herkese selam": "hi all", "gorusuruz": "see you",
+            "tesekkurler": "thanks", "tesekkur ederim": "thank you", "sag ol": "thanks", "sagol": "thanks",
+            "lutfen": "please", "evet": "yes", "hayir": "no", "tamam": "okay", "olur": "okay",
+            "bilmiyorum": "I don't know", "ozur dilerim": "I'm sorry", "pardon": "sorry", "benim hatam": "my bad",
+            "iyi sanslar": "good luck", "bol sans": "good luck", "ciddi misin": "are you serious",
+            "ne yapiyorsun": "what are you doing", "neden": "why", "salak": "idiot", "aptal": "stupid",
+            "kotu": "bad", "iyi": "good", "cok iyi": "very good",
+            "rapor": "report", "raporlayin": "report", "mid rapor": "report mid",
+            "hadi": "come on", "gidelim": "let's go", "hadi mid": "let's go mid", "rosh gidelim": "let's go Roshan",
+            "itin": "push", "savunun": "defend", "ward al": "buy wards", "ward yok": "no wards",
+            "teslim olalim": "let's surrender", "geri": "back", "geri cekil": "fall back", "bekle": "wait",
+            "dikkat": "careful", "yardim": "help", "yardim edin": "help", "manam yok": "no mana",
+            "ulti hazir": "ult ready", "ulti yok": "no ult", "geliyorum": "coming", "farm yap": "farm",
+            "support nerede": "where is the support", "kim mid": "who's mid", "ben mid": "I'm mid",
+            "ben carry": "I'm carry", "ben support": "I'm support",
+        },
+    },
+}
+
+# Stock phrases of the target language that are also phrases in a source
+# language ("pardon" is Turkish for "sorry"). With every translation of the
+# target's table they make up its own vocabulary: a line made only of these
+# is already in the target language and is not looked up.
+TARGET_PHRASES = {
+    "en": ["pardon", "pardon me", "beg your pardon", "oi"],
+}
+
+# Laughter is typed in any length ("хахаха", "jajaja", "kkkkk"), so it is
+# matched per word instead of listed
+LAUGHTER = {
+    "ru": re.compile(r"а?(?:х[аеы]){2,}х?"),
+    "es": re.compile(r"(?:j[aeiu]){2,}j?|(?:js){2,}j?"),
+    "pt": re.compile(r"k{2,}|(?:h[aeu]){2,}h?|(?:rs){2,}"),
+    "tr": re.compile(r"a?(?:h[ae]){2,}h?"),
+}
+LAUGHTER_TRANSLATION = "haha"
+
+_END = "" # Trie key holding the translation of the phrase ending at that node
+
+
+def _phrase_tokens(text):
+    """Words of a phrase or chat line, without accents, punctuation or repeated letters."""
+    text = unicodedata.normalize("NFKD", normalize_text(text)).replace("ı", "i")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.findall(r"[^\W_]+", text)
+
+
+def _collapse(token):
+    # "спасибооо" and "спасибо" are the same word in chat
+    return re.sub(r"(.)\1+", r"\1", token)
+
+
+class PhraseTable:
+    """
+    Local translation of stock chat phrases and gamer slang, in front of the
+    translation API. The phrases of each (target, source) language pair are
+    compiled into a word trie once at startup; a chat line is answered when
+    it splits into known phrases from start to end (longest phrase first),
+    e.g. "гг вп изи" -> "gg wp ez". Anything else falls through to the cache
+    and the API. Callers check in_target_language() first, so a line that is
+    also valid in the target language is left as it is. User entries are loaded from phrase_table.json
+    ({"<target>": {"<source>": {"<phrase>": "<translation>"}}}) and override
+    the built-in ones.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.path.dirname(__file__), PHRASE_TABLE_FILE)
+        self.tries = {} # (target, source) -> word trie
+        self.target_tries = {} # target -> word trie of phrases already in that language
+        self.hits = 0
+        for target, phrases in TARGET_PHRASES.items():
+            trie = self.target_tries.setdefault(target, {})
+            for phrase in phrases:
+                self._insert(trie, phrase, phrase)
+        self.add_phrases(BUILTIN_PHRASES)
+        self.add_phrases(self._load_user_phrases())
+
+    def _load_user_phrases(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                phrases = json.load(f)
+            if not isinstance(phrases, dict):
+                raise ValueError("expected an object of target languages")
+            return phrases
+        except (OSError, ValueError) as e:
+            print(f"Could not load phrase table '{self.path}': {e}")
+            return {}
+
+    @staticmethod
+    def _insert(trie, phrase, translation):
+        tokens = [_collapse(token) for token in _phrase_tokens(phrase)]
+        if not tokens or not isinstance(translation, str):
+            return
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = translation
+
+    def add_phrases(self, phrases):
+        """Compiles {target: {source: {phrase: translation}}} into the tries."""
+        for target, sources in phrases.items():
+            target_trie = self.target_tries.setdefault(target.lower(), {})
+            for source, entries in sources.items():
+                trie = self.tries.setdefault((target.lower(), source.lower()), {})
+                for phrase, translation in entries.items():
+                    self._insert(trie, phrase, translation)
+                    self._insert(target_trie, translation, translation)
+
+    def sources_for(self, target):
+        return [source for t, source in self.tries if t == target.lower()]
+
+    def _match(self, tokens, source, trie):
+        """Translation of a whole line split into known phrases, or None."""
+        laughter = LAUGHTER.get(source)
+        parts = []
+        pos = 0
+        while pos < len(tokens):
+            if laughter and laughter.fullmatch(tokens[pos]):
+                parts.append(LAUGHTER_TRANSLATION)
+                pos += 1
+                continue
+            # Longest known phrase starting at pos
+            node, end, translation = trie, None, None
+            for i in range(pos, len(tokens)):
+                node = node.get(_collapse(tokens[i]))
+                if node is None:
+                    break
+                if _END in node:
+                    end, translation = i + 1, node[_END]
+            if end is None:
+                return None
+            parts.append(translation)
+            pos = end
+        return " ".join(parts)
+
+    def in_target_language(self, text, target):
+        """True when the whole line is made of the target language's own stock phrases."""
+        trie = self.target_tries.get(target.lower())
+        tokens = _phrase_tokens(text)
+        return bool(trie and tokens) and self._match(tokens, target.lower(), trie) is not None
+
+    def lookup(self, text, target, source="und", guess=None):
+        """
+        (translation, source language) when the whole line is made of known
+        phrases, else None. With source 'und' every source language of the
+        target is tried, starting with the offline guess if there is one.
+        """
+        target = target.lower()
+        tokens = _phrase_tokens(text)
+        if not tokens:
+            return None
+        if source == "und":
+            sources = self.sources_for(target)
+            if guess in sources:
+                sources.remove(guess)
+                sources.insert(0, guess)
+        else:
+            sources = [source.lower()]
+        for candidate in sources:
+            trie = self.tries.get((target, candidate))
+            if trie is None:
+                continue
+            translation = self._match(tokens, candidate, trie)
+            if translation is not None:
+                self.hits += 1
+                return translation, candidate
+        return None
@@ -9,6 +9,15 @@ from google.cloud import vision
 from google.cloud import translate_v3 as translate
 from google.oauth2.credentials import Credentials # Correct import for Credentials
 
+# Offline language ID, vendored from the desktop app (language_id.py and
+# script_detector.py are copies of the root modules, kept identical by
+# test_language_id.py), so the server deploys from this folder alone
+from language_id import LanguageIdentifier
+
+# Local guesses at least this confident skip the remote detect_language call
+LOCAL_ID_MIN_CONFIDENCE = 0.8
+language_id = LanguageIdentifier()
+
 # Force UTF-8 encoding for stdout and stderr
 if sys.stdout.encoding != 'UTF-8':
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
@@ -108,16 +117,18 @@ def ocr_endpoint():
             for line_text in lines_from_vision:
                 line_text = line_text.strip()
                 if line_text: # Only process non-empty lines
-                    # Detect language for each line using Translation API
-                    parent = f"projects/{project_id}/locations/global"
-                    lang_detect_response = translate_client.detect_language(
-                        parent=parent,
-                        content=line_text,
-                        mime_type="text/plain"
-                    )
-                    detected_language = "und" # Undetermined by default
-                    if lang_detect_response.languages:
-                        detected_language = max(lang_detect_response.languages, key=lambda x: x.confidence).language_code
+                    # Offline language ID first; the Translation API only sees unclear lines
+                    detected_language, confidence = language_id.identify(line_text)
+                    if confidence < LOCAL_ID_MIN_CONFIDENCE:
+                        parent = f"projects/{project_id}/locations/global"
+                        lang_detect_response = translate_client.detect_language(
+                            parent=parent,
+                            content=line_text,
+                            mime_type="text/plain"
+                        )
+                        detected_language = "und" # Undetermined by default
+                        if lang_detect_response.languages:
+                            detected_language = max(lang_detect_response.languages, key=lambda x: x.confidence).language_code
                     
                     extracted_lines.append({
                         "text": line_text,
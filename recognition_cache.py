@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class RecognitionCache:
+    """
+    Size-bounded LRU cache of OCR results keyed by a hash of the exact ink
+    of the binarized line mask. Each key holds a small dict of fields (e.g. 'lines',
+    'sender', 'refined:rus') so every pass on the same ink can share one entry.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def mask_key(self, mask, y_bounds=None):
+        """
+        Hash of the ink inside mask (or the y_bounds band of it), cropped to
+        its bounding box so the same line hits wherever it moved. Every ink
+        pixel is part of the key: a coarse grid let different lines of similar
+        width share a key and return each other's text.
+        """
+        if y_bounds is not None:
+            y1, y2 = y_bounds
+            mask = mask[max(0, y1):min(mask.shape[0], y2)]
+        x, y, w, h = cv2.boundingRect(mask)
+        if w == 0 or h == 0:
+            return "empty"
+        bits = np.packbits(mask[y:y+h, x:x+w] >= 128)
+        return f"{w}x{h}:{hashlib.blake2b(bits.tobytes(), digest_size=16).hexdigest()}"
+
+    def get(self, key, field):
+        """Returns the cached value, or None on a miss. Counts hits and misses."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and field in entry:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[field]
+            self.misses += 1
+            return None
+
+    def put(self, key, field, value):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = {}
+                self.entries[key] = entry
+            entry[field] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hit_rate": (self.hits / lookups * 100) if lookups else 0.0,
+            }
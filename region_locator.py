@@ -0,0 +1,133 @@
+from collections import deque
+
+import cv2
+import numpy as np
+
+from ocr_service import find_row_bands, LABEL_CLASS_MASK, LABEL_SLOT_BASE, ROI_BAND_MAX_GAP, ROI_MIN_BAND_HEIGHT
+
+DENSITY_CELL = 8 # Screen pixels per density-grid cell
+DENSITY_MIN_INK = 6 # Mean mask value (0-255) for a cell to count as text
+REGION_MARGIN = 10 # Pixels kept around the detected chat ink
+EDGE_PX = 2 # Ink this close to the capture border means the chat runs past it
+SHRINK_AFTER = 20 # Captures with text before the region may shrink to their union
+SHRINK_MIN_GAIN = 0.2 # Shrink only when it removes at least this share of the area
+
+
+class RegionLocator:
+    """
+    Finds the chat block on a full-screen capture and keeps the chat region
+    tight afterwards. Candidate blocks come from the density of shadowed
+    white / player-colored text (the native masks of OcrService); chat is the
+    block with the most left-aligned lines that carry a colored player name.
+    On later captures the region follows the chat: ink touching a border
+    triggers a search around the region, and a region that stays larger than
+    the text seen in recent captures is shrunk to it.
+    """
+
+    def __init__(self, ocr_service, screen_size=None):
+        self.ocr_service = ocr_service
+        self.screen_size = screen_size # (width, height) to clip search windows
+        self.recent_ink = deque(maxlen=SHRINK_AFTER) # Screen-space ink boxes (x0, y0, x1, y1)
+
+    def reset(self):
+        self.recent_ink.clear()
+
+    def _score_block(self, mask, labels, box):
+        """(aligned lines + lines with a player color, ink box) for one candidate block."""
+        x, y, w, h = box
+        block = mask[y:y+h, x:x+w]
+        bands = find_row_bands(np.count_nonzero(block, axis=1) >= 2, ROI_BAND_MAX_GAP, ROI_MIN_BAND_HEIGHT)
+        if len(bands) < 2:
+            return 0, None
+        lefts = []
+        colored = 0
+        for y0, y1 in bands:
+            cols = np.flatnonzero(block[y0:y1].any(axis=0))
+            lefts.append(int(cols[0]))
+            band_classes = labels[y + y0:y + y1, x:x+w][block[y0:y1] > 0] & LABEL_CLASS_MASK
+            colored += bool(np.any(band_classes >= LABEL_SLOT_BASE))
+        # Chat lines all start at the same column
+        aligned = sum(1 for left in lefts if left - min(lefts) <= 2 * DENSITY_CELL)
+        if aligned < 2:
+            return 0, None
+        ink_x, ink_y, ink_w, ink_h = cv2.boundingRect(block)
+        return aligned + colored, (x + ink_x, y + ink_y, ink_w, ink_h)
+
+    def locate(self, pil_image):
+        """
+        Tight chat region (x, y, width, height) in the pixels of pil_image,
+        with a small margin, or None when no chat-like block was found.
+        """
+        mask, labels = self.ocr_service.native_text_mask(pil_image)
+        height, width = mask.shape
+        grid_w, grid_h = width // DENSITY_CELL, height // DENSITY_CELL
+        if grid_w < 2 or grid_h < 2:
+            return None
+
+        # Text cells, closed so the words and lines of one block merge
+        density = cv2.resize(mask[:grid_h * DENSITY_CELL, :grid_w * DENSITY_CELL], (grid_w, grid_h), interpolation=cv2.INTER_AREA)
+        dense = np.where(density >= DENSITY_MIN_INK, 255, 0).astype(np.uint8)
+        blocks = cv2.morphologyEx(dense, cv2.MORPH_CLOSE, np.ones((3, 6), np.uint8))
+
+        num, _, stats, _ = cv2.connectedComponentsWithStats(blocks, connectivity=8)
+        best_score, best_box = 0, None
+        for i in range(1, num):
+            x, y, w, h = (int(v) * DENSITY_CELL for v in stats[i, :4])
+            score, ink_box = self._score_block(mask, labels, (x, y, w, h))
+            if score > best_score:
+                best_score, best_box = score, ink_box
+        if best_box is None:
+            return None
+
+        x, y, w, h = best_box
+        x0, y0 = max(0, x - REGION_MARGIN), max(0, y - REGION_MARGIN)
+        x1, y1 = min(width, x + w + REGION_MARGIN), min(height, y + h + REGION_MARGIN)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def _search_window(self, region):
+        """The region grown by half its width sideways and its height up and down, clipped to the screen."""
+        x, y, w, h = region
+        x0, y0 = max(0, x - w // 2), max(0, y - h)
+        x1, y1 = x + w + w // 2, y + 2 * h
+        if self.screen_size:
+            x1, y1 = min(x1, self.screen_size[0]), min(y1, self.screen_size[1])
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def track(self, capture, region, grab):
+        """
+        Checks one capture of region for drift. grab(region) -> PIL image is
+        used to look around the region when the chat runs past its border.
+        Returns the region to use from now on (region itself when unchanged).
+        """
+        mask, _ = self.ocr_service.native_text_mask(capture)
+        ink_x, ink_y, ink_w, ink_h = cv2.boundingRect(mask)
+        if ink_w == 0 or ink_h == 0:
+            return region # Quiet chat: nothing to learn from
+
+        x, y, w, h = region
+        height, width = mask.shape
+        touches = ink_x <= EDGE_PX or ink_y <= EDGE_PX or ink_x + ink_w >= width - EDGE_PX or ink_y + ink_h >= height - EDGE_PX
+        if touches:
+            # The chat moved or grew past the border: find it again close by
+            window = self._search_window(region)
+            screen = grab(window)
+            found = self.locate(screen) if screen is not None else None
+            if found is None:
+                return region
+            self.recent_ink.clear()
+            fx, fy, fw, fh = found
+            new_region = (window[0] + fx, window[1] + fy, fw, fh)
+            return new_region if new_region != region else region
+
+        self.recent_ink.append((x + ink_x, y + ink_y, x + ink_x + ink_w, y + ink_y + ink_h))
+        if len(self.recent_ink) < SHRINK_AFTER:
+            return region
+        # Every recent capture fit well inside: shrink to their union
+        boxes = np.array(self.recent_ink)
+        x0, y0 = boxes[:, 0].min() - REGION_MARGIN, boxes[:, 1].min() - REGION_MARGIN
+        x1, y1 = boxes[:, 2].max() + REGION_MARGIN, boxes[:, 3].max() + REGION_MARGIN
+        x0, y0, x1, y1 = max(x, int(x0)), max(y, int(y0)), min(x + w, int(x1)), min(y + h, int(y1))
+        if (x1 - x0) * (y1 - y0) > w * h * (1 - SHRINK_MIN_GAIN):
+            return region
+        self.recent_ink.clear()
+        return (x0, y0, x1 - x0, y1 - y0)
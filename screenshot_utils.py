@@ -66,6 +66,10 @@ class ScreenCapture:
         screenshot = ImageGrab.grab(bbox=(x, y, x + width, y + height))
         return screenshot
 
+    def capture_full_screen(self):
+        """Captures the whole primary screen as a PIL Image."""
+        return ImageGrab.grab()
+
 if __name__ == "__main__":
     root = tk.Tk()
     root.title("Main App (Hidden during selection)")
@@ -0,0 +1,68 @@
+import re
+
+LATIN = "latin"
+CYRILLIC = "cyrillic"
+HAN = "han"
+
+# Tesseract models per script. Only the ones the user enabled are used.
+SCRIPT_TESS_LANGS = {
+    CYRILLIC: ["rus", "ukr", "bel", "bul", "srp", "mkd"],
+    HAN: ["chi_sim", "chi_tra", "jpn", "kor"],
+}
+
+_CYRILLIC_RE = re.compile(r'[Ѐ-ӿ]')
+_HAN_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯]')
+_LATIN_RE = re.compile(r'[A-Za-zÀ-ɏ]')
+
+# Words a multi-language first pass typically produces when it reads Cyrillic
+# glyphs with a Latin model (да -> ga, Ну -> Hy, нет -> het, ...)
+CYRILLIC_MISREADS = {"ga", "hy", "het", "bce", "kak", "tbl", "cyka", "3a", "yxe", "ctoh", "kto", "tyt"}
+# Misreads that are real English words in lower case, so only match exactly (Не -> He)
+CYRILLIC_MISREADS_EXACT = {"He", "Ha"}
+
+
+def count_scripts(text):
+    return len(_LATIN_RE.findall(text)), len(_CYRILLIC_RE.findall(text)), len(_HAN_RE.findall(text))
+
+
+def detect_script(text):
+    """
+    Cheap per-line script guess from first-pass OCR text.
+    Returns (script, confidence) with script one of LATIN, CYRILLIC, HAN.
+    """
+    latin, cyrillic, han = count_scripts(text)
+    letters = latin + cyrillic + han
+    if letters == 0:
+        return LATIN, 0.0
+
+    if han and han * 3 >= letters:
+        return HAN, han / letters
+    if cyrillic >= latin:
+        return CYRILLIC, cyrillic / letters
+
+    # Mostly Latin: look for Cyrillic read through a Latin model
+    words = [re.sub(r'\W+', '', w) for w in text.split()]
+    words = [w for w in words if w]
+    misreads = sum(1 for w in words if w.lower() in CYRILLIC_MISREADS or w in CYRILLIC_MISREADS_EXACT)
+    mixed = sum(1 for w in words if _CYRILLIC_RE.search(w) and _LATIN_RE.search(w))
+    if cyrillic or misreads or mixed:
+        suspicious = (cyrillic + 2 * misreads + 2 * mixed) / max(1, len(words) + cyrillic)
+        if suspicious >= 0.3:
+            return CYRILLIC, min(0.6, suspicious)
+
+    return LATIN, latin / letters
+
+
+def langs_for_script(script, active_langs):
+    """
+    Smallest Tesseract language string for a script, limited to the enabled
+    languages (e.g. 'eng+rus+chi_sim' -> 'rus' for CYRILLIC). Falls back to
+    all enabled languages if none of them covers the script.
+    """
+    active = [lang for lang in re.split(r'[+,]', active_langs) if lang]
+    non_latin = {lang for langs in SCRIPT_TESS_LANGS.values() for lang in langs}
+    if script == LATIN:
+        selected = [lang for lang in active if lang not in non_latin]
+    else:
+        selected = [lang for lang in active if lang in SCRIPT_TESS_LANGS[script]]
+    return "+".join(selected) if selected else "+".join(active)
@@ -0,0 +1,87 @@
+from collections import Counter
+
+CONFIRM_VOTES = 3 # Agreeing readings before a name is trusted
+CONFIRM_SHARE = 0.6 # Minimum share of the same-shape readings of the slot held by that name
+SHAPE_TOLERANCE = 0.15 # Relative change of the name's width that means another name
+NEW_MATCH_CONFLICTS = 3 # Consecutive readings contradicting confirmed names before a reset
+VERIFY_EVERY = 10 # Cache hits of a slot before its name is read by OCR again
+
+
+class SenderSlotCache:
+    """
+    Per-match memory of player names keyed by name color and name shape
+    (width / line height). Each of the ten player slots has its own color and
+    a player's name does not change during a match, so once a few OCR readings
+    of a name agree it is confirmed and later lines with a blob of that color
+    and shape skip the sender OCR. Colors are not unique enough to identify a
+    player on their own (antialiased or faded names can land in a neighbouring
+    slot), so a slot can hold several confirmed names told apart by shape, a
+    blob matching none or more than one of them is read again, and every
+    VERIFY_EVERY hits the slot is re-read to check the cached name. Several
+    readings in a row that contradict confirmed names mean a new match and
+    clear the cache.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.resets = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets every slot, e.g. when a new match starts."""
+        self.votes = {} # slot -> Counter of recognized names
+        self.shapes = {} # slot -> {name: shape of its last reading}
+        self.confirmed = {} # slot -> {name: shape}
+        self.unverified_hits = {} # slot -> hits since the last OCR reading
+        self.conflicts = 0
+
+    @staticmethod
+    def _same_shape(shape, known_shape):
+        return abs(shape - known_shape) <= known_shape * SHAPE_TOLERANCE
+
+    def _confirmed_matches(self, slot, shape):
+        return [name for name, known in self.confirmed.get(slot, {}).items() if self._same_shape(shape, known)]
+
+    def lookup(self, slot, shape):
+        """Confirmed name of the slot with this blob shape, or None when the line needs OCR."""
+        matches = self._confirmed_matches(slot, shape)
+        if len(matches) != 1:
+            return None
+        hits = self.unverified_hits.get(slot, 0)
+        if hits >= VERIFY_EVERY:
+            return None # Read it again; add() resets the count
+        self.unverified_hits[slot] = hits + 1
+        self.hits += 1
+        return matches[0]
+
+    def add(self, slot, shape, name):
+        """Votes one OCR reading of a slot's name. Returns True if it started a new match."""
+        if not name:
+            return False
+        self.unverified_hits[slot] = 0
+        new_match = False
+        matches = self._confirmed_matches(slot, shape)
+        if matches:
+            if name in matches:
+                self.conflicts = 0
+                return False
+            self.conflicts += 1
+            if self.conflicts < NEW_MATCH_CONFLICTS:
+                return False
+            # Names keep contradicting the confirmed ones: players changed
+            self.reset()
+            self.resets += 1
+            new_match = True
+
+        votes = self.votes.setdefault(slot, Counter())
+        votes[name] += 1
+        shapes = self.shapes.setdefault(slot, {})
+        shapes[name] = shape
+        # Only readings of a name with the same shape compete with it
+        same_shape = sum(count for other, count in votes.items() if self._same_shape(shapes[other], shape))
+        if votes[name] >= CONFIRM_VOTES and votes[name] >= CONFIRM_SHARE * same_shape:
+            self.confirmed.setdefault(slot, {})[name] = shape
+        return new_match
+
+    def get_stats(self):
+        return {"confirmed": sum(len(names) for names in self.confirmed.values()), "hits": self.hits, "resets": self.resets}
@@ -0,0 +1,138 @@
+import os
+import re
+import threading
+
+import cv2
+import numpy as np
+
+# Channel tags as they appear at the start of a chat line, e.g. "[Allies]"
+CHANNEL_TAGS = ("Allies", "All", "Team", "Party", "Squelched")
+# A first OCR word that reads exactly like a tag is trusted to learn its template
+_EXACT_TAG = re.compile(r"\[(" + "|".join(CHANNEL_TAGS) + r")\]")
+
+TAG_MATCH_THRESHOLD = 0.8 # Minimum normalized correlation to accept a tag
+
+
+class TagMatcher:
+    """
+    Finds the channel tag of a chat line by template matching on the validated
+    mask instead of reading it with Tesseract. The tags use a fixed font at the
+    start of each line, so one clean sighting per tag and frame scale is
+    enough: templates are learned from lines whose first OCR word is exactly
+    '[Tag]' and saved as PNGs by a background thread, so later sessions start
+    with them and snapshots never wait for the disk.
+    """
+
+    def __init__(self, template_dir="tag_templates"):
+        self.template_dir = template_dir # None keeps templates in memory only
+        self.templates = {} # scale key -> {tag: 0/255 template cropped to its ink}
+        self._pending = [] # (scale key, tag, template) waiting to be written
+        self._writer = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scale_key(scale):
+        # ROI preprocessing picks a scale per capture; templates only match at their own
+        return f"{float(scale):.2f}"
+
+    def _templates_for(self, scale):
+        key = self._scale_key(scale)
+        if key not in self.templates:
+            self.templates[key] = self._load(key)
+        return self.templates[key]
+
+    def _load(self, key):
+        templates = {}
+        folder = os.path.join(self.template_dir, key) if self.template_dir else None
+        if folder and os.path.isdir(folder):
+            for tag in CHANNEL_TAGS:
+                template = cv2.imread(os.path.join(folder, f"{tag}.png"), cv2.IMREAD_GRAYSCALE)
+                if template is not None:
+                    templates[tag] = template
+        return templates
+
+    def _save(self, key, tag, template):
+        """Queues a template for writing; the writer thread stops once the queue is empty."""
+        with self._lock:
+            self._pending.append((key, tag, template))
+            if self._writer is None:
+                # Not a daemon: templates learned just before exit are still written
+                self._writer = threading.Thread(target=self._write_pending, name="tag-template-writer")
+                self._writer.start()
+
+    def _write_pending(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._writer = None
+                    return
+                key, tag, template = self._pending.pop(0)
+            folder = os.path.join(self.template_dir, key)
+            try:
+                os.makedirs(folder, exist_ok=True)
+                cv2.imwrite(os.path.join(folder, f"{tag}.png"), template)
+            except Exception as e:
+                print(f"Could not save tag template '{tag}': {e}")
+
+    def flush(self):
+        """Waits until every learned template is on disk."""
+        with self._lock:
+            writer = self._writer
+        if writer is not None:
+            writer.join()
+
+    def learn(self, mask, line, scale):
+        """
+        Stores the line's first word as the template of its tag when it reads
+        exactly '[Tag]' and no template exists yet. Returns the learned tag or None.
+        """
+        if not line.words:
+            return None
+        match = _EXACT_TAG.fullmatch(line.words[0].text)
+        if not match:
+            return None
+        tag = match.group(1)
+        templates = self._templates_for(scale)
+        if tag in templates:
+            return None
+
+        word = line.words[0]
+        y1, y2 = line.y_bounds
+        crop = mask[y1:y2, word.left:word.left + word.width]
+        x, y, w, h = cv2.boundingRect(crop)
+        if w < 4 or h < 4:
+            return None
+        templates[tag] = crop[y:y+h, x:x+w].copy()
+        if self.template_dir:
+            self._save(self._scale_key(scale), tag, templates[tag])
+        return tag
+
+    def match(self, mask, y_bounds, scale):
+        """
+        Matches every known template against the start of one line.
+        Returns (tag, sender_x), where sender_x is the first frame column after
+        the tag, or (None, None) when no template matches confidently.
+        """
+        templates = self._templates_for(scale)
+        if not templates:
+            return None, None
+        y1, y2 = y_bounds
+        pad = max(2, int(scale))
+        rows = mask[max(0, y1 - pad):min(mask.shape[0], y2 + pad)]
+        ink_cols = np.flatnonzero(rows.any(axis=0))
+        if ink_cols.size == 0:
+            return None, None
+
+        # The tag is always the first ink of the line: search just around it
+        x0 = max(0, int(ink_cols[0]) - pad)
+        best_tag, best_x, best_score = None, None, TAG_MATCH_THRESHOLD
+        for tag, template in templates.items():
+            th, tw = template.shape
+            window = rows[:, x0:x0 + tw + 2 * pad]
+            if window.shape[0] < th or window.shape[1] < tw:
+                continue
+            _, score, _, loc = cv2.minMaxLoc(cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED))
+            # '[All]' also fits the start of '[Allies]'; the best score wins
+            if score > best_score:
+                best_tag, best_x, best_score = tag, x0 + loc[0] + tw, score
+        return best_tag, best_x
@@ -0,0 +1,160 @@
+import os
+import threading
+
+import numpy as np
+import pytesseract
+from pytesseract import Output
+
+# tesserocr binds libtesseract directly, so a handle can stay alive between
+# snapshots instead of spawning tesseract.exe (and reloading every
+# .traineddata file) for each call. It is optional; without it we fall back to
+# the pytesseract subprocess wrapper.
+try:
+    import tesserocr
+    from tesserocr import PyTessBaseAPI, OEM, RIL, iterate_level
+except ImportError:
+    tesserocr = None
+
+# Columns of the word table returned by TesseractEngine.image_to_data
+WORD_BOX_COLUMNS = ("left", "top", "width", "height")
+
+
+def parse_tsv(tsv):
+    """
+    Parses Tesseract's TSV output into a columnar word table: 'text' is a list,
+    'conf' a float array and the box columns int32 arrays. Only the needed
+    columns are converted, each with a single numpy call.
+    """
+    rows = tsv.split("\n")
+    header = rows[0].rstrip("\r").split("\t")
+    width = len(header)
+    body = []
+    for row in rows[1:]:
+        if not row:
+            continue
+        fields = row.rstrip("\r").split("\t", width - 1)
+        if len(fields) < width:
+            fields.extend([""] * (width - len(fields))) # Rows without a text field
+        body.append(fields)
+
+    if not body:
+        return _empty_word_table()
+    columns = list(zip(*body))
+    table = {"text": list(columns[header.index("text")])}
+    table["conf"] = np.array(columns[header.index("conf")], dtype=np.float64)
+    for key in WORD_BOX_COLUMNS:
+        table[key] = np.array(columns[header.index(key)], dtype=np.float64).astype(np.int32)
+    return table
+
+
+def _empty_word_table():
+    table = {"text": [], "conf": np.zeros(0, dtype=np.float64)}
+    for key in WORD_BOX_COLUMNS:
+        table[key] = np.zeros(0, dtype=np.int32)
+    return table
+
+
+class TesseractEngine:
+    """
+    Keeps one initialised Tesseract handle per language set (e.g. 'eng+rus').
+    Models are loaded the first time a language set is used and reused for
+    every later call. Images are passed as numpy buffers, no temp files.
+    """
+
+    def __init__(self, backend=None, tessdata_path=None):
+        if backend is None:
+            backend = "tesserocr" if tesserocr is not None else "pytesseract"
+        if backend == "tesserocr" and tesserocr is None:
+            print("tesserocr is not installed, falling back to pytesseract.")
+            backend = "pytesseract"
+        self.backend = backend
+        self.tessdata_path = tessdata_path or self._find_tessdata()
+        self._apis = {} # {lang: PyTessBaseAPI}
+        self._failed_langs = set() # Languages tesserocr could not load
+        self._lock = threading.Lock()
+
+    def _find_tessdata(self):
+        """Look for the tessdata folder next to the configured tesseract.exe."""
+        env_path = os.environ.get("TESSDATA_PREFIX")
+        if env_path and os.path.isdir(env_path):
+            return env_path
+        cmd_dir = os.path.dirname(pytesseract.pytesseract.tesseract_cmd)
+        candidate = os.path.join(cmd_dir, "tessdata")
+        return candidate if os.path.isdir(candidate) else None
+
+    def _get_api(self, lang):
+        api = self._apis.get(lang)
+        if api is None and lang not in self._failed_langs:
+            try:
+                kwargs = {"lang": lang, "oem": OEM.LSTM_ONLY}
+                if self.tessdata_path:
+                    kwargs["path"] = self.tessdata_path
+                api = PyTessBaseAPI(**kwargs)
+                api.SetVariable("preserve_interword_spaces", "1")
+                self._apis[lang] = api
+            except Exception as e:
+                print(f"Could not load tesserocr engine for '{lang}': {e}. Using pytesseract.")
+                self._failed_langs.add(lang)
+                api = None
+        return api
+
+    def _set_image(self, api, image):
+        img = np.ascontiguousarray(image)
+        if img.ndim == 2:
+            bpp = 1
+        else:
+            bpp = img.shape[2]
+        height, width = img.shape[:2]
+        api.SetImageBytes(img.tobytes(), width, height, bpp, width * bpp)
+
+    def image_to_data(self, image, lang, psm=6):
+        """
+        Word-level recognition. Returns a columnar word table with the same keys
+        as pytesseract's Output.DICT ('text', 'conf', 'left', 'top', 'width',
+        'height'); 'text' is a list, the other columns are numpy arrays.
+        """
+        if self.backend == "tesserocr":
+            with self._lock:
+                api = self._get_api(lang)
+                if api is not None:
+                    api.SetPageSegMode(psm)
+                    self._set_image(api, image)
+                    api.Recognize()
+                    texts, confs, boxes = [], [], []
+                    iterator = api.GetIterator()
+                    if iterator is not None:
+                        for word in iterate_level(iterator, RIL.WORD):
+                            box = word.BoundingBox(RIL.WORD)
+                            if box is None:
+                                continue
+                            texts.append(word.GetUTF8Text(RIL.WORD) or "")
+                            confs.append(word.Confidence(RIL.WORD))
+                            boxes.append(box)
+                    if not texts:
+                        return _empty_word_table()
+                    x1, y1, x2, y2 = np.array(boxes, dtype=np.int32).T
+                    return {"text": texts, "conf": np.array(confs, dtype=np.float64),
+                            "left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1}
+
+        config = f'--oem 1 --psm {psm} -c preserve_interword_spaces=1'
+        # Raw TSV parsed column-wise is cheaper than pytesseract's per-cell Output.DICT
+        return parse_tsv(pytesseract.image_to_data(image, lang=lang, config=config, output_type=Output.STRING))
+
+    def image_to_string(self, image, lang, psm=6):
+        if self.backend == "tesserocr":
+            with self._lock:
+                api = self._get_api(lang)
+                if api is not None:
+                    api.SetPageSegMode(psm)
+                    self._set_image(api, image)
+                    return api.GetUTF8Text()
+
+        config = f'--oem 1 --psm {psm} -c preserve_interword_spaces=1'
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def close(self):
+        """Release all loaded Tesseract handles."""
+        with self._lock:
+            for api in self._apis.values():
+                api.End()
+            self._apis.clear()
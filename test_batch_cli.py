@@ -0,0 +1,25 @@
+from batch_cli import collect_images, translate_messages
+
+
+class FakeTranslator:
+    def __init__(self):
+        self.batches = []
+
+    def translate_batch(self, texts, source_language="und"):
+        self.batches.append(list(texts))
+        return [(text, text.upper(), "xx") for text in texts]
+
+
+def test_translate_messages_sends_one_batch_without_empty_lines():
+    translator = FakeTranslator()
+    messages = [{"message": "gg wp"}, {"message": ""}, {"message": "go mid"}]
+    translate_messages(translator, messages)
+    assert translator.batches == [["gg wp", "go mid"]]
+    assert [parsed["translated_message"] for parsed in messages] == ["GG WP", "", "GO MID"]
+
+
+def test_collect_images(tmp_path):
+    for name in ("b.png", "a.JPG", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    folder = str(tmp_path)
+    assert collect_images([folder, str(tmp_path / "*.png")]) == [str(tmp_path / "a.JPG"), str(tmp_path / "b.png")]
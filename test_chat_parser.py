@@ -0,0 +1,41 @@
+from chat_parser import ChatLineParser, strip_sender_prefix
+
+
+def test_tag_sender_and_message():
+    parsed = ChatLineParser().parse("[Allies] Sniper: push mid now")
+    assert parsed == {"tag": "Allies", "sender": "Sniper", "message": "push mid now"}
+
+
+def test_known_tag_skips_the_tag_regexes():
+    # Template-matched lines start at the sender
+    parsed = ChatLineParser().parse("Kappa gg wp", tag="All")
+    assert parsed == {"tag": "All", "sender": "Kappa", "message": "gg wp"}
+
+
+def test_tag_without_brackets_and_colon():
+    parsed = ChatLineParser().parse("Allies Dendi where is the support")
+    assert parsed == {"tag": "Allies", "sender": "Dendi", "message": "where is the support"}
+
+
+def test_registered_sender_without_tag_or_colon():
+    parser = ChatLineParser()
+    assert parser.parse("Miracle where")["sender"] is None
+    parser.parse("[All] Miracle: report this guy")
+    assert parser.parse("Miracle where") == {"tag": None, "sender": "Miracle", "message": "where"}
+
+
+def test_punctuation_only_message_is_dropped():
+    assert ChatLineParser().parse("[All] : .")["message"] == ""
+
+
+def test_sender_registry_is_capped():
+    parser = ChatLineParser()
+    for idx in range(150):
+        parser.register_sender(f"player{idx}")
+    assert len(parser.sender_registry) <= 101
+
+
+def test_strip_sender_prefix():
+    assert strip_sender_prefix("Sniper: push mid", "Sniper") == "push mid"
+    assert strip_sender_prefix("NOtail] goroshan", "[NOtail]") == "goroshan"
+    assert strip_sender_prefix("push mid", "Sniper") == "push mid"
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from language_id import LanguageIdentifier
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope="module")
+def language_id():
+    return LanguageIdentifier()
+
+
+@pytest.mark.parametrize("text, lang", [
+    ("where is my support we need wards now", "en"),
+    ("привет как дела что ты делаешь", "ru"),
+    ("привіт як справи що ти робиш", "uk"),
+    ("hola como estas que haces por que no", "es"),
+    ("merhaba nasilsin ne yapiyorsun neden", "tr"),
+])
+def test_full_lines_are_identified_confidently(language_id, text, lang):
+    detected, confidence = language_id.identify(text)
+    assert detected == lang
+    assert confidence >= 0.8
+
+
+def test_han_script_languages(language_id):
+    assert language_id.identify("こんにちは")[0] == "ja"
+    assert language_id.identify("안녕하세요")[0] == "ko"
+    assert language_id.identify("你好")[0] == "zh-CN"
+
+
+def test_short_and_empty_lines(language_id):
+    assert language_id.identify("gg")[1] < 0.8
+    assert language_id.identify("123 !!") == ("und", 0.0)
+
+
+@pytest.mark.parametrize("name", ["language_id.py", "script_detector.py"])
+def test_server_copies_match(name):
+    # python_ocr/ deploys on its own with vendored copies of these modules
+    with open(os.path.join(ROOT, name), "rb") as original, open(os.path.join(ROOT, "python_ocr", name), "rb") as copy:
+        assert copy.read() == original.read()
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+
+from ocr_service import OcrService, LABEL_CLASS_MASK, LABEL_NONE, LABEL_SLOT_BASE
+
+
+def word_table(words):
+    """Columnar word table like TesseractEngine.image_to_data from (text, left, top, height) rows."""
+    return {
+        "text": [w[0] for w in words],
+        "conf": np.full(len(words), 90.0),
+        "left": np.array([w[1] for w in words], dtype=np.int32),
+        "top": np.array([w[2] for w in words], dtype=np.int32),
+        "width": np.full(len(words), 40, dtype=np.int32),
+        "height": np.array([w[3] for w in words], dtype=np.int32),
+    }
+
+
+def test_group_words_keeps_tesseract_order_anchors():
+    # Word centers 110, 90, 130 in Tesseract order: the first word is the anchor
+    # and both others are within 25px of it, so they form one line
+    data = word_table([("push", 100, 100, 20), ("mid", 10, 80, 20), ("now", 200, 120, 20)])
+    lines = OcrService()._group_words_into_lines(data)
+    assert [line.text for line in lines] == ["mid push now"]
+    assert lines[0].y_bounds == (80, 140)
+
+
+def test_group_words_splits_lines_and_drops_noise():
+    data = word_table([
+        ("[All]", 0, 20, 30), ("Player:", 60, 22, 30), ("gg", 150, 21, 30),
+        (".", 0, 90, 30),
+        ("[Allies]", 0, 160, 30), ("wp", 100, 158, 30),
+    ])
+    data["conf"][1] = 10.0 # Below the main-pass confidence
+    lines = OcrService()._group_words_into_lines(data)
+    assert [line.text for line in lines] == ["[All] gg", "[Allies] wp"]
+    assert [w.text for w in lines[1].words] == ["[Allies]", "wp"]
+
+
+def test_player_color_ranges_are_disjoint():
+    ranges = sorted((lower[0], upper[0]) for lower, upper in OcrService().dota_player_colors)
+    assert all(prev[1] < cur[0] for prev, cur in zip(ranges, ranges[1:]))
+
+
+def test_every_player_slot_label_is_reachable():
+    # Dota 2 player colors (RGB) in slot order
+    slot_colors = [(51, 117, 255), (102, 255, 191), (191, 0, 191), (243, 240, 11), (255, 107, 0),
+                   (254, 134, 194), (161, 180, 71), (101, 217, 247), (0, 131, 33), (164, 105, 0)]
+    ocr = OcrService()
+    labels = ocr.classify_hsv(np.array([[[0, 0, 128]]], np.uint8)) # Gray
+    assert labels[0, 0] & LABEL_CLASS_MASK == LABEL_NONE
+    for slot, (lower, upper) in enumerate(ocr.dota_player_colors):
+        # Middle of the range, so the test does not depend on the pixel's exact hue
+        hsv = np.array([[[(lower[0] + upper[0]) // 2, 200, 200]]], np.uint8)
+        assert ocr.classify_hsv(hsv)[0, 0] & LABEL_CLASS_MASK == LABEL_SLOT_BASE + slot
+    # The in-game colors land in their own slot (pink names are too pale for S >= 150)
+    for slot, rgb in enumerate(slot_colors):
+        hsv = cv2.cvtColor(np.array([[rgb]], np.uint8), cv2.COLOR_RGB2HSV)
+        if hsv[0, 0, 1] >= 150:
+            assert ocr.classify_hsv(hsv)[0, 0] & LABEL_CLASS_MASK == LABEL_SLOT_BASE + slot
+
+
+def test_matched_tags_are_blanked_before_ocr():
+    mask = np.zeros((90, 400), np.uint8)
+    for row, text in enumerate(["[All] Sniper", "Lion gg"]):
+        cv2.putText(mask, text, (10, 30 + row * 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 255, 2)
+    ocr = OcrService()
+    ocr.tag_matcher.template_dir = None
+    ocr.tag_matcher.templates["3.00"] = {"All": mask[8:36, 8:78].copy()}
+    bands, band_tags, ocr_mask = ocr._match_channel_tags(mask, 3)
+    assert len(bands) == 2
+    (tag, sender_x), untagged = band_tags
+    assert tag == "All" and untagged == (None, None)
+    y0, y1 = bands[0]
+    assert not ocr_mask[y0:y1, :sender_x].any() and ocr_mask[y0:y1, sender_x:].any()
+    assert np.array_equal(ocr_mask[bands[1][0]:], mask[bands[1][0]:])
+    assert mask[y0:y1, :sender_x].any() # The frame keeps its tag ink
+
+
+class FakeEngine:
+    """Engine stub that returns one word read with the requested languages."""
+    backend = "tesserocr"
+
+    def __init__(self):
+        self.calls = []
+
+    def image_to_data(self, image, lang, psm=6):
+        self.calls.append(lang)
+        return word_table([(f"read-{lang}", 10, 10, 20)])
+
+
+def test_whole_mask_cache_is_keyed_on_languages():
+    engine = FakeEngine()
+    ocr = OcrService(ocr_langs="eng", engine=engine)
+    mask = np.zeros((60, 200), np.uint8)
+    mask[10:30, 10:60] = 255
+    assert [line.text for line in ocr._ocr_whole_mask(mask)] == ["read-eng"]
+    assert [line.text for line in ocr._ocr_whole_mask(mask)] == ["read-eng"]
+    ocr.set_ocr_langs("eng+rus")
+    assert [line.text for line in ocr._ocr_whole_mask(mask)] == ["read-eng+rus"]
+    assert engine.calls == ["eng", "eng+rus"]
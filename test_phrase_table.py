@@ -0,0 +1,55 @@
+import json
+
+from phrase_table import PhraseTable
+
+
+def make_table(tmp_path, user_phrases=None):
+    path = tmp_path / "phrase_table.json"
+    if user_phrases is not None:
+        path.write_text(json.dumps(user_phrases), encoding="utf-8")
+    return PhraseTable(str(path))
+
+
+def test_line_made_of_known_phrases(tmp_path):
+    table = make_table(tmp_path)
+    assert table.lookup("ГГ ВП изи!", "en") == ("gg wp ez", "ru")
+    assert table.lookup("спасибооо", "en") == ("thanks", "ru")
+    assert table.lookup("gracias jajaja", "EN") == ("thanks haha", "es")
+    assert table.hits == 3
+
+
+def test_unknown_words_fall_through(tmp_path):
+    table = make_table(tmp_path)
+    assert table.lookup("гг вп команда", "en") is None
+    assert table.lookup("   ", "en") is None
+    assert table.lookup("гг", "de") is None
+    assert table.lookup("гг", "en", source="es") is None
+
+
+def test_guess_picks_the_source_first(tmp_path):
+    # "espera" and "cuidado" are both Spanish and Portuguese
+    table = make_table(tmp_path)
+    assert table.lookup("espera", "en", guess="pt") == ("wait", "pt")
+    assert table.lookup("espera", "en", guess="es") == ("wait", "es")
+
+
+def test_target_language_lines(tmp_path):
+    table = make_table(tmp_path)
+    # "pardon" is Turkish for "sorry" but also English
+    assert table.in_target_language("Pardon me!", "en")
+    assert table.in_target_language("gg wp, thanks", "en")
+    assert not table.in_target_language("merhaba", "en")
+    assert not table.in_target_language("pardon", "de")
+
+
+def test_user_phrases_override_builtin(tmp_path):
+    table = make_table(tmp_path, {"en": {"ru": {"гг": "good game"}, "de": {"danke": "thanks"}}})
+    assert table.lookup("гг", "en") == ("good game", "ru")
+    assert table.lookup("Danke", "en") == ("thanks", "de")
+    assert table.in_target_language("good game", "en")
+
+
+def test_invalid_user_file_is_ignored(tmp_path):
+    (tmp_path / "phrase_table.json").write_text("[1, 2]", encoding="utf-8")
+    table = PhraseTable(str(tmp_path / "phrase_table.json"))
+    assert table.lookup("гг", "en") == ("gg", "ru")
@@ -0,0 +1,45 @@
+import numpy as np
+
+from recognition_cache import RecognitionCache
+
+
+def line_mask(glyph_columns, x=0, y=0, shape=(40, 200)):
+    """0/255 mask with 3px wide, 12px tall strokes starting at the given columns."""
+    mask = np.zeros(shape, np.uint8)
+    for col in glyph_columns:
+        mask[10 + y:22 + y, x + col:x + col + 3] = 255
+    return mask
+
+
+def test_same_ink_hits_wherever_it_moved():
+    cache = RecognitionCache()
+    cache.put(cache.mask_key(line_mask([0, 10, 20])), "sender", "Sniper")
+    assert cache.get(cache.mask_key(line_mask([0, 10, 20], x=30, y=5)), "sender") == "Sniper"
+
+
+def test_similar_lines_do_not_share_a_key():
+    # Same width and stroke count, one stroke moved by two pixels
+    cache = RecognitionCache()
+    first = line_mask([0, 10, 20, 40])
+    second = line_mask([0, 12, 20, 40])
+    cache.put(cache.mask_key(first), "refined:rus", "привет")
+    assert cache.mask_key(first) != cache.mask_key(second)
+    assert cache.get(cache.mask_key(second), "refined:rus") is None
+
+
+def test_band_keys_and_empty_masks():
+    cache = RecognitionCache()
+    mask = np.vstack([line_mask([0, 10]), line_mask([0, 10, 20])])
+    assert cache.mask_key(mask, (0, 40)) != cache.mask_key(mask, (40, 80))
+    assert cache.mask_key(np.zeros((10, 10), np.uint8)) == "empty"
+
+
+def test_lru_eviction_and_stats():
+    cache = RecognitionCache(max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(name, "sender", name)
+    assert cache.get("a", "sender") is None
+    assert cache.get("c", "sender") == "c"
+    assert cache.get("c", "refined:rus") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
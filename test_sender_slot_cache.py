@@ -0,0 +1,59 @@
+from sender_slot_cache import SenderSlotCache, CONFIRM_VOTES, NEW_MATCH_CONFLICTS, VERIFY_EVERY
+
+
+def confirm(cache, slot, shape, name):
+    for _ in range(CONFIRM_VOTES):
+        cache.add(slot, shape, name)
+
+
+def test_name_is_confirmed_after_agreeing_readings():
+    cache = SenderSlotCache()
+    for _ in range(CONFIRM_VOTES - 1):
+        cache.add(0, 4.0, "Sniper")
+    assert cache.lookup(0, 4.0) is None
+    cache.add(0, 4.0, "Sniper")
+    assert cache.lookup(0, 4.1) == "Sniper"
+    assert cache.lookup(0, 6.0) is None # Another name in the same color
+    assert cache.lookup(1, 4.0) is None
+
+
+def test_slot_holds_names_of_different_shapes():
+    cache = SenderSlotCache()
+    confirm(cache, 3, 4.0, "Sniper")
+    confirm(cache, 3, 8.0, "CrystalMaiden")
+    assert cache.lookup(3, 4.0) == "Sniper"
+    assert cache.lookup(3, 8.0) == "CrystalMaiden"
+    assert cache.get_stats()["confirmed"] == 2
+
+
+def test_hits_are_verified_by_ocr_periodically():
+    cache = SenderSlotCache()
+    confirm(cache, 0, 4.0, "Sniper")
+    assert all(cache.lookup(0, 4.0) == "Sniper" for _ in range(VERIFY_EVERY))
+    assert cache.lookup(0, 4.0) is None
+    cache.add(0, 4.0, "Sniper")
+    assert cache.lookup(0, 4.0) == "Sniper"
+
+
+def test_occasional_misreads_do_not_reset():
+    cache = SenderSlotCache()
+    confirm(cache, 0, 4.0, "Sniper")
+    for _ in range(NEW_MATCH_CONFLICTS - 1):
+        assert not cache.add(0, 4.0, "Snlper")
+    cache.add(0, 4.0, "Sniper") # An agreeing reading clears the conflict count
+    assert not cache.add(0, 4.0, "Snlper")
+    assert cache.lookup(0, 4.0) == "Sniper"
+
+
+def test_consecutive_conflicts_start_a_new_match():
+    cache = SenderSlotCache()
+    confirm(cache, 0, 4.0, "Sniper")
+    confirm(cache, 1, 5.0, "Lion")
+    results = [cache.add(0, 4.0, "Zeus") for _ in range(NEW_MATCH_CONFLICTS)]
+    assert results == [False] * (NEW_MATCH_CONFLICTS - 1) + [True]
+    assert cache.lookup(1, 5.0) is None
+    assert cache.get_stats()["resets"] == 1
+    # The reading that triggered the reset is the first vote of the new match
+    for _ in range(CONFIRM_VOTES - 1):
+        cache.add(0, 4.0, "Zeus")
+    assert cache.lookup(0, 4.0) == "Zeus"
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+
+from ocr_frame import Line, Word
+from tag_matcher import TagMatcher
+
+
+def tag_mask(texts, shape=(120, 400)):
+    """0/255 mask with one text line per entry, each starting at x=10."""
+    mask = np.zeros(shape, np.uint8)
+    for row, text in enumerate(texts):
+        cv2.putText(mask, text, (10, 30 + row * 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 255, 2)
+    return mask
+
+
+def tag_line(text, y_bounds, tag_width):
+    return Line(text, y_bounds, (Word(text.split()[0], 8, tag_width), Word(text.split()[1], tag_width + 20, 80)))
+
+
+def test_learned_template_matches_and_is_written_in_the_background(tmp_path):
+    matcher = TagMatcher(str(tmp_path))
+    mask = tag_mask(["[All] Sniper", "[All] Lion"])
+    assert matcher.match(mask, (10, 40), 3) == (None, None)
+    assert matcher.learn(mask, tag_line("[All] Sniper", (10, 40), 68), 3) == "All"
+    tag, sender_x = matcher.match(mask, (50, 80), 3)
+    assert tag == "All" and 70 <= sender_x <= 85
+    matcher.flush()
+    assert (tmp_path / "3.00" / "All.png").exists()
+    # A new session loads the saved template
+    assert TagMatcher(str(tmp_path)).match(mask, (50, 80), 3)[0] == "All"
+
+
+def test_only_exact_tag_words_are_learned(tmp_path):
+    matcher = TagMatcher(str(tmp_path))
+    mask = tag_mask(["[All| Sniper"])
+    assert matcher.learn(mask, tag_line("[All| Sniper", (10, 40), 68), 3) is None
+    matcher.flush()
+    assert not any(tmp_path.iterdir())
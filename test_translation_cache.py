@@ -0,0 +1,49 @@
+import sqlite3
+import time
+
+from translation_cache import TranslationCache, normalize_text
+
+
+def test_normalize_text():
+    assert normalize_text("  GG\tWP  ") == "gg wp"
+    assert normalize_text("Привет  Всем") == "привет всем"
+
+
+def test_hits_ignore_case_and_spacing(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("Привет всем", "und", "en", "Hi all", "ru")
+    assert cache.get("привет   ВСЕМ", "UND", "EN") == ("Hi all", "ru")
+    assert cache.get("привет всем", "ru", "en") is None
+    assert cache.get("привет всем", "und", "de") is None
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(path)
+    cache.put_many([("gracias", "und", "en", "thanks", "es"), ("obrigado", "und", "en", "thanks", "pt")])
+    cache.close()
+    reopened = TranslationCache(path, memory_entries=1)
+    assert reopened.get("gracias", "und", "en") == ("thanks", "es")
+    assert reopened.get("obrigado", "und", "en") == ("thanks", "pt")
+    reopened.clear()
+    assert reopened.get("gracias", "und", "en") is None
+
+
+def test_stale_entries_are_dropped_at_startup(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(path)
+    cache.put_many([("hola", "und", "en", "hi", "es"), ("chau", "und", "en", "bye", "es")])
+    cache.close()
+    db = sqlite3.connect(path)
+    db.execute("UPDATE translations SET last_used = ? WHERE text = 'hola'", (time.time() - 10 * 86400,))
+    db.commit()
+    db.close()
+    reopened = TranslationCache(path, max_age_days=5)
+    assert reopened.get("hola", "und", "en") is None
+    assert reopened.get("chau", "und", "en") == ("bye", "es")
+
+
+def test_memory_only_when_the_file_cannot_be_opened(tmp_path):
+    cache = TranslationCache(str(tmp_path / "missing" / "cache.sqlite3"))
+    cache.put("hola", "und", "en", "hi", "es")
+    assert cache.get("hola", "und", "en") == ("hi", "es")
@@ -0,0 +1,37 @@
+from video_ingest import MessageDeduplicator, format_timestamp
+
+
+def message(sender, text):
+    return {"tag": "All", "sender": sender, "message": text}
+
+
+def test_lines_are_emitted_once_while_on_screen():
+    dedup = MessageDeduplicator(window_s=30.0)
+    frame = [message("Sniper", "go mid"), message("Lion", "gg")]
+    assert dedup.new_messages(frame, 0.0) == frame
+    assert dedup.new_messages(frame, 1.0) == []
+    assert dedup.new_messages(frame + [message("Zeus", "wp")], 2.0) == [message("Zeus", "wp")]
+
+
+def test_ocr_jitter_does_not_make_a_new_message():
+    dedup = MessageDeduplicator()
+    dedup.new_messages([message("Sniper", "go mid, now!")], 0.0)
+    assert dedup.new_messages([message("sniper", "go  mid now")], 0.5) == []
+
+
+def test_repeat_after_the_window_counts_again():
+    dedup = MessageDeduplicator(window_s=30.0)
+    dedup.new_messages([message("Lion", "gg")], 0.0)
+    # Still on screen at 20 s: the window restarts from the last sighting
+    assert dedup.new_messages([message("Lion", "gg")], 20.0) == []
+    assert dedup.new_messages([message("Lion", "gg")], 45.0) == []
+    assert dedup.new_messages([message("Lion", "gg")], 80.0) == [message("Lion", "gg")]
+
+
+def test_empty_lines_are_skipped():
+    dedup = MessageDeduplicator()
+    assert dedup.new_messages([message(None, ""), message("", " .. ")], 0.0) == []
+
+
+def test_format_timestamp():
+    assert format_timestamp(3725.5) == "01:02:05.500"
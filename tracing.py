@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class _NullSpan:
+    """Shared do-nothing context manager returned while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "snapshot_id", "line", "start")
+
+    def __init__(self, tracer, name, snapshot_id, line):
+        self.tracer = tracer
+        self.name = name
+        self.snapshot_id = snapshot_id
+        self.line = line
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.add_span(self.name, self.start, time.perf_counter(), self.line, self.snapshot_id)
+        return False
+
+
+class Tracer:
+    """
+    Lightweight per-stage tracing. While enabled, every pipeline stage adds a
+    span (name, snapshot id, optional line index, start, duration) to the
+    current snapshot, along with optional counters (lines, cache hits); the
+    last N snapshots are kept in memory for the timings panel and can be
+    exported as Chrome trace or plain JSON. When disabled,
+    span() returns a shared no-op context and add_span() returns immediately.
+    """
+
+    def __init__(self, enabled=False, capacity=20):
+        self.enabled = enabled
+        self.snapshots = deque(maxlen=capacity)
+        self._current = None
+        self._next_id = 1
+        self._origin = time.perf_counter() # Trace timestamps are relative to this
+        self._lock = threading.Lock()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            with self._lock:
+                self.snapshots.clear()
+                self._current = None
+
+    def begin_snapshot(self, label="snapshot"):
+        """Starts a new snapshot; spans without an explicit snapshot_id attach to it. Returns its id."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            snapshot = {"id": self._next_id, "label": label, "time": time.strftime("%H:%M:%S"), "spans": [], "stats": {}}
+            self._next_id += 1
+            self.snapshots.append(snapshot)
+            self._current = snapshot
+            return snapshot["id"]
+
+    def span(self, name, line=None, snapshot_id=None):
+        """Context manager timing one stage: with tracer.span("ocr_sender"): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, snapshot_id, line)
+
+    def add_span(self, name, start, end, line=None, snapshot_id=None):
+        """Records a stage timed by the caller with time.perf_counter()."""
+        if not self.enabled:
+            return
+        span = {"name": name, "line": line, "start_ms": (start - self._origin) * 1000, "duration_ms": (end - start) * 1000,
+                "thread": threading.current_thread().name}
+        with self._lock:
+            snapshot = self._current if snapshot_id is None else self._find(snapshot_id)
+            if snapshot is not None:
+                snapshot["spans"].append(span)
+
+    def add_stats(self, stats, snapshot_id=None):
+        """Attaches counters such as {"new_lines": 3} to the current (or given) snapshot."""
+        if not self.enabled:
+            return
+        with self._lock:
+            snapshot = self._current if snapshot_id is None else self._find(snapshot_id)
+            if snapshot is not None:
+                snapshot["stats"].update(stats)
+
+    def _find(self, snapshot_id):
+        for snapshot in self.snapshots:
+            if snapshot["id"] == snapshot_id:
+                return snapshot
+        return None
+
+    def get_snapshots(self):
+        """Copies of the buffered snapshots, oldest first."""
+        with self._lock:
+            return [dict(snapshot, spans=list(snapshot["spans"]), stats=dict(snapshot["stats"])) for snapshot in self.snapshots]
+
+    def summarize(self, snapshot):
+        """Total milliseconds per stage name for one snapshot, in first-seen order."""
+        totals = {}
+        for span in snapshot["spans"]:
+            totals[span["name"]] = totals.get(span["name"], 0.0) + span["duration_ms"]
+        return totals
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"snapshots": self.get_snapshots()}, f, indent=2)
+
+    def export_chrome_trace(self, path):
+        """Writes the buffered spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        events = []
+        threads = {}
+        for snapshot in self.get_snapshots():
+            for span in snapshot["spans"]:
+                tid = threads.setdefault(span["thread"], len(threads) + 1)
+                args = {"snapshot": snapshot["id"]}
+                if span["line"] is not None:
+                    args["line"] = span["line"]
+                events.append({"name": span["name"], "cat": snapshot["label"], "ph": "X", "pid": os.getpid(), "tid": tid,
+                               "ts": span["start_ms"] * 1000, "dur": span["duration_ms"] * 1000, "args": args})
+        for thread_name, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_name}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
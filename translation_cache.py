@@ -0,0 +1,128 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+TRANSLATION_CACHE_FILE = "translation_cache.sqlite3"
+
+
+def normalize_text(text):
+    """Cache key form of a chat line: case-folded, with whitespace collapsed."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+class TranslationCache:
+    """
+    Persistent cache of translations keyed by (normalized text, source
+    language, target language). Entries live in a local SQLite file with an
+    in-memory LRU in front, so repeated chat lines ("gg", callouts, insults)
+    never reach the network again. Entries unused for max_age_days are
+    dropped at startup, and the table is trimmed to max_entries by last use.
+    """
+
+    def __init__(self, path=None, memory_entries=1024, max_entries=50000, max_age_days=90):
+        self.path = path or os.path.join(os.path.dirname(__file__), TRANSLATION_CACHE_FILE)
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.max_age_s = max_age_days * 86400
+        self.memory = OrderedDict() # key -> (translated text, detected source language)
+        self._puts_since_trim = 0
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            # Snapshots are translated on worker threads; every access holds the lock
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "text TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+                "translated TEXT NOT NULL, detected TEXT NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (text, source, target))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+            self._db.execute("DELETE FROM translations WHERE last_used < ?", (time.time() - self.max_age_s,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            # Keep working with the in-memory LRU only
+            print(f"Translation cache disabled on disk ('{self.path}'): {e}")
+            self._db = None
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, text, source, target):
+        """(translated text, detected source language) or None on a miss."""
+        key = (normalize_text(text), source.lower(), target.lower())
+        with self._lock:
+            value = self.memory.get(key)
+            if value is not None:
+                self.memory.move_to_end(key)
+                return value
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute(
+                    "SELECT translated, detected FROM translations WHERE text = ? AND source = ? AND target = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                # Only disk hits refresh the age; lines hot enough to stay in memory are refreshed when reloaded
+                self._db.execute("UPDATE translations SET last_used = ? WHERE text = ? AND source = ? AND target = ?", (time.time(),) + key)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache read failed: {e}")
+                return None
+            value = (row[0], row[1])
+            self._remember(key, value)
+            return value
+
+    def put_many(self, entries):
+        """Stores (text, source, target, translated, detected) tuples in one transaction."""
+        if not entries:
+            return
+        now = time.time()
+        rows = [(normalize_text(text), source.lower(), target.lower(), translated, detected, now)
+                for text, source, target, translated, detected in entries]
+        with self._lock:
+            for row in rows:
+                self._remember(row[:3], (row[3], row[4]))
+            if self._db is None:
+                return
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._puts_since_trim += len(rows)
+                if self._puts_since_trim >= 100:
+                    self._puts_since_trim = 0
+                    self._trim()
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache write failed: {e}")
+
+    def put(self, text, source, target, translated, detected=""):
+        self.put_many([(text, source, target, translated, detected)])
+
+    def _trim(self):
+        """Drops the least recently used rows beyond max_entries."""
+        count = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,5 +1,14 @@
 from google.cloud import translate_v3 as translate
 from usage_tracker import UsageTracker # Import UsageTracker
+from language_id import LanguageIdentifier
+from phrase_table import PhraseTable
+from translation_cache import TranslationCache, normalize_text
+
+# Per-request limits for batched translation (the API allows 1024 contents / 30k code points)
+MAX_BATCH_CONTENTS = 128
+MAX_BATCH_CHARS = 25000
+# Local language ID results at least this confident are trusted without asking the API
+LOCAL_ID_MIN_CONFIDENCE = 0.8
 
 class TranslationService:
     def __init__(self, project_id, target_lang="en"):
@@ -7,6 +16,13 @@ class TranslationService:
         self.target_lang = target_lang
         self.client = None # Will be initialized after OAuth
         self.usage_tracker = UsageTracker() # Instantiate UsageTracker
+        self.language_id = LanguageIdentifier() # Offline language guess per line
+        # Lines kept on the machine (already in the target language) / lines sent out
+        self.stats = {"local_skips": 0, "local_detects": 0, "remote_detects": 0, "phrase_hits": 0}
+        # Stock chat phrases and slang translated without any request
+        self.phrase_table = PhraseTable()
+        # Persistent (SQLite + in-memory LRU) cache of earlier translations
+        self.cache = TranslationCache()
 
     def initialize_client(self, credentials):
         """Initializes the Google Cloud Translation client with provided credentials."""
@@ -16,6 +32,14 @@ class TranslationService:
         """Updates the target language for translations."""
         self.target_lang = lang
 
+    def _identify_locally(self, text):
+        """Offline language of text, or None when the guess is not confident enough."""
+        lang, confidence = self.language_id.identify(text)
+        return lang if confidence >= LOCAL_ID_MIN_CONFIDENCE else None
+
+    def _is_target_lang(self, lang):
+        return lang.lower() == self.target_lang.lower()
+
     def translate_text(self, text, source_language="und"):
         """
         Translates text using Google Cloud Translation API.
@@ -24,6 +48,34 @@ class TranslationService:
         :return: Translated text.
         """
         original_text = text # Store original text
+        requested_source = source_language
+
+        if not text.strip() or self._is_target_lang(source_language):
+            return original_text, original_text # No need to translate empty text or if already target language
+
+        # Offline language ID first; only unclear lines go to the remote detector.
+        # Lines already in the target language are never translated, not even
+        # by the phrase table ("pardon" is English as well as Turkish)
+        local_lang = None
+        if source_language == "und":
+            local_lang = self._identify_locally(text)
+            if local_lang is not None:
+                self.stats["local_detects"] += 1
+            if (local_lang is not None and self._is_target_lang(local_lang)) or self.phrase_table.in_target_language(text, self.target_lang):
+                self.stats["local_skips"] += 1
+                return original_text, original_text
+
+        # Stock phrases and slang need neither the client nor the cache
+        phrase = self.phrase_table.lookup(text, self.target_lang, source_language, local_lang)
+        if phrase is not None:
+            self.stats["phrase_hits"] += 1
+            return original_text, phrase[0]
+
+        # Repeated lines come from the cache: no request, nothing counted against the limit
+        cached = self.cache.get(text, requested_source, self.target_lang)
+        if cached is not None:
+            self.usage_tracker.record_translation_cache(1, 0, len(text))
+            return original_text, cached[0]
 
         if self.client is None:
             print("Translation client not initialized. Cannot perform translation.")
@@ -32,15 +84,16 @@ class TranslationService:
         if self.usage_tracker.is_translation_limit_reached():
             print("Warning: Translation free tier limit reached for this month. Further translation requests are blocked.")
             return original_text, original_text
-        
-        if not text.strip() or source_language.lower() == self.target_lang:
-            return original_text, original_text # No need to translate empty text or if already target language
+
+        if local_lang is not None:
+            source_language = local_lang
 
         try:
             parent = f"projects/{self.project_id}/locations/global"
             
             # First, attempt language detection if source_language is undetermined
             if source_language == "und":
+                self.stats["remote_detects"] += 1
                 lang_detect_response = self.client.detect_language(
                     parent=parent,
                     content=text,
@@ -52,7 +105,8 @@ class TranslationService:
                     source_language = self.target_lang # Default to target lang if detection fails
 
             # Skip translation if source is already target language
-            if source_language.lower() == self.target_lang:
+            if self._is_target_lang(source_language):
+                self.cache.put(text, requested_source, self.target_lang, original_text, source_language)
                 return original_text, original_text
 
             # Perform translation
@@ -66,16 +120,144 @@ class TranslationService:
                 }
             )
 
-            self.usage_tracker.increment_translation_characters(len(text))
-            if self.usage_tracker.get_translation_usage_percentage() >= 80:
-                print(f"Warning: Translation usage is at {self.usage_tracker.get_translation_usage_percentage():.0f}% of the free tier limit ({self.usage_tracker.get_translation_characters()}/{self.usage_tracker.get_translation_free_tier_limit()} characters).")
-
+            self._record_usage(len(text))
+            self.usage_tracker.record_translation_cache(0, 1, 0)
 
             if response.translations:
                 translated_text = response.translations[0].translated_text
+                self.cache.put(text, requested_source, self.target_lang, translated_text, source_language)
                 return original_text, translated_text
             
         except Exception as e:
             print(f"Error during translation: {e}")
         
         return original_text, original_text # Return original text on error
+
+    def _record_usage(self, char_count):
+        """Counts translated characters once per request and warns near the free tier limit."""
+        self.usage_tracker.increment_translation_characters(char_count)
+        if self.usage_tracker.get_translation_usage_percentage() >= 80:
+            print(f"Warning: {self.get_usage_summary()}")
+
+    def get_usage_summary(self):
+        """Monthly usage of the free tier and what the translation cache saved, as one line."""
+        tracker = self.usage_tracker
+        return (f"Translation usage is at {tracker.get_translation_usage_percentage():.0f}% of the free tier limit "
+                f"({tracker.get_translation_characters()}/{tracker.get_translation_free_tier_limit()} characters); "
+                f"cache hit rate {tracker.get_translation_cache_hit_rate():.0f}%, "
+                f"{tracker.get_translation_characters_saved()} characters saved.")
+
+    def _batch_chunks(self, indices, texts):
+        """Splits the indices of the texts to send into chunks within the per-request limits."""
+        chunk, chunk_chars = [], 0
+        for idx in indices:
+            if chunk and (len(chunk) >= MAX_BATCH_CONTENTS or chunk_chars + len(texts[idx]) > MAX_BATCH_CHARS):
+                yield chunk
+                chunk, chunk_chars = [], 0
+            chunk.append(idx)
+            chunk_chars += len(texts[idx])
+        if chunk:
+            yield chunk
+
+    def translate_batch(self, texts, source_language="und"):
+        """
+        Translates all lines of a snapshot with one translate_text request
+        (more only when the limits per request are exceeded). Lines made of
+        stock phrases come from the phrase table. With source 'und' lines the
+        offline language ID places in the target language are skipped; the
+        API detects the language of the others itself, so no separate
+        detect_language call is made.
+        :param texts: List of texts to translate.
+        :return: (original, translated, source language) per text; the source
+                 is '' when unknown, and translated is the original on errors.
+        """
+        results = [(text, text, "") for text in texts]
+        send = [idx for idx, text in enumerate(texts) if text.strip()]
+        if not send or self._is_target_lang(source_language):
+            return results
+
+        # With source 'und', lines already in the target language (confidently
+        # identified offline, or made of the target's own stock phrases) never
+        # leave the machine. Stock phrases and slang of the other lines are
+        # answered from the phrase table
+        remaining = []
+        for idx in send:
+            guess, confidence = self.language_id.identify(texts[idx]) if source_language == "und" else (None, 0.0)
+            if confidence >= LOCAL_ID_MIN_CONFIDENCE and self._is_target_lang(guess):
+                results[idx] = (texts[idx], texts[idx], guess)
+                self.stats["local_skips"] += 1
+                continue
+            if source_language == "und" and self.phrase_table.in_target_language(texts[idx], self.target_lang):
+                results[idx] = (texts[idx], texts[idx], self.target_lang)
+                self.stats["local_skips"] += 1
+                continue
+            phrase = self.phrase_table.lookup(texts[idx], self.target_lang, source_language, guess)
+            if phrase is not None:
+                results[idx] = (texts[idx],) + phrase
+                self.stats["phrase_hits"] += 1
+            else:
+                remaining.append(idx)
+        send = remaining
+
+        # Repeated lines come from the cache: no request, nothing counted against the limit
+        remaining = []
+        characters_saved = 0
+        for idx in send:
+            cached = self.cache.get(texts[idx], source_language, self.target_lang)
+            if cached is not None:
+                results[idx] = (texts[idx], cached[0], cached[1])
+                characters_saved += len(texts[idx])
+            else:
+                remaining.append(idx)
+        self.usage_tracker.record_translation_cache(len(send) - len(remaining), 0, characters_saved)
+        # Lines repeated within the snapshot are sent once
+        duplicates = {}
+        for idx in remaining:
+            duplicates.setdefault(normalize_text(texts[idx]), []).append(idx)
+        send = [indices[0] for indices in duplicates.values()]
+        if not send:
+            return results
+
+        if self.client is None:
+            print("Translation client not initialized. Cannot perform translation.")
+            return results
+        if source_language == "und":
+            self.stats["remote_detects"] += len(send)
+
+        parent = f"projects/{self.project_id}/locations/global"
+        for chunk in self._batch_chunks(send, texts):
+            if self.usage_tracker.is_translation_limit_reached():
+                print("Warning: Translation free tier limit reached for this month. Further translation requests are blocked.")
+                break
+            request = {
+                "parent": parent,
+                "contents": [texts[idx] for idx in chunk],
+                "mime_type": "text/plain",
+                "target_language_code": self.target_lang,
+            }
+            if source_language != "und":
+                request["source_language_code"] = source_language
+            try:
+                response = self.client.translate_text(request=request)
+            except Exception as e:
+                print(f"Error during batch translation: {e}")
+                continue
+
+            self._record_usage(sum(len(texts[idx]) for idx in chunk))
+            self.usage_tracker.record_translation_cache(0, len(chunk), 0)
+            # Translations come back in the order of contents; lines without
+            # one keep their original text and are neither cached nor copied
+            translated = []
+            for idx, translation in zip(chunk, response.translations):
+                detected = translation.detected_language_code or source_language
+                if self._is_target_lang(detected):
+                    results[idx] = (texts[idx], texts[idx], detected)
+                else:
+                    results[idx] = (texts[idx], translation.translated_text, detected)
+                translated.append(idx)
+            self.cache.put_many([(texts[idx], source_language, self.target_lang, results[idx][1], results[idx][2]) for idx in translated])
+            for idx in translated:
+                for duplicate in duplicates[normalize_text(texts[idx])][1:]:
+                    results[duplicate] = (texts[duplicate],) + results[idx][1:]
+        return results
+
@@ -13,14 +13,19 @@ class UsageTracker:
         self._reset_if_new_month()
 
     def _load_usage_data(self):
-        if os.path.exists(self.usage_path):
-            with open(self.usage_path, 'r') as f:
-                return json.load(f)
-        return {
+        data = {
             "last_reset_month": datetime.now().strftime("%Y-%m"),
             "ocr_requests": 0,
-            "translation_characters": 0
+            "translation_characters": 0,
+            "translation_cache_hits": 0,
+            "translation_cache_misses": 0,
+            "translation_characters_saved": 0
         }
+        if os.path.exists(self.usage_path):
+            with open(self.usage_path, 'r') as f:
+                # Older files lack the cache counters; keep their defaults
+                data.update(json.load(f))
+        return data
 
     def _save_usage_data(self):
         with open(self.usage_path, 'w') as f:
@@ -32,6 +37,9 @@ class UsageTracker:
             self.data["last_reset_month"] = current_month
             self.data["ocr_requests"] = 0
             self.data["translation_characters"] = 0
+            self.data["translation_cache_hits"] = 0
+            self.data["translation_cache_misses"] = 0
+            self.data["translation_characters_saved"] = 0
             self._save_usage_data()
 
     def increment_ocr_requests(self, count=1):
@@ -42,6 +50,15 @@ class UsageTracker:
         self.data["translation_characters"] += count
         self._save_usage_data()
 
+    def record_translation_cache(self, hits, misses, characters_saved):
+        """Counts lines answered by the translation cache and the characters they did not send."""
+        if not hits and not misses:
+            return
+        self.data["translation_cache_hits"] += hits
+        self.data["translation_cache_misses"] += misses
+        self.data["translation_characters_saved"] += characters_saved
+        self._save_usage_data()
+
     def get_ocr_requests(self):
         return self.data["ocr_requests"]
 
@@ -60,6 +77,13 @@ class UsageTracker:
     def get_translation_usage_percentage(self):
         return (self.get_translation_characters() / FREE_TIER_TRANSLATION_LIMIT) * 100
 
+    def get_translation_cache_hit_rate(self):
+        lookups = self.data["translation_cache_hits"] + self.data["translation_cache_misses"]
+        return (self.data["translation_cache_hits"] / lookups) * 100 if lookups else 0.0
+
+    def get_translation_characters_saved(self):
+        return self.data["translation_characters_saved"]
+
     def get_ocr_free_tier_limit(self):
         return FREE_TIER_OCR_LIMIT
 
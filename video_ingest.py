@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+from PIL import Image
+
+from batch_cli import build_pipeline, build_translation_service, translate_messages
+from watch_service import ChangeDetector
+
+# Per-process pipeline, created once by the pool initializer
+_worker_pipeline = None
+
+
+def _init_worker(options):
+    global _worker_pipeline
+    # One thread per worker process; parallelism comes from the pool itself
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    cv2.setNumThreads(1)
+    _worker_pipeline = build_pipeline(options)
+
+
+def _process_frame(rgb):
+    """OCR + parse of one cropped frame; every frame is a full snapshot."""
+    _worker_pipeline.reset()
+    return _worker_pipeline.process(Image.fromarray(rgb), translate=False)
+
+
+def format_timestamp(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+
+
+class MessageDeduplicator:
+    """
+    Chat lines stay on screen for several sampled frames. A message is emitted
+    the first time it is seen, and again only if it was absent from the chat
+    for longer than window_s (so a repeated "gg" later in the match counts).
+    """
+
+    def __init__(self, window_s=30.0):
+        self.window_s = window_s
+        self.last_seen = {} # key -> last time (s) the line was on screen
+
+    @staticmethod
+    def key(parsed):
+        # OCR jitter between frames mostly changes spacing and punctuation
+        text = f"{parsed.get('sender') or ''}|{parsed.get('message') or ''}".lower()
+        return re.sub(r'[\W_]+', '', text)
+
+    def new_messages(self, messages, t):
+        fresh = []
+        for parsed in messages:
+            key = self.key(parsed)
+            if not key:
+                continue
+            last = self.last_seen.get(key)
+            if last is None or t - last > self.window_s:
+                fresh.append(parsed)
+            self.last_seen[key] = t
+        # Forget lines that left the chat long ago
+        if len(self.last_seen) > 2000:
+            self.last_seen = {k: v for k, v in self.last_seen.items() if t - v <= self.window_s}
+        return fresh
+
+
+def locate_region(capture, scan_s=120.0, step_s=2.0):
+    """
+    Finds the chat block in the first scan_s seconds of the video, looking at
+    one frame every step_s. The chat grows as messages arrive, so the result
+    is the union of the blocks found that overlap the first one. Returns the
+    region in video pixels or None; the capture is rewound afterwards.
+    """
+    from ocr_service import OcrService
+    from region_locator import RegionLocator
+
+    locator = RegionLocator(OcrService())
+    box = None # (x0, y0, x1, y1)
+    t_s = 0.0
+    while t_s < scan_s:
+        capture.set(cv2.CAP_PROP_POS_MSEC, t_s * 1000)
+        ok, frame = capture.read()
+        if not ok:
+            break
+        t_s += step_s
+        found = locator.locate(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+        if found is None:
+            continue
+        x, y, w, h = found
+        if box is None:
+            box = (x, y, x + w, y + h)
+        elif x < box[2] and box[0] < x + w and y < box[3] and box[1] < y + h:
+            box = (min(box[0], x), min(box[1], y), max(box[2], x + w), max(box[3], y + h))
+    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    return None if box is None else (box[0], box[1], box[2] - box[0], box[3] - box[1])
+
+
+def sample_frames(capture, region, sample_ms, max_sample_ms, stats):
+    """
+    Yields (time_s, frame_index, rgb_crop) for frames whose chat area changed.
+    The sampling step grows while the chat is quiet and resets on a change;
+    frames between samples are grabbed but never converted or cropped.
+    """
+    x, y, w, h = region
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    detector = ChangeDetector()
+    step_ms = sample_ms
+    next_sample_ms = 0.0
+    frame_idx = -1
+    while capture.grab():
+        frame_idx += 1
+        stats["decoded"] += 1
+        t_ms = frame_idx * 1000.0 / fps
+        if t_ms < next_sample_ms:
+            continue
+        ok, frame = capture.retrieve()
+        if not ok:
+            break
+        stats["sampled"] += 1
+        rgb = cv2.cvtColor(frame[y:y+h, x:x+w], cv2.COLOR_BGR2RGB)
+        if detector.has_changed(Image.fromarray(rgb)):
+            step_ms = sample_ms
+            yield t_ms / 1000.0, frame_idx, rgb
+        else:
+            # Quiet chat: back off gradually up to max_sample_ms
+            step_ms = min(step_ms * 1.5, max_sample_ms)
+        next_sample_ms = t_ms + step_ms
+
+
+def main():
+    from config import AppConfig
+    config = AppConfig()
+
+    parser = argparse.ArgumentParser(description="Extract and translate chat messages from a recorded match video.")
+    parser.add_argument("video", help="Video file readable by OpenCV")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--region", help="Chat area in video pixels as x,y,width,height, or 'auto' to detect it (default: chat_region from config.ini)")
+    parser.add_argument("--sample-ms", type=int, default=250, help="Sampling step while chat is active")
+    parser.add_argument("--max-sample-ms", type=int, default=2000, help="Longest sampling step while chat is quiet")
+    parser.add_argument("--dedupe-window", type=float, default=30.0, help="Seconds a message must be gone before it counts again")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel OCR worker processes")
+    parser.add_argument("--langs", default=config.get_ocr_langs(), help="Tesseract languages, e.g. eng+rus (default: from config.ini)")
+    parser.add_argument("--roi", action="store_true", default=config.get_roi_preprocess(), help="Use ROI-first preprocessing")
+    parser.add_argument("--segmentation", choices=("words", "bands"), default=config.get_segmentation(),
+                        help="Pass 1 line segmentation: one psm 6 pass, or projection bands with psm 7 per line")
+    parser.add_argument("--translate", action="store_true", help="Translate messages with Google Cloud (off by default)")
+    parser.add_argument("--target-lang", default=config.get_target_lang())
+    parser.add_argument("--project-id", default=config.get_project_id(), help="Google Cloud project id (default: from config.ini)")
+    args = parser.parse_args()
+
+    capture = cv2.VideoCapture(args.video)
+    if not capture.isOpened():
+        print(f"Could not open video '{args.video}'.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.region == "auto":
+        region = locate_region(capture)
+        if region is None:
+            print("No chat found in the first two minutes of the video; pass --region x,y,width,height.", file=sys.stderr)
+            sys.exit(1)
+        print(f"Chat region: {','.join(map(str, region))}", file=sys.stderr)
+    else:
+        region = tuple(map(int, args.region.split(","))) if args.region else config.get_chat_region()
+    if not region or len(region) != 4:
+        print("No chat region; select one in the app or pass --region x,y,width,height.", file=sys.stderr)
+        sys.exit(1)
+    width, height = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    x, y, w, h = region
+    if x < 0 or y < 0 or w <= 0 or h <= 0 or x + w > width or y + h > height:
+        print(f"Chat region {region} is outside the {width}x{height} video; pass --region in video pixels.", file=sys.stderr)
+        sys.exit(1)
+
+    options = {
+        "ocr_langs": args.langs.replace(",", "+"),
+        "roi": args.roi,
+        "segmentation": args.segmentation,
+        "translate": args.translate,
+        "target_lang": args.target_lang,
+        "project_id": args.project_id,
+    }
+    # Workers only OCR; a line stays on screen for many frames, so translation
+    # runs here after deduplication and only new messages are sent
+    worker_options = dict(options, translate=False)
+    translation_service = build_translation_service(options)
+    workers = max(1, args.workers)
+    stats = {"decoded": 0, "sampled": 0, "ocr": 0, "messages": 0}
+    deduplicator = MessageDeduplicator(args.dedupe_window)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    def emit(t, frame_idx, messages):
+        stats["ocr"] += 1
+        fresh = deduplicator.new_messages(messages, t)
+        if translation_service is not None:
+            translate_messages(translation_service, fresh)
+        for parsed in fresh:
+            record = {"time": round(t, 3), "timestamp": format_timestamp(t), "frame": frame_idx,
+                      "tag": parsed.get("tag"), "sender": parsed.get("sender"), "message": parsed.get("message"),
+                      "translation": parsed.get("translated_message")}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            stats["messages"] += 1
+
+    start = time.perf_counter()
+    try:
+        frames = sample_frames(capture, region, args.sample_ms, args.max_sample_ms, stats)
+        if workers == 1:
+            _init_worker(worker_options)
+            for t, frame_idx, rgb in frames:
+                emit(t, frame_idx, _process_frame(rgb))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(worker_options,)) as executor:
+                # Bounded in-flight window keeps memory flat; results are consumed in video order
+                pending = deque()
+                for t, frame_idx, rgb in frames:
+                    pending.append((t, frame_idx, executor.submit(_process_frame, rgb)))
+                    if len(pending) >= workers * 2:
+                        t0, idx0, future = pending.popleft()
+                        emit(t0, idx0, future.result())
+                while pending:
+                    t0, idx0, future = pending.popleft()
+                    emit(t0, idx0, future.result())
+    finally:
+        capture.release()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{stats['decoded']} frames decoded, {stats['sampled']} sampled, {stats['ocr']} OCR'd, {stats['messages']} unique messages "
+          f"in {elapsed:.1f} s with {workers} worker(s): {stats['decoded'] / elapsed:.1f} frames/s, "
+          f"{stats['ocr'] / elapsed:.2f} OCR frames/s, {stats['messages'] / elapsed:.2f} messages/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
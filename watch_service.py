@@ -0,0 +1,119 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Cheap change test between consecutive captures: grayscale, downsample by
+    an integer factor and count pixels whose brightness moved noticeably.
+    """
+
+    def __init__(self, downsample=4, pixel_delta=24, min_changed_fraction=0.002):
+        self.downsample = downsample
+        self.pixel_delta = pixel_delta
+        self.min_changed_fraction = min_changed_fraction
+        self.prev_small = None
+
+    def reset(self):
+        self.prev_small = None
+
+    def _thumbnail(self, pil_image):
+        return np.asarray(pil_image.convert("L").reduce(self.downsample))
+
+    def has_changed(self, pil_image):
+        small = self._thumbnail(pil_image)
+        prev = self.prev_small
+        self.prev_small = small
+        if prev is None or prev.shape != small.shape:
+            return True
+        changed = np.count_nonzero(cv2.absdiff(small, prev) > self.pixel_delta)
+        return changed > small.size * self.min_changed_fraction
+
+
+class WatchService:
+    """
+    Background loop that grabs the chat region at a configurable rate and only
+    runs the full pipeline when the chat area changed. The rate backs off while
+    chat is quiet, and the loop sleeps long enough that its own work never
+    uses more than cpu_budget of a single core. OpenCV runs on one thread
+    while watching; Tesseract is limited by OMP_THREAD_LIMIT=1, set by the app
+    before the engine loads, and the app keeps watch snapshots off the OCR
+    worker pool.
+    """
+
+    def __init__(self, capture_callback, change_callback, interval_ms=500, max_interval_ms=4000, cpu_budget=0.5):
+        self.capture_callback = capture_callback # () -> PIL image or None
+        self.change_callback = change_callback # (PIL image) -> None, runs the pipeline
+        self.interval_ms = interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.cpu_budget = cpu_budget # Fraction of one core (0-1]
+        self.detector = ChangeDetector()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self._saved_cv2_threads = None # OpenCV thread count to restore in stop()
+
+    def set_interval(self, interval_ms):
+        self.interval_ms = max(100, int(interval_ms))
+
+    def is_running(self):
+        """True while the loop runs and has not been asked to stop."""
+        return self.thread is not None and self.thread.is_alive() and not self.stop_event.is_set()
+
+    def start(self):
+        """Starts the loop. Returns False while a stopped loop is still finishing its snapshot."""
+        if self.is_running():
+            return True
+        if self.thread is not None and self.thread.is_alive():
+            print("Watch mode is still finishing the previous snapshot; not started.")
+            return False
+        # Keep OpenCV on a single thread so the watcher cannot spread over
+        # several cores while the game is running
+        self._saved_cv2_threads = cv2.getNumThreads()
+        cv2.setNumThreads(1)
+
+        self.stop_event.clear()
+        self.detector.reset()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print(f"Watch mode started ({self.interval_ms} ms).")
+        return True
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join(timeout=5)
+        if self._saved_cv2_threads is not None:
+            cv2.setNumThreads(self._saved_cv2_threads)
+            self._saved_cv2_threads = None
+        if self.thread.is_alive():
+            # Still inside OCR or translation: keep the handle so start() cannot
+            # run a second loop next to it
+            print("Watch mode stopping after the current snapshot.")
+            return
+        self.thread = None
+        print("Watch mode stopped.")
+
+    def _run(self):
+        interval = self.interval_ms / 1000
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                image = self.capture_callback()
+                if image is not None and self.detector.has_changed(image):
+                    self.change_callback(image)
+                    interval = self.interval_ms / 1000
+                else:
+                    # Quiet chat: back off gradually up to max_interval_ms
+                    interval = min(interval * 1.5, self.max_interval_ms / 1000)
+            except Exception as e:
+                print(f"Watch mode error: {e}")
+                interval = self.max_interval_ms / 1000
+
+            busy = time.perf_counter() - start
+            # Duty cycle: busy / (busy + sleep) <= cpu_budget
+            budget_sleep = busy * (1 / self.cpu_budget - 1)
+            self.stop_event.wait(max(interval, budget_sleep))